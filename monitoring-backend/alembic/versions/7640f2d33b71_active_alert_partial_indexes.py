@@ -0,0 +1,50 @@
+"""active alert partial indexes
+
+Revision ID: 7640f2d33b71
+Revises: f479a39240a2
+Create Date: 2026-10-18 22:57:38.410987
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7640f2d33b71"
+down_revision: Union[str, Sequence[str], None] = "f479a39240a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_node_alerts_active_created_at",
+        "node_alerts",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+    op.create_index(
+        "ix_node_alerts_active_librenms",
+        "node_alerts",
+        ["librenms_alert_id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'active' AND librenms_alert_id IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_node_alerts_active_node",
+        "node_alerts",
+        ["node_type", "node_id", "alert_type"],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_node_alerts_active_node", table_name="node_alerts")
+    op.drop_index("ix_node_alerts_active_librenms", table_name="node_alerts")
+    op.drop_index("ix_node_alerts_active_created_at", table_name="node_alerts")
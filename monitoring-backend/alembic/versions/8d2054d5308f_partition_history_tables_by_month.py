@@ -0,0 +1,196 @@
+"""partition history tables by month
+
+Revision ID: 8d2054d5308f
+Revises: 2b7f1af7699c
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2054d5308f"
+down_revision: Union[str, Sequence[str], None] = "2b7f1af7699c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+BANDWIDTH_COLUMNS = """
+    device_id INTEGER NOT NULL,
+    "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+    in_usage_mbps DOUBLE PRECISION NOT NULL,
+    out_usage_mbps DOUBLE PRECISION NOT NULL,
+    total_usage_mbps DOUBLE PRECISION NOT NULL,
+    latency_ms DOUBLE PRECISION,
+    packet_loss DOUBLE PRECISION,
+    status VARCHAR(255)
+"""
+
+# table -> (id column, partition key, column DDL, FK name, FK DDL, indexes)
+TABLES = {
+    "device_bandwidth": (
+        "id",
+        "timestamp",
+        BANDWIDTH_COLUMNS,
+        "device_bandwidth_device_id_fkey",
+        "FOREIGN KEY (device_id) REFERENCES devices (device_id) ON DELETE CASCADE",
+        {"idx_device_bw_time": 'device_id, "timestamp"'},
+    ),
+    "switch_bandwidth": (
+        "id",
+        "timestamp",
+        BANDWIDTH_COLUMNS.replace("device_id", "switch_id"),
+        "switch_bandwidth_switch_id_fkey",
+        "FOREIGN KEY (switch_id) REFERENCES switches (switch_id) ON DELETE CASCADE",
+        {"idx_switch_bw_time": 'switch_id, "timestamp"'},
+    ),
+    "status_history": (
+        "history_id",
+        "changed_at",
+        """
+    node_type VARCHAR(32) NOT NULL,
+    node_id INTEGER NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+""",
+        None,
+        None,
+        {
+            "ix_status_history_status": "status",
+            "ix_status_history_node_time": "node_type, node_id, changed_at",
+        },
+    ),
+}
+
+# Indexes that existed on the plain tables before partitioning
+LEGACY_INDEXES = {
+    "device_bandwidth": {
+        "idx_device_bw_time": 'device_id, "timestamp"',
+        "ix_device_bandwidth_device_time": 'device_id, "timestamp"',
+    },
+    "switch_bandwidth": {
+        "idx_switch_bw_time": 'switch_id, "timestamp"',
+        "ix_switch_bandwidth_switch_time": 'switch_id, "timestamp"',
+    },
+    "status_history": {
+        "ix_status_history_node_changed": "node_type, node_id, changed_at",
+        "ix_status_history_status": "status",
+        "ix_status_history_node_time": "node_type, node_id, changed_at",
+    },
+}
+
+
+def _month_floor(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + (month_start.month - 1) + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _column_list(column_ddl: str) -> str:
+    names = [line.split()[0] for line in column_ddl.strip().splitlines()]
+    return ", ".join(names)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    now_month = _month_floor(datetime.now(timezone.utc))
+
+    for table, (id_col, key, column_ddl, fk_name, fk_ddl, indexes) in TABLES.items():
+        legacy = f"{table}_unpartitioned"
+        seq = f"{table}_{id_col}_seq"
+        quoted_key = f'"{key}"'
+
+        for index_name in LEGACY_INDEXES[table]:
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(
+            f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey"
+        )
+        if fk_name:
+            op.execute(
+                f"ALTER TABLE {legacy} RENAME CONSTRAINT {fk_name} TO {legacy}_fkey"
+            )
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+
+        constraints = f"PRIMARY KEY ({id_col}, {quoted_key})"
+        if fk_name:
+            constraints += f",\n    CONSTRAINT {fk_name} {fk_ddl}"
+        op.execute(
+            f"CREATE TABLE {table} (\n"
+            f"    {id_col} INTEGER DEFAULT nextval('{seq}'::regclass) NOT NULL,"
+            f"{column_ddl.rstrip()},\n    {constraints}\n"
+            f") PARTITION BY RANGE ({quoted_key})"
+        )
+
+        oldest = conn.execute(
+            sa.text(f"SELECT min({quoted_key}) FROM {legacy}")
+        ).scalar()
+        month = _month_floor(oldest) if oldest else now_month
+        last_month = _add_months(now_month, MONTHS_AHEAD)
+        while month <= last_month:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}{month.month:02d} "
+                f"PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+
+        columns = f"{id_col}, {_column_list(column_ddl)}"
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy}")
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.{id_col}")
+
+        for index_name, index_columns in indexes.items():
+            op.execute(f"CREATE INDEX {index_name} ON {table} ({index_columns})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (id_col, key, column_ddl, fk_name, fk_ddl, indexes) in TABLES.items():
+        partitioned = f"{table}_partitioned"
+        seq = f"{table}_{id_col}_seq"
+
+        for index_name in indexes:
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(
+            f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey "
+            f"TO {partitioned}_pkey"
+        )
+        if fk_name:
+            op.execute(
+                f"ALTER TABLE {partitioned} RENAME CONSTRAINT {fk_name} "
+                f"TO {partitioned}_fkey"
+            )
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+
+        constraints = f"PRIMARY KEY ({id_col})"
+        if fk_name:
+            constraints += f",\n    CONSTRAINT {fk_name} {fk_ddl}"
+        op.execute(
+            f"CREATE TABLE {table} (\n"
+            f"    {id_col} INTEGER DEFAULT nextval('{seq}'::regclass) NOT NULL,"
+            f"{column_ddl.rstrip()},\n    {constraints}\n)"
+        )
+
+        columns = f"{id_col}, {_column_list(column_ddl)}"
+        op.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {partitioned}"
+        )
+        # Dropping the parent drops every partition with it
+        op.execute(f"DROP TABLE {partitioned}")
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.{id_col}")
+
+        for index_name, index_columns in LEGACY_INDEXES[table].items():
+            op.execute(f"CREATE INDEX {index_name} ON {table} ({index_columns})")
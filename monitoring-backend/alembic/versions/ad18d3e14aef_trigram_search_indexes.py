@@ -0,0 +1,48 @@
+"""trigram search indexes
+
+Revision ID: ad18d3e14aef
+Revises: 7640f2d33b71
+Create Date: 2026-10-18 23:20:04.118532
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ad18d3e14aef"
+down_revision: Union[str, Sequence[str], None] = "7640f2d33b71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs served by the search service
+TRGM_COLUMNS = (
+    ("devices", "name"),
+    ("devices", "ip_address"),
+    ("switches", "name"),
+    ("switches", "ip_address"),
+    ("locations", "name"),
+    ("node_alerts", "message"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in TRGM_COLUMNS:
+        op.create_index(
+            f"ix_{table}_{column}_trgm",
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(TRGM_COLUMNS):
+        op.drop_index(f"ix_{table}_{column}_trgm", table_name=table)
+    # pg_trgm stays installed; other objects in the database may use it
@@ -0,0 +1,58 @@
+"""unique librenms alert id
+
+Revision ID: bc3fc9b1609b
+Revises: ad18d3e14aef
+Create Date: 2026-10-18 23:41:12.560118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "bc3fc9b1609b"
+down_revision: Union[str, Sequence[str], None] = "ad18d3e14aef"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Older duplicates keep their history but lose the LibreNMS link, the
+    # newest row stays the one the upsert updates. Without the link nothing
+    # would ever clear them, so they are cleared here
+    op.execute("""
+        UPDATE node_alerts
+        SET librenms_alert_id = NULL,
+            status = 'cleared',
+            cleared_at = coalesce(cleared_at, now())
+        WHERE alert_id IN (
+            SELECT alert_id FROM (
+                SELECT alert_id, row_number() OVER (
+                    PARTITION BY librenms_alert_id ORDER BY alert_id DESC
+                ) AS rn
+                FROM node_alerts
+                WHERE librenms_alert_id IS NOT NULL
+            ) ranked
+            WHERE rn > 1
+        )
+        """)
+    op.drop_index(op.f("ix_node_alerts_librenms_alert_id"), table_name="node_alerts")
+    op.create_index(
+        op.f("ix_node_alerts_librenms_alert_id"),
+        "node_alerts",
+        ["librenms_alert_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_node_alerts_librenms_alert_id"), table_name="node_alerts")
+    op.create_index(
+        op.f("ix_node_alerts_librenms_alert_id"),
+        "node_alerts",
+        ["librenms_alert_id"],
+        unique=False,
+    )
@@ -0,0 +1,228 @@
+"""unify node alerts
+
+Revision ID: f479a39240a2
+Revises: 30b064d715d8
+Create Date: 2026-10-18 22:53:30.494171
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f479a39240a2"
+down_revision: Union[str, Sequence[str], None] = "30b064d715d8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (old table, node key column, node table)
+OLD_ALERT_TABLES = (
+    ("alerts", "device_id", "devices"),
+    ("switch_alerts", "switch_id", "switches"),
+)
+
+# Columns the old tables and node_alerts have in common
+COMMON_COLUMNS = (
+    "librenms_alert_id, category_id, alert_type, severity, message, "
+    "assigned_to_user_id, acknowledged_at, resolution_note, created_at, "
+    "cleared_at, incident_counted"
+)
+
+# Same mapping as normalize_status: only known cleared states are cleared
+STATUS_EXPR = (
+    "CASE WHEN lower(trim(coalesce(status, ''))) IN "
+    "('0', 'cleared', 'resolved', 'closed', 'ok', 'recovered') "
+    "THEN 'cleared' ELSE 'active' END::alert_status"
+)
+
+
+def _backfill_node_alerts() -> None:
+    """Copy both alert tables into node_alerts, oldest first."""
+    op.execute(f"""
+        INSERT INTO node_alerts (device_id, switch_id, status, {COMMON_COLUMNS})
+        SELECT device_id, switch_id, status, {COMMON_COLUMNS}
+        FROM (
+            SELECT device_id, NULL::integer AS switch_id, {STATUS_EXPR} AS status,
+                   {COMMON_COLUMNS}
+            FROM alerts
+            UNION ALL
+            SELECT NULL::integer, switch_id, {STATUS_EXPR}, {COMMON_COLUMNS}
+            FROM switch_alerts
+        ) old
+        ORDER BY created_at
+        """)
+
+
+def _create_old_alert_table(table: str, key: str, node_table: str) -> None:
+    op.create_table(
+        table,
+        sa.Column("alert_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column(key, sa.Integer(), nullable=False),
+        sa.Column("librenms_alert_id", sa.Integer(), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("alert_type", sa.String(length=255), nullable=False),
+        sa.Column("severity", sa.String(length=255), nullable=True),
+        sa.Column("message", sa.String(length=255), nullable=True),
+        sa.Column("assigned_to_user_id", sa.Integer(), nullable=True),
+        sa.Column("acknowledged_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("resolution_note", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("cleared_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(length=255), nullable=True),
+        sa.Column("incident_counted", sa.Boolean(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(
+            ["assigned_to_user_id"], ["users.user_id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["category_id"], ["problem_categories.category_id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint([key], [f"{node_table}.{key}"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("alert_id"),
+    )
+    for column in (key, "librenms_alert_id", "severity", "created_at"):
+        op.create_index(f"ix_{table}_{column}", table, [column], unique=False)
+    op.create_index(f"ix_{table}_cleared_at", table, ["cleared_at"], unique=False)
+    op.create_index(f"ix_{table}_status", table, ["status"], unique=False)
+    op.create_index(
+        f"ix_{table}_incident_pending",
+        table,
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT incident_counted AND cleared_at IS NULL"),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "node_alerts",
+        sa.Column("alert_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("device_id", sa.Integer(), nullable=True),
+        sa.Column("switch_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "node_type",
+            sa.String(length=16),
+            sa.Computed(
+                "CASE WHEN device_id IS NOT NULL THEN 'device' ELSE 'switch' END",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "node_id",
+            sa.Integer(),
+            sa.Computed("coalesce(device_id, switch_id)", persisted=True),
+            nullable=True,
+        ),
+        sa.Column("librenms_alert_id", sa.Integer(), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("alert_type", sa.String(length=255), nullable=False),
+        sa.Column("severity", sa.String(length=255), nullable=True),
+        sa.Column("message", sa.String(length=255), nullable=True),
+        sa.Column("assigned_to_user_id", sa.Integer(), nullable=True),
+        sa.Column("acknowledged_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("resolution_note", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("cleared_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("active", "cleared", name="alert_status"),
+            server_default="active",
+            nullable=False,
+        ),
+        sa.Column("incident_counted", sa.Boolean(), server_default="0", nullable=False),
+        sa.CheckConstraint(
+            "num_nonnulls(device_id, switch_id) = 1", name="ck_node_alerts_one_node"
+        ),
+        sa.ForeignKeyConstraint(
+            ["assigned_to_user_id"], ["users.user_id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["category_id"], ["problem_categories.category_id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["device_id"], ["devices.device_id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["switch_id"], ["switches.switch_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("alert_id"),
+    )
+
+    # Copy before indexing so the backfill does not maintain the indexes row by row
+    _backfill_node_alerts()
+
+    op.create_index(
+        op.f("ix_node_alerts_cleared_at"), "node_alerts", ["cleared_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_node_alerts_created_at"), "node_alerts", ["created_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_node_alerts_device_id"), "node_alerts", ["device_id"], unique=False
+    )
+    op.create_index(
+        "ix_node_alerts_incident_pending",
+        "node_alerts",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT incident_counted AND cleared_at IS NULL"),
+    )
+    op.create_index(
+        op.f("ix_node_alerts_librenms_alert_id"),
+        "node_alerts",
+        ["librenms_alert_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_node_alerts_node_alert_type",
+        "node_alerts",
+        ["node_type", "node_id", "alert_type", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_node_alerts_severity"), "node_alerts", ["severity"], unique=False
+    )
+    op.create_index(
+        "ix_node_alerts_status_created_at",
+        "node_alerts",
+        ["status", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_node_alerts_switch_id"), "node_alerts", ["switch_id"], unique=False
+    )
+
+    for table, _, _ in OLD_ALERT_TABLES:
+        op.drop_table(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, key, node_table in OLD_ALERT_TABLES:
+        _create_old_alert_table(table, key, node_table)
+        op.execute(f"""
+            INSERT INTO {table} (alert_id, {key}, status, {COMMON_COLUMNS})
+            SELECT alert_id, {key}, status::text, {COMMON_COLUMNS}
+            FROM node_alerts
+            WHERE {key} IS NOT NULL
+            """)
+        op.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'alert_id'), "
+            f"coalesce((SELECT max(alert_id) FROM {table}), 0) + 1, false)"
+        )
+
+    op.drop_table("node_alerts")
+    sa.Enum(name="alert_status").drop(op.get_bind(), checkfirst=True)
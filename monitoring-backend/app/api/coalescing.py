@@ -0,0 +1,184 @@
+"""
+Request coalescing (singleflight) for expensive read endpoints
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from app.core.security import decode_access_token
+
+# Paths whose concurrent identical GETs share one execution
+COALESCED_PATHS = (
+    "/api/v1/dashboard/stats",
+    "/api/v1/dashboard/traffic",
+    "/api/v1/dashboard/uptime-trend",
+    "/api/v1/dashboard/availability",
+    "/api/v1/map/topology",
+    "/api/v1/devices/with-locations",
+    "/api/v1/switches/with-locations",
+)
+
+# Request headers that change the response and so must be part of the key
+VARY_HEADERS = (b"if-none-match",)
+
+CoalesceKey = Tuple[str, str, str, Tuple[bytes, ...]]
+
+# path -> counters since startup
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _path_stats(path: str) -> Dict[str, int]:
+    return _stats.setdefault(
+        path, {"executed": 0, "coalesced": 0, "cache_hits": 0, "fallbacks": 0}
+    )
+
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    paths = {}
+    for path, counters in _stats.items():
+        served = counters["executed"] + counters["coalesced"] + counters["cache_hits"]
+        paths[path] = {
+            **counters,
+            "shared_ratio": (
+                round((served - counters["executed"]) / served, 3) if served else 0.0
+            ),
+        }
+    return {"paths": paths}
+
+
+def _caller_role(headers: Dict[bytes, bytes]) -> Optional[str]:
+    """
+    Role used in the key. Tokens issued before the role claim existed fall
+    back to the username, which never shares across users. None means the
+    token is invalid and the request should not be coalesced.
+    """
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return "anonymous"
+
+    payload = decode_access_token(token.strip())
+    if payload is None:
+        return None
+    if payload.get("role"):
+        return f"role:{payload['role']}"
+    return f"user:{payload.get('sub')}"
+
+
+class RequestCoalescingMiddleware:
+    """
+    While a GET on one of `paths` is running, identical requests (same
+    path, normalized query, caller role and validators) wait for it and
+    receive a copy of its response instead of running the endpoint again.
+    With `ttl_seconds` > 0 successful responses are also replayed for that
+    long after they finish.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = (), ttl_seconds: float = 0):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.ttl_seconds = ttl_seconds
+        self._in_flight: Dict[CoalesceKey, asyncio.Future] = {}
+        self._recent: Dict[CoalesceKey, Tuple[float, List[dict]]] = {}
+
+    def _key(self, scope) -> Optional[CoalesceKey]:
+        headers = dict(scope["headers"])
+        role = _caller_role(headers)
+        if role is None:
+            return None
+
+        query = parse_qsl(scope["query_string"].decode("latin-1"), True)
+        return (
+            scope["path"],
+            urlencode(sorted(query)),
+            role,
+            tuple(headers.get(name, b"") for name in VARY_HEADERS),
+        )
+
+    def _cached(self, key: CoalesceKey) -> Optional[List[dict]]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._recent[key]
+            return None
+        return entry[1]
+
+    def _remember(self, key: CoalesceKey, messages: List[dict]) -> None:
+        now = time.monotonic()
+        for stale in [k for k, (exp, _) in self._recent.items() if exp <= now]:
+            del self._recent[stale]
+        self._recent[key] = (now + self.ttl_seconds, messages)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = _path_stats(scope["path"])
+
+        if self.ttl_seconds > 0:
+            cached = self._cached(key)
+            if cached is not None:
+                stats["cache_hits"] += 1
+                await _replay(cached, send)
+                return
+
+        leader = self._in_flight.get(key)
+        if leader is not None:
+            try:
+                messages = await asyncio.shield(leader)
+            except Exception:
+                # The leader failed or went away; run this request on its own
+                stats["fallbacks"] += 1
+                await self.app(scope, receive, send)
+                return
+            stats["coalesced"] += 1
+            await _replay(messages, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        stats["executed"] += 1
+        messages: List[dict] = []
+
+        async def capture(message):
+            messages.append(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            del self._in_flight[key]
+            if _complete(messages):
+                future.set_result(messages)
+            else:
+                future.set_exception(RuntimeError("coalesced request failed"))
+                # Retrieve it here so an unobserved failure is not logged
+                future.exception()
+
+        if self.ttl_seconds > 0 and messages[0]["status"] == 200:
+            self._remember(key, messages)
+
+
+def _complete(messages: List[dict]) -> bool:
+    return bool(messages) and (
+        messages[-1]["type"] == "http.response.body"
+        and not messages[-1].get("more_body", False)
+    )
+
+
+async def _replay(messages: List[dict], send) -> None:
+    for message in messages:
+        await send(message)
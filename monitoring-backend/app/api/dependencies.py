@@ -2,7 +2,7 @@
 Shared dependencies for API endpoints
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
@@ -10,6 +10,7 @@ from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
+from app.services.resource_versions import resource_versions
 
 # OAuth2 scheme - extracts token from Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -60,3 +61,31 @@ def require_technician_or_admin(current_user: User = Depends(get_current_user))
             detail="Technician or Admin access required.",
         )
     return current_user
+
+
+def etag_guard(*resources: str):
+    """
+    Dependency answering If-None-Match with 304 from the version counters
+    of `resources`, before the endpoint queries or serializes anything.
+    The ETag is taken before the read, so a concurrent write can only make
+    it older than the body, never newer.
+    """
+
+    def check(request: Request, response: Response) -> None:
+        etag = resource_versions.etag(*resources)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {
+                tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+            }
+            if etag in candidates or "*" in candidates:
+                raise HTTPException(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Cache-Control": "no-cache"},
+                )
+
+        response.headers["ETag"] = etag
+        # Let clients keep the body but revalidate on every use
+        response.headers["Cache-Control"] = "no-cache"
+
+    return check
@@ -1,5 +1,7 @@
+import base64
+import json
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from app.api.dependencies import (
     get_current_user,
@@ -7,65 +9,96 @@ from app.api.dependencies import (
     require_technician_or_admin,
 )
 from app.core.database import get_db
-from app.models import Alert, Device, Location, Switch, SwitchAlert, User
+from app.models import Device, Location, NodeAlert, Switch, User
+from app.models.alert import ALERT_STATUSES
 from app.schemas.alert import (
     AlertBulkDeleteResponse,
     AlertPageResponse,
     AlertResponse,
+    AlertSummaryResponse,
     AlertUpdate,
 )
 from app.services.locations_service import apply_location_name_filter
+from app.services.monitoring.active_alerts import ActiveAlertSet
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import false, or_
+from sqlalchemy import false, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
+# Below this planner estimate an exact count is cheap enough to run anyway
+ALERT_COUNT_EXACT_BELOW = 10000
 
-def _alert_to_response_dict(alert_obj: Any) -> Dict[str, Any]:
-    dev_name = " - "
-    loc_name = " - "
+AlertCursor = Tuple[datetime, int]
 
-    if hasattr(alert_obj, "device") and alert_obj.device:
-        dev_name = alert_obj.device.name
-        if alert_obj.device.location:
-            loc_name = alert_obj.device.location.name
-    elif hasattr(alert_obj, "switch") and alert_obj.switch:
-        dev_name = alert_obj.switch.name
-        if alert_obj.switch.location:
-            loc_name = alert_obj.switch.location.name
+# (response key, grouped column) of each /alerts/summary facet
+ALERT_FACETS = (
+    ("by_status", NodeAlert.status),
+    ("by_severity", NodeAlert.severity),
+    ("by_alert_type", NodeAlert.alert_type),
+    ("by_location", Location.name),
+)
 
-    raw_status = getattr(alert_obj, "status", "")
-    final_status = "active" if str(raw_status) == "1" else raw_status
 
-    resolved_by_full_name = None
-    if getattr(alert_obj, "assigned_user", None):
-        resolved_by_full_name = getattr(alert_obj.assigned_user, "full_name", None)
+def _node_location_join(query):
+    return (
+        query.outerjoin(Device, NodeAlert.device_id == Device.device_id)
+        .outerjoin(Switch, NodeAlert.switch_id == Switch.switch_id)
+        .outerjoin(
+            Location,
+            func.coalesce(Device.location_id, Switch.location_id)
+            == Location.location_id,
+        )
+    )
 
-    return {
-        "alert_id": getattr(alert_obj, "alert_id", None),
-        "device_id": getattr(alert_obj, "device_id", None),
-        "switch_id": getattr(alert_obj, "switch_id", None),
-        "device_name": dev_name,
-        "location_name": loc_name,
-        "librenms_alert_id": getattr(alert_obj, "librenms_alert_id", None),
-        "category_id": getattr(alert_obj, "category_id", None),
-        "alert_type": getattr(alert_obj, "alert_type", ""),
-        "severity": getattr(alert_obj, "severity", ""),
-        "message": getattr(alert_obj, "message", ""),
-        "status": final_status,
-        "assigned_to_user_id": getattr(alert_obj, "assigned_to_user_id", None),
-        "resolved_by_full_name": resolved_by_full_name,
-        "acknowledged_at": getattr(alert_obj, "acknowledged_at", None),
-        "resolution_note": getattr(alert_obj, "resolution_note", None),
-        "created_at": getattr(alert_obj, "created_at", None),
-        "cleared_at": getattr(alert_obj, "cleared_at", None),
-    }
+
+def _alert_rows_query(db: Session):
+    """
+    Alerts projected to the response columns, joined to the node name,
+    location name and assigning user in the same SELECT so no ORM instance
+    or lazy load is involved.
+    """
+    query = db.query(
+        NodeAlert.alert_id.label("alert_id"),
+        NodeAlert.device_id.label("device_id"),
+        NodeAlert.switch_id.label("switch_id"),
+        func.coalesce(Device.name, Switch.name).label("device_name"),
+        Location.name.label("location_name"),
+        NodeAlert.librenms_alert_id.label("librenms_alert_id"),
+        NodeAlert.category_id.label("category_id"),
+        NodeAlert.alert_type.label("alert_type"),
+        NodeAlert.severity.label("severity"),
+        NodeAlert.message.label("message"),
+        NodeAlert.status.label("status"),
+        NodeAlert.assigned_to_user_id.label("assigned_to_user_id"),
+        User.full_name.label("resolved_by_full_name"),
+        NodeAlert.acknowledged_at.label("acknowledged_at"),
+        NodeAlert.resolution_note.label("resolution_note"),
+        NodeAlert.created_at.label("created_at"),
+        NodeAlert.cleared_at.label("cleared_at"),
+    ).select_from(NodeAlert)
+    return _node_location_join(query).outerjoin(
+        User, NodeAlert.assigned_to_user_id == User.user_id
+    )
+
+
+def _alert_row_to_dict(row) -> Dict[str, Any]:
+    item = row._asdict()
+    if item["device_name"] is None:
+        item["device_name"] = " - "
+    if item["location_name"] is None:
+        item["location_name"] = " - "
+    return item
+
+
+def _fetch_alert(db: Session, alert_id: int) -> Optional[Dict[str, Any]]:
+    row = _alert_rows_query(db).filter(NodeAlert.alert_id == alert_id).first()
+    return _alert_row_to_dict(row) if row else None
 
 
 def _apply_alert_filters(
-    device_query,
-    switch_query,
+    query,
     db: Session,
     *,
     status_filter: Optional[str],
@@ -75,46 +108,82 @@ def _apply_alert_filters(
     location_name: Optional[str],
 ):
     if status_filter:
-        if status_filter == "active":
-            device_query = device_query.filter(
-                or_(Alert.status == "active", Alert.status == "1")
-            )
-            switch_query = switch_query.filter(
-                or_(SwitchAlert.status == "active", SwitchAlert.status == "1")
-            )
+        if status_filter in ALERT_STATUSES:
+            query = query.filter(NodeAlert.status == status_filter)
         else:
-            device_query = device_query.filter(Alert.status == status_filter)
-            switch_query = switch_query.filter(SwitchAlert.status == status_filter)
+            query = query.filter(false())
 
     if severity:
-        device_query = device_query.filter(Alert.severity == severity)
-        switch_query = switch_query.filter(SwitchAlert.severity == severity)
+        query = query.filter(NodeAlert.severity == severity)
 
     if start_date:
-        device_query = device_query.filter(Alert.created_at >= start_date)
-        switch_query = switch_query.filter(SwitchAlert.created_at >= start_date)
+        query = query.filter(NodeAlert.created_at >= start_date)
 
     if end_date:
-        device_query = device_query.filter(Alert.created_at <= end_date)
-        switch_query = switch_query.filter(SwitchAlert.created_at <= end_date)
+        query = query.filter(NodeAlert.created_at <= end_date)
 
     if location_name:
-        loc_q = db.query(Location.location_id)
-        loc_q = apply_location_name_filter(loc_q, location_name)
-        location_ids = [row[0] for row in loc_q.distinct().all()]
-
-        if location_ids:
-            device_query = device_query.join(Device).filter(
-                Device.location_id.in_(location_ids)
-            )
-            switch_query = switch_query.join(Switch).filter(
-                Switch.location_id.in_(location_ids)
+        # Resolved inside the same statement; correlate(None) keeps the
+        # outer query's own Location join out of the subquery
+        location_ids = (
+            apply_location_name_filter(db.query(Location.location_id), location_name)
+            .scalar_subquery()
+            .correlate(None)
+        )
+        # Semi-joins, so queries that already join the node still work
+        query = query.filter(
+            or_(
+                NodeAlert.device_id.in_(
+                    select(Device.device_id).where(Device.location_id.in_(location_ids))
+                ),
+                NodeAlert.switch_id.in_(
+                    select(Switch.switch_id).where(Switch.location_id.in_(location_ids))
+                ),
             )
-        else:
-            device_query = device_query.filter(false())
-            switch_query = switch_query.filter(false())
+        )
 
-    return device_query, switch_query
+    return query
+
+
+def _encode_cursor(created_at: datetime, alert_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), alert_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> AlertCursor:
+    try:
+        created_at, alert_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(alert_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _estimate_rows(db: Session, query) -> int:
+    """Planner row estimate for `query`, read from EXPLAIN without running it."""
+    compiled = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}
+    )
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count_alerts(db: Session, query, mode: str) -> Tuple[Optional[int], bool]:
+    """Total matching alerts as (count, is_estimate); None when not wanted."""
+    if mode == "none":
+        return None, False
+
+    if mode == "estimate":
+        estimate = _estimate_rows(db, query)
+        if estimate >= ALERT_COUNT_EXACT_BELOW:
+            return estimate, True
+
+    return query.order_by(None).count(), False
 
 
 @router.get("/", response_model=AlertPageResponse)
@@ -126,14 +195,14 @@ def get_all_alerts(
     location_name: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page; overrides page"
+    ),
+    count: Literal["exact", "estimate", "none"] = Query("exact"),
     db: Session = Depends(get_db),
 ):
-    device_query = db.query(Alert)
-    switch_query = db.query(SwitchAlert)
-
-    device_query, switch_query = _apply_alert_filters(
-        device_query,
-        switch_query,
+    filtered = _apply_alert_filters(
+        db.query(NodeAlert),
         db,
         status_filter=status_filter,
         severity=severity,
@@ -142,24 +211,42 @@ def get_all_alerts(
         location_name=location_name,
     )
 
-    all_alerts = []
-    for a in device_query:
-        all_alerts.append(_alert_to_response_dict(a))
-    for a in switch_query:
-        all_alerts.append(_alert_to_response_dict(a))
-
-    all_alerts.sort(key=lambda x: x.get("created_at") or "", reverse=True)
+    # Page keys first, so the joins only run for the rows returned
+    keys = filtered.with_entities(NodeAlert.alert_id, NodeAlert.created_at).order_by(
+        NodeAlert.created_at.desc(), NodeAlert.alert_id.desc()
+    )
+    if cursor:
+        c_time, c_id = _decode_cursor(cursor)
+        keys = keys.filter(
+            tuple_(NodeAlert.created_at, NodeAlert.alert_id) < tuple_(c_time, c_id)
+        )
+    else:
+        keys = keys.offset((page - 1) * limit)
+    keys = keys.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = _encode_cursor(keys[-1].created_at, keys[-1].alert_id)
+
+    items = []
+    if keys:
+        rows = (
+            _alert_rows_query(db)
+            .filter(NodeAlert.alert_id.in_([k.alert_id for k in keys]))
+            .order_by(NodeAlert.created_at.desc(), NodeAlert.alert_id.desc())
+        )
+        items = [_alert_row_to_dict(row) for row in rows]
 
-    total = len(all_alerts)
-    start = (page - 1) * limit
-    end = start + limit
-    items = all_alerts[start:end]
+    total, total_is_estimate = _count_alerts(db, filtered, count)
 
     return {
         "items": items,
         "total": total,
+        "total_is_estimate": total_is_estimate,
         "page": page,
         "page_size": limit,
+        "next_cursor": next_cursor,
     }
 
 
@@ -171,12 +258,8 @@ def get_active_alerts(
     ),
     db: Session = Depends(get_db),
 ):
-    device_query = db.query(Alert)
-    switch_query = db.query(SwitchAlert)
-
-    device_query, switch_query = _apply_alert_filters(
-        device_query,
-        switch_query,
+    query = _apply_alert_filters(
+        _alert_rows_query(db),
         db,
         status_filter="active",
         severity=severity,
@@ -184,12 +267,59 @@ def get_active_alerts(
         end_date=None,
         location_name=location_name,
     )
+    query = query.order_by(NodeAlert.created_at.desc(), NodeAlert.alert_id.desc())
+    return [_alert_row_to_dict(row) for row in query]
 
-    results = [
-        _alert_to_response_dict(a) for a in device_query.all() + switch_query.all()
-    ]
-    results.sort(key=lambda x: x.get("created_at") or "", reverse=True)
-    return results
+
+@router.get("/summary", response_model=AlertSummaryResponse)
+def get_alert_summary(
+    status_filter: Optional[str] = Query(None, description="Filter alerts by status"),
+    severity: Optional[str] = Query(None, description="Filter by severity"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    location_name: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Alert counts per status, severity, alert type and location for a filter
+    set, all from one GROUPING SETS query. grouping() has a bit per facet
+    column, set when the row is not grouped by it; the empty set gives the
+    total.
+    """
+    columns = [column for _, column in ALERT_FACETS]
+    query = _node_location_join(
+        db.query(
+            *columns,
+            func.grouping(*columns).label("grouped"),
+            func.count().label("count"),
+        ).select_from(NodeAlert)
+    )
+    query = _apply_alert_filters(
+        query,
+        db,
+        status_filter=status_filter,
+        severity=severity,
+        start_date=start_date,
+        end_date=end_date,
+        location_name=location_name,
+    ).group_by(func.grouping_sets(*[tuple_(c) for c in columns], tuple_()))
+
+    summary: Dict[str, Any] = {key: {} for key, _ in ALERT_FACETS}
+    summary["total"] = 0
+    all_bits = (1 << len(columns)) - 1
+    facet_by_bits = {
+        all_bits ^ (1 << (len(columns) - 1 - i)): (i, key)
+        for i, (key, _) in enumerate(ALERT_FACETS)
+    }
+    for row in query:
+        if row.grouped == all_bits:
+            summary["total"] = row.count
+            continue
+        i, key = facet_by_bits[row.grouped]
+        value = row[i]
+        summary[key][" - " if value is None else str(value)] = row.count
+
+    return summary
 
 
 @router.get("/locations", response_model=List[str])
@@ -197,12 +327,8 @@ def get_alert_locations(
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     db: Session = Depends(get_db),
 ):
-    device_query = db.query(Alert)
-    switch_query = db.query(SwitchAlert)
-
-    device_query, switch_query = _apply_alert_filters(
-        device_query,
-        switch_query,
+    query = _apply_alert_filters(
+        _alert_rows_query(db),
         db,
         status_filter=status_filter,
         severity=None,
@@ -211,24 +337,8 @@ def get_alert_locations(
         location_name=None,
     )
 
-    device_locations = (
-        device_query.join(Device)
-        .join(Location)
-        .with_entities(Location.name)
-        .distinct()
-        .all()
-    )
-
-    switch_locations = (
-        switch_query.join(Switch)
-        .join(Location)
-        .with_entities(Location.name)
-        .distinct()
-        .all()
-    )
-
-    names = {name for (name,) in device_locations + switch_locations if name}
-    return sorted(names)
+    names = query.with_entities(Location.name).distinct().all()
+    return sorted(name for (name,) in names if name)
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
@@ -237,13 +347,9 @@ def get_alert(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    alert = db.query(Alert).filter(Alert.alert_id == alert_id).first()
-    if alert:
-        return _alert_to_response_dict(alert)
-
-    alert = db.query(SwitchAlert).filter(SwitchAlert.alert_id == alert_id).first()
+    alert = _fetch_alert(db, alert_id)
     if alert:
-        return _alert_to_response_dict(alert)
+        return alert
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -258,9 +364,7 @@ def update_alert(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_technician_or_admin),
 ):
-    alert = db.query(Alert).filter(Alert.alert_id == alert_id).first()
-    if not alert:
-        alert = db.query(SwitchAlert).filter(SwitchAlert.alert_id == alert_id).first()
+    alert = db.query(NodeAlert).filter(NodeAlert.alert_id == alert_id).first()
 
     if not alert:
         raise HTTPException(
@@ -276,8 +380,8 @@ def update_alert(
         alert.resolution_note = update_data["resolution_note"]
     db.add(alert)
     db.commit()
-    db.refresh(alert)
-    return _alert_to_response_dict(alert)
+
+    return _fetch_alert(db, alert_id)
 
 
 @router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -286,9 +390,7 @@ def delete_alert(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    alert = db.query(Alert).filter(Alert.alert_id == alert_id).first()
-    if not alert:
-        alert = db.query(SwitchAlert).filter(SwitchAlert.alert_id == alert_id).first()
+    alert = db.query(NodeAlert).filter(NodeAlert.alert_id == alert_id).first()
 
     if not alert:
         raise HTTPException(
@@ -298,6 +400,7 @@ def delete_alert(
 
     db.delete(alert)
     db.commit()
+    ActiveAlertSet.discard([alert_id])
 
     return None
 
@@ -314,12 +417,8 @@ def delete_alerts_bulk(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    device_query = db.query(Alert.alert_id)
-    switch_query = db.query(SwitchAlert.alert_id)
-
-    device_query, switch_query = _apply_alert_filters(
-        device_query,
-        switch_query,
+    query = _apply_alert_filters(
+        db.query(NodeAlert),
         db,
         status_filter=status_filter,
         severity=severity,
@@ -328,22 +427,7 @@ def delete_alerts_bulk(
         location_name=location_name,
     )
 
-    device_ids = [row.alert_id for row in device_query.all()]
-    switch_ids = [row.alert_id for row in switch_query.all()]
-
-    deleted = 0
-    if device_ids:
-        deleted += (
-            db.query(Alert)
-            .filter(Alert.alert_id.in_(device_ids))
-            .delete(synchronize_session=False)
-        )
-    if switch_ids:
-        deleted += (
-            db.query(SwitchAlert)
-            .filter(SwitchAlert.alert_id.in_(switch_ids))
-            .delete(synchronize_session=False)
-        )
-
+    deleted = query.delete(synchronize_session=False)
     db.commit()
+    ActiveAlertSet.reload(db)
     return {"deleted": deleted}
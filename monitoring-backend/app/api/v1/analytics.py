@@ -1,94 +1,197 @@
 from collections import defaultdict
-from datetime import datetime
-from typing import List, Optional, TypedDict
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, TypedDict
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import Device, Switch
 from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
 from app.schemas.analytic import AnalyticsDataPoint
 from app.services.locations_service import resolve_location_ids
-from fastapi import APIRouter, Depends
+from app.services.metrics.archive import read_bucket_sums
+from app.services.metrics.export import iter_bandwidth_export
+from app.services.metrics.rollups import ROLLUP_UNITS, plan_sources, utc_trunc
+from app.utils.downsample import lttb_multi_indices
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+# node_type -> (node model, node id, raw bandwidth model, raw node id)
+NODE_SOURCES = {
+    "device": (Device, Device.device_id, DeviceBandwidth, DeviceBandwidth.device_id),
+    "switch": (Switch, Switch.switch_id, SwitchBandwidth, SwitchBandwidth.switch_id),
+}
 
-class HourMetrics(TypedDict):
+
+class BucketMetrics(TypedDict):
     in_mbps: float
     out_mbps: float
     latencies: List[float]
 
 
+def _bucket_sums_query(
+    db: Session,
+    node_type: str,
+    source,
+    unit: str,
+    lower: datetime,
+    upper: datetime,
+    inclusive: bool = True,
+):
+    """
+    Per-node sums for each bucket, read from raw rows when `source` is None
+    or from a rollup table otherwise. Sums rather than averages so pieces
+    of the same bucket coming from different sources can be merged.
+    """
+    node_model, node_id, raw_model, raw_node_id = NODE_SOURCES[node_type]
+
+    if source is None:
+        bucket = utc_trunc(unit, raw_model.timestamp).label("bucket")
+        return (
+            db.query(
+                bucket,
+                raw_node_id.label("node_id"),
+                func.sum(raw_model.in_usage_mbps).label("sum_in"),
+                func.sum(raw_model.out_usage_mbps).label("sum_out"),
+                func.count().label("samples"),
+                func.sum(raw_model.latency_ms).label("sum_latency"),
+                func.count(raw_model.latency_ms).label("latency_samples"),
+            )
+            .join(node_model, node_id == raw_node_id)
+            .filter(raw_model.timestamp >= lower)
+            .filter(
+                raw_model.timestamp <= upper
+                if inclusive
+                else raw_model.timestamp < upper
+            )
+            .group_by(bucket, raw_node_id)
+        )
+
+    if ROLLUP_UNITS[source] == unit:
+        bucket = source.bucket.label("bucket")
+    else:
+        bucket = utc_trunc(unit, source.bucket).label("bucket")
+    return (
+        db.query(
+            bucket,
+            source.node_id.label("node_id"),
+            func.sum(source.avg_in_mbps * source.sample_count).label("sum_in"),
+            func.sum(source.avg_out_mbps * source.sample_count).label("sum_out"),
+            func.sum(source.sample_count).label("samples"),
+            func.sum(source.avg_latency_ms * source.latency_samples).label(
+                "sum_latency"
+            ),
+            func.sum(source.latency_samples).label("latency_samples"),
+        )
+        .join(node_model, node_id == source.node_id)
+        .filter(source.node_type == node_type)
+        .filter(source.bucket >= lower)
+        .filter(source.bucket < upper)
+        .group_by(bucket, source.node_id)
+    )
+
+
+def _filter_nodes(
+    query, node_type: str, loc_ids: List[int], device_type: Optional[str]
+):
+    query = query.filter(NODE_SOURCES[node_type][0].location_id.in_(loc_ids))
+    if device_type and node_type == "device":
+        query = query.filter(func.lower(Device.device_type) == device_type.lower())
+    return query
+
+
 @router.get("/history", response_model=list[AnalyticsDataPoint])
 def get_historical_metrics(
     start_date: datetime,
     end_date: datetime,
     location_name: str,
     device_type: Optional[str] = None,
+    max_points: Optional[int] = Query(
+        None, ge=10, description="Downsample to at most this many points (LTTB)"
+    ),
     db: Session = Depends(get_db),
 ):
     loc_ids = resolve_location_ids(db, None, location_name)
     if not loc_ids or loc_ids == [-1]:
         return []
 
-    dev_hour = func.date_trunc("hour", DeviceBandwidth.timestamp).label("hour")
-    dev_query = (
-        db.query(
-            dev_hour,
-            DeviceBandwidth.device_id,
-            func.avg(DeviceBandwidth.in_usage_mbps).label("avg_in"),
-            func.avg(DeviceBandwidth.out_usage_mbps).label("avg_out"),
-            func.avg(DeviceBandwidth.latency_ms).label("avg_latency"),
-        )
-        .join(Device, Device.device_id == DeviceBandwidth.device_id)
-        .filter(Device.location_id.in_(loc_ids))
-        .filter(DeviceBandwidth.timestamp >= start_date)
-        .filter(DeviceBandwidth.timestamp <= end_date)
-    )
-
-    sw_hour = func.date_trunc("hour", SwitchBandwidth.timestamp).label("hour")
-    sw_query = (
-        db.query(
-            sw_hour,
-            SwitchBandwidth.switch_id,
-            func.avg(SwitchBandwidth.in_usage_mbps).label("avg_in"),
-            func.avg(SwitchBandwidth.out_usage_mbps).label("avg_out"),
-            func.avg(SwitchBandwidth.latency_ms).label("avg_latency"),
-        )
-        .join(Switch, Switch.switch_id == SwitchBandwidth.switch_id)
-        .filter(Switch.location_id.in_(loc_ids))
-        .filter(SwitchBandwidth.timestamp >= start_date)
-        .filter(SwitchBandwidth.timestamp <= end_date)
-    )
-
+    node_types = list(NODE_SOURCES)
     if device_type:
-        if device_type.lower() == "switch":
-            dev_query = dev_query.filter(Device.device_id == -1)  # Force 0 devices
-        else:
-            dev_query = dev_query.filter(
-                func.lower(Device.device_type) == device_type.lower()
+        node_types = ["switch"] if device_type.lower() == "switch" else ["device"]
+
+    # Watermarks and bucket floors are aware, so naive query dates are UTC
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
+    # Long ranges come back as daily points, shorter ones as hourly points
+    unit, pieces = plan_sources(db, start_date, end_date)
+
+    # (bucket, node_type, node_id) -> [sum_in, sum_out, samples, sum_lat, lat_n]
+    node_sums: dict[tuple, list] = defaultdict(lambda: [0.0, 0.0, 0, 0.0, 0])
+    for node_type in node_types:
+        node_id, raw_model = NODE_SOURCES[node_type][1:3]
+        for source, lower, upper in pieces:
+            # Only the requested end is inclusive, inner boundaries belong
+            # to the next piece
+            inclusive = upper >= end_date
+            query = _bucket_sums_query(
+                db, node_type, source, unit, lower, upper, inclusive
             )
-            sw_query = sw_query.filter(Switch.switch_id == -1)  # Force 0 switches
-
-    dev_results = dev_query.group_by(dev_hour, DeviceBandwidth.device_id).all()
-    sw_results = sw_query.group_by(sw_hour, SwitchBandwidth.switch_id).all()
-
-    merged_data: dict[datetime, HourMetrics] = defaultdict(
+            rows = _filter_nodes(query, node_type, loc_ids, device_type).all()
+
+            if source is None and settings.HISTORY_ARCHIVE_ENABLED:
+                # Raw samples older than the hot window live in the archive
+                ids = _filter_nodes(db.query(node_id), node_type, loc_ids, device_type)
+                rows += read_bucket_sums(
+                    raw_model.__tablename__,
+                    unit,
+                    lower,
+                    upper,
+                    [i for (i,) in ids.all()],
+                    inclusive,
+                )
+
+            for row in rows:
+                sums = node_sums[(row.bucket, node_type, row.node_id)]
+                sums[0] += row.sum_in or 0.0
+                sums[1] += row.sum_out or 0.0
+                sums[2] += row.samples or 0
+                sums[3] += row.sum_latency or 0.0
+                sums[4] += row.latency_samples or 0
+
+    merged_data: dict[datetime, BucketMetrics] = defaultdict(
         lambda: {"in_mbps": 0.0, "out_mbps": 0.0, "latencies": []}
     )
 
-    for row in dev_results + sw_results:
-        hour = row.hour
-        merged_data[hour]["in_mbps"] += row.avg_in or 0.0
-        merged_data[hour]["out_mbps"] += row.avg_out or 0.0
-
-        if row.avg_latency is not None:
-            merged_data[hour]["latencies"].append(row.avg_latency)
+    for (bucket, _, _), (sum_in, sum_out, samples, sum_lat, lat_n) in node_sums.items():
+        if not samples:
+            continue
+        merged_data[bucket]["in_mbps"] += sum_in / samples
+        merged_data[bucket]["out_mbps"] += sum_out / samples
+
+        if lat_n:
+            merged_data[bucket]["latencies"].append(sum_lat / lat_n)
+
+    buckets = sorted(merged_data.keys())
+    if max_points and len(buckets) > max_points:
+        kept = lttb_multi_indices(
+            [b.timestamp() for b in buckets],
+            [
+                [merged_data[b]["in_mbps"] for b in buckets],
+                [merged_data[b]["out_mbps"] for b in buckets],
+            ],
+            max_points,
+        )
+        buckets = [buckets[i] for i in kept]
 
     results = []
-    for hour in sorted(merged_data.keys()):
-        data = merged_data[hour]
+    for bucket in buckets:
+        data = merged_data[bucket]
         avg_lat = (
             sum(data["latencies"]) / len(data["latencies"])
             if data["latencies"]
@@ -97,7 +200,7 @@ def get_historical_metrics(
 
         results.append(
             AnalyticsDataPoint(
-                timestamp=hour,
+                timestamp=bucket,
                 inbound_mbps=round(data["in_mbps"], 2),
                 outbound_mbps=round(data["out_mbps"], 2),
                 latency_ms=round(avg_lat, 2) if avg_lat else None,
@@ -105,3 +208,38 @@ def get_historical_metrics(
         )
 
     return results
+
+
+@router.get("/export")
+def export_bandwidth_history(
+    start_date: datetime,
+    end_date: datetime,
+    location_name: Optional[str] = None,
+    node_type: Optional[Literal["device", "switch"]] = None,
+    node_id: Optional[int] = None,
+    format: Literal["csv", "ndjson"] = "csv",
+    compress: bool = Query(False, description="gzip the response on the fly"),
+    db: Session = Depends(get_db),
+):
+    loc_ids = resolve_location_ids(db, None, location_name)
+    node_types = [node_type] if node_type else list(NODE_SOURCES)
+
+    filename = f"bandwidth_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        iter_bandwidth_export(
+            node_types,
+            start_date,
+            end_date,
+            location_ids=loc_ids,
+            node_id=node_id,
+            fmt=format,
+            compress=compress,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
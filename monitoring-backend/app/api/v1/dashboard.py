@@ -1,17 +1,31 @@
-from typing import Optional
+import json
+from datetime import datetime
+from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import create_session, get_db
 from app.services.dashboard_service import (
+    build_availability,
     build_dashboard_stats,
+    build_dashboard_stats_from_cache,
     build_dashboard_traffic,
+    build_dashboard_traffic_from_cache,
     build_uptime_trend,
 )
 from app.services.locations_service import resolve_location_ids
-from fastapi import APIRouter, Depends, Query
+from app.services.metrics.dashboard_cache import DashboardSummaryCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Upper bound on the buckets of an ad-hoc availability range (per node)
+AVAILABILITY_MAX_BUCKETS = 2000
+
+# Comment line sent on an idle traffic stream so proxies keep it open
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/stats")
 async def get_dashboard_summary(
@@ -22,6 +36,14 @@ async def get_dashboard_summary(
     db: Session = Depends(get_db),
 ):
     loc_ids = resolve_location_ids(db, location_id, location_name)
+    cached = build_dashboard_stats_from_cache(
+        location_ids=loc_ids,
+        top_down_window=top_down_window,
+        device_type=device_type,
+    )
+    if cached is not None:
+        return cached
+
     return await build_dashboard_stats(
         db=db,
         location_ids=loc_ids,
@@ -38,11 +60,68 @@ async def get_dashboard_traffic(
     db: Session = Depends(get_db),
 ):
     loc_ids = resolve_location_ids(db, location_id, location_name)
+    cached = build_dashboard_traffic_from_cache(
+        location_ids=loc_ids, device_type=device_type
+    )
+    if cached is not None:
+        return cached
+
     return await build_dashboard_traffic(
         db=db, location_ids=loc_ids, device_type=device_type
     )
 
 
+def _resolve_location_ids_once(
+    location_id: Optional[int], location_name: Optional[str]
+) -> Optional[List[int]]:
+    db = create_session()
+    try:
+        return resolve_location_ids(db, location_id, location_name)
+    finally:
+        db.close()
+
+
+@router.get("/traffic/stream")
+async def stream_dashboard_traffic(
+    location_id: Optional[int] = Query(None),
+    location_name: Optional[str] = Query(None),
+    device_type: Optional[str] = Query(None),
+):
+    """
+    Server-sent events with the /dashboard/traffic payload for the given
+    filters. An event is pushed after a status poller tick only when the
+    aggregate changed, so clients can drop their polling timer.
+    """
+    # Its own short session: a request-scoped one would hold a pooled
+    # connection for as long as the stream stays open
+    loc_ids = await run_in_threadpool(
+        _resolve_location_ids_once, location_id, location_name
+    )
+
+    async def events():
+        last_sent = None
+        while True:
+            payload = build_dashboard_traffic_from_cache(
+                location_ids=loc_ids, device_type=device_type
+            )
+            if payload is not None:
+                values = {k: v for k, v in payload.items() if k != "timestamp"}
+                if values != last_sent:
+                    last_sent = values
+                    yield f"event: traffic\ndata: {json.dumps(payload)}\n\n"
+
+            if not await DashboardSummaryCache.wait_for_update(
+                STREAM_KEEPALIVE_SECONDS
+            ):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/uptime-trend")
 def get_uptime_trend(
     days: int = Query(7, ge=1, le=30),
@@ -53,3 +132,39 @@ def get_uptime_trend(
 ):
     loc_ids = resolve_location_ids(db, location_id, location_name)
     return build_uptime_trend(db, days, location_ids=loc_ids, device_type=device_type)
+
+
+@router.get("/availability")
+def get_availability(
+    start_date: datetime,
+    end_date: datetime,
+    bucket_seconds: int = Query(
+        86400, ge=60, description="Bucket size, e.g. 3600 (hourly) or 86400 (daily)"
+    ),
+    location_id: Optional[int] = Query(None),
+    location_name: Optional[str] = Query(None),
+    device_type: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    if end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must be after start_date",
+        )
+    if (
+        end_date - start_date
+    ).total_seconds() / bucket_seconds > AVAILABILITY_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range needs more than {AVAILABILITY_MAX_BUCKETS} buckets, use a larger bucket_seconds",
+        )
+
+    loc_ids = resolve_location_ids(db, location_id, location_name)
+    return build_availability(
+        db,
+        start_date,
+        end_date,
+        bucket_seconds,
+        location_ids=loc_ids,
+        device_type=device_type,
+    )
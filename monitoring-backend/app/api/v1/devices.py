@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from app.api.dependencies import (
     get_current_user,
+    etag_guard,
     require_admin,
     require_technician_or_admin,
 )
@@ -19,6 +20,13 @@ from app.services.librenms.client import LibreNMSService
 from app.services.locations_service import apply_location_name_filter
 from app.services.metrics.cache import MetricsCacheService
 from app.services.metrics.metrics_calculators import calculate_device_metrics
+from app.services.resource_versions import (
+    DEVICES,
+    LOCATIONS,
+    NODE_STATUS,
+    resource_versions,
+)
+from app.services.search_service import like_pattern
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import false, func, or_
 from sqlalchemy.orm import Session
@@ -89,24 +97,19 @@ def get_nodes(
     switch_query = db.query(Switch).join(Location, isouter=True)
 
     if search:
-        term = f"%{search.lower()}%"
+        # ILIKE rather than lower() LIKE, so the trigram indexes apply
+        term = like_pattern(search)
 
         if current_user.role in ["admin", "teknisi"]:
             device_query = device_query.filter(
-                or_(
-                    func.lower(Device.name).like(term),
-                    func.lower(Device.ip_address).like(term),
-                )
+                or_(Device.name.ilike(term), Device.ip_address.ilike(term))
             )
             switch_query = switch_query.filter(
-                or_(
-                    func.lower(Switch.name).like(term),
-                    func.lower(Switch.ip_address).like(term),
-                )
+                or_(Switch.name.ilike(term), Switch.ip_address.ilike(term))
             )
         else:
-            device_query = device_query.filter(func.lower(Device.name).like(term))
-            switch_query = switch_query.filter(func.lower(Switch.name).like(term))
+            device_query = device_query.filter(Device.name.ilike(term))
+            switch_query = switch_query.filter(Switch.name.ilike(term))
 
     if location_name:
         loc_q = db.query(Location.location_id)
@@ -199,7 +202,11 @@ def get_device_types(db: Session = Depends(get_db)):
     return sorted(device_types)
 
 
-@router.get("/with-locations", response_model=List[DeviceWithLocation])
+@router.get(
+    "/with-locations",
+    response_model=List[DeviceWithLocation],
+    dependencies=[Depends(etag_guard(DEVICES, LOCATIONS, NODE_STATUS))],
+)
 def get_devices_with_locations(db: Session = Depends(get_db)):
     results = (
         db.query(Device, Location)
@@ -286,6 +293,7 @@ async def update_device(
         setattr(device, field, value)
 
     db.commit()
+    resource_versions.bump(DEVICES)
     db.refresh(device)
 
     return device
@@ -314,5 +322,6 @@ async def delete_device(
 
     db.delete(device)
     db.commit()
+    resource_versions.bump(DEVICES)
 
     return None
@@ -9,6 +9,7 @@ from app.schemas.network_map import (
     FORouteResponse,
     FORouteUpdate,
 )
+from app.services.resource_versions import FO_ROUTES, resource_versions
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session, aliased
@@ -93,6 +94,7 @@ def create_fo_route(
     new_route = FORoute(**payload.model_dump())
     db.add(new_route)
     db.commit()
+    resource_versions.bump(FO_ROUTES)
     db.refresh(new_route)
     return new_route
 
@@ -138,6 +140,7 @@ def update_fo_route(
         setattr(fo_route, field, value)
 
     db.commit()
+    resource_versions.bump(FO_ROUTES)
     db.refresh(fo_route)
     return fo_route
 
@@ -154,3 +157,4 @@ def delete_fo_route(
 
     db.delete(fo_route)
     db.commit()
+    resource_versions.bump(FO_ROUTES)
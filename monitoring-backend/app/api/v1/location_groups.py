@@ -1,6 +1,6 @@
 from typing import List
 
-from app.api.dependencies import require_admin
+from app.api.dependencies import etag_guard, require_admin
 from app.core.database import get_db
 from app.models import Location, LocationGroup, User
 from app.schemas.location import (
@@ -8,6 +8,7 @@ from app.schemas.location import (
     LocationGroupResponse,
     LocationGroupUpdate,
 )
+from app.services.resource_versions import LOCATION_GROUPS, resource_versions
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -15,7 +16,11 @@ from sqlalchemy.orm import Session
 router = APIRouter(prefix="/location-groups", tags=["Location Groups"])
 
 
-@router.get("", response_model=List[LocationGroupResponse])
+@router.get(
+    "",
+    response_model=List[LocationGroupResponse],
+    dependencies=[Depends(etag_guard(LOCATION_GROUPS))],
+)
 def get_groups(db: Session = Depends(get_db)):
     return db.query(LocationGroup).order_by(LocationGroup.name.asc()).all()
 
@@ -42,6 +47,7 @@ def create_group(
     )
     db.add(row)
     db.commit()
+    resource_versions.bump(LOCATION_GROUPS)
     db.refresh(row)
     return row
 
@@ -76,6 +82,7 @@ def update_group(
         setattr(row, f, v)
 
     db.commit()
+    resource_versions.bump(LOCATION_GROUPS)
     db.refresh(row)
     return row
 
@@ -96,4 +103,5 @@ def delete_group(
 
     db.delete(row)
     db.commit()
+    resource_versions.bump(LOCATION_GROUPS)
     return None
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from app.api.dependencies import require_admin
+from app.api.dependencies import etag_guard, require_admin
 from app.core.database import get_db
 from app.models import Device, Location, LocationGroup, Switch, User
 from app.schemas.location import (
@@ -15,6 +15,11 @@ from app.services.locations_service import (
     type_label,
     validate_group_rule,
 )
+from app.services.resource_versions import (
+    LOCATION_GROUPS,
+    LOCATIONS,
+    resource_versions,
+)
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
@@ -78,7 +83,11 @@ def get_all_locations(
     return {"items": items, "total": total, "page": page, "page_size": limit}
 
 
-@router.get("/options", response_model=List[LocationOptionResponse])
+@router.get(
+    "/options",
+    response_model=List[LocationOptionResponse],
+    dependencies=[Depends(etag_guard(LOCATIONS, LOCATION_GROUPS))],
+)
 def get_location_options(db: Session = Depends(get_db)):
     rows = (
         db.query(Location)
@@ -182,6 +191,7 @@ def create_location(
     )
     db.add(row)
     db.commit()
+    resource_versions.bump(LOCATIONS)
     db.refresh(row)
 
     return LocationResponse(
@@ -233,6 +243,7 @@ def update_location(
         setattr(row, f, v)
 
     db.commit()
+    resource_versions.bump(LOCATIONS)
     db.refresh(row)
 
     return LocationResponse(
@@ -261,4 +272,5 @@ def delete_location(
         raise HTTPException(status_code=404, detail=f"Location {location_id} not found")
     db.delete(row)
     db.commit()
+    resource_versions.bump(LOCATIONS)
     return None
@@ -1,7 +1,17 @@
+from app.api.dependencies import etag_guard
 from app.core.database import get_db
 from app.models import Device, FORoute, Location, NetworkNode, Switch
 from app.schemas.network_map import MapTopologyResponse
-from app.services.metrics.aggregation import aggregate_port_metrics_by_node
+from app.services.monitoring.status_sync import state
+from app.services.resource_versions import (
+    DEVICES,
+    FO_ROUTES,
+    LOCATIONS,
+    NETWORK_NODES,
+    NODE_METRICS,
+    NODE_STATUS,
+    SWITCHES,
+)
 from app.utils.thresholds import evaluate_device_severity, evaluate_switch_severity
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
@@ -9,7 +19,23 @@ from sqlalchemy.orm import Session
 router = APIRouter(prefix="/map", tags=["Map"])
 
 
-@router.get("/topology", response_model=MapTopologyResponse)
+@router.get(
+    "/topology",
+    response_model=MapTopologyResponse,
+    dependencies=[
+        Depends(
+            etag_guard(
+                LOCATIONS,
+                NETWORK_NODES,
+                FO_ROUTES,
+                DEVICES,
+                SWITCHES,
+                NODE_STATUS,
+                NODE_METRICS,
+            )
+        )
+    ],
+)
 async def get_map_topology(db: Session = Depends(get_db)):
     locations = db.query(Location).order_by(Location.location_id.asc()).all()
     nodes = db.query(NetworkNode).order_by(NetworkNode.node_id.asc()).all()
@@ -17,13 +43,11 @@ async def get_map_topology(db: Session = Depends(get_db)):
     devices = db.query(Device).order_by(Device.device_id.asc()).all()
     switches = db.query(Switch).order_by(Switch.switch_id.asc()).all()
 
-    (
-        device_totals,
-        switch_totals,
-        device_capacity,
-        switch_capacity,
-        _,
-    ) = await aggregate_port_metrics_by_node(db, None)
+    # Severities use the port totals cached by the LibreNMS sync loop, whose
+    # changes bump NODE_METRICS, so the ETag stays valid for the same body
+    device_totals = state.cached_device_totals
+    switch_totals = state.cached_switch_totals
+    switch_capacity = state.cached_switch_capacity
 
     return {
         "locations": [
@@ -9,6 +9,7 @@ from app.schemas.network_map import (
     NetworkNodeResponse,
     NetworkNodeUpdate,
 )
+from app.services.resource_versions import NETWORK_NODES, resource_versions
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
@@ -73,6 +74,7 @@ def create_network_node(
     new_node = NetworkNode(**payload.model_dump())
     db.add(new_node)
     db.commit()
+    resource_versions.bump(NETWORK_NODES)
     db.refresh(new_node)
     return new_node
 
@@ -103,6 +105,7 @@ def update_network_node(
         setattr(network_node, field, value)
 
     db.commit()
+    resource_versions.bump(NETWORK_NODES)
     db.refresh(network_node)
     return network_node
 
@@ -119,3 +122,4 @@ def delete_network_node(
 
     db.delete(network_node)
     db.commit()
+    resource_versions.bump(NETWORK_NODES)
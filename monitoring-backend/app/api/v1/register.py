@@ -12,6 +12,7 @@ from app.services.librenms.register import (
     schedule_port_retry_if_needed,
 )
 from app.services.normalizer import normalize_node_type
+from app.services.resource_versions import DEVICES, SWITCHES, resource_versions
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -103,6 +104,7 @@ async def register_in_librenms(
             existing.librenms_hostname = hostname
             existing.librenms_last_synced = datetime.utcnow()
             db.commit()
+            resource_versions.bump(SWITCHES)
             db.refresh(existing)
 
             ports_discovered = False
@@ -147,6 +149,7 @@ async def register_in_librenms(
         )
         db.add(new_switch)
         db.commit()
+        resource_versions.bump(SWITCHES)
         db.refresh(new_switch)
 
         ports_discovered = False
@@ -212,6 +215,7 @@ async def register_in_librenms(
         existing.librenms_hostname = hostname
         existing.librenms_last_synced = datetime.utcnow()
         db.commit()
+        resource_versions.bump(DEVICES)
         db.refresh(existing)
 
         ports_discovered = False
@@ -258,6 +262,7 @@ async def register_in_librenms(
     )
     db.add(new_device)
     db.commit()
+    resource_versions.bump(DEVICES)
     db.refresh(new_device)
 
     ports_discovered = False
@@ -331,6 +336,7 @@ async def unregister_from_librenms(
         sw.librenms_hostname = None
         sw.librenms_last_synced = None
         db.commit()
+        resource_versions.bump(SWITCHES)
 
         return {
             "status": "ok",
@@ -364,6 +370,7 @@ async def unregister_from_librenms(
     dev.librenms_hostname = None
     dev.librenms_last_synced = None
     db.commit()
+    resource_versions.bump(DEVICES)
 
     return {
         "status": "ok",
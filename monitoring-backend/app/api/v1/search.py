@@ -0,0 +1,26 @@
+from typing import List, Literal, Optional
+
+from app.api.dependencies import get_current_user
+from app.core.database import get_db
+from app.models import User
+from app.schemas.search import SearchResponse
+from app.services.search_service import search
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=SearchResponse)
+def search_all(
+    q: str = Query(..., min_length=1, max_length=255),
+    kinds: Optional[List[Literal["device", "switch", "alert", "location"]]] = Query(
+        None, description="Restrict to these result kinds"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # IP addresses are only searchable by the roles that see them in /devices/nodes
+    with_ip = current_user.role in ["admin", "teknisi"]
+    return {"items": search(db, q, kinds=kinds, limit=limit, with_ip=with_ip)}
@@ -7,6 +7,7 @@ from app.schemas.setting import (
     SystemConfigResponse,
     ThresholdRuleResponse,
 )
+from app.services.metrics.incidents import rebuild_incident_counts
 from app.services.settings_cache import settings_cache
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -45,6 +46,7 @@ def update_all_settings(
         raise HTTPException(
             status_code=404, detail="System config not found in database."
         )
+    old_min_duration = sys_config.top_down_min_alert_duration_minutes
     for key, value in payload.system_config.model_dump().items():
         setattr(sys_config, key, value)
 
@@ -71,4 +73,9 @@ def update_all_settings(
 
     settings_cache.refresh_cache(db)
 
+    if sys_config.top_down_min_alert_duration_minutes != old_min_duration:
+        # Incident counters were taken with the old minimum duration
+        rebuild_incident_counts(db)
+        db.commit()
+
     return {"message": "Settings updated successfully and cache refreshed."}
@@ -1,7 +1,11 @@
 from datetime import datetime
 from typing import List, Optional
 
-from app.api.dependencies import require_admin, require_technician_or_admin
+from app.api.dependencies import (
+    etag_guard,
+    require_admin,
+    require_technician_or_admin,
+)
 from app.core.database import get_db
 from app.models import Location, Switch, User
 from app.schemas.switch import (
@@ -12,6 +16,12 @@ from app.schemas.switch import (
 )
 from app.services.librenms.client import LibreNMSService
 from app.services.metrics.metrics_calculators import calculate_switch_metrics
+from app.services.resource_versions import (
+    LOCATIONS,
+    NODE_STATUS,
+    SWITCHES,
+    resource_versions,
+)
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
@@ -65,7 +75,11 @@ async def get_bulk_switch_details(
     return results
 
 
-@router.get("/with-locations", response_model=List[SwitchWithLocation])
+@router.get(
+    "/with-locations",
+    response_model=List[SwitchWithLocation],
+    dependencies=[Depends(etag_guard(SWITCHES, LOCATIONS, NODE_STATUS))],
+)
 def get_switch_with_locations(db: Session = Depends(get_db)):
     results = (
         db.query(Switch, Location)
@@ -149,6 +163,7 @@ async def update_switch(
         setattr(switch, field, value)
 
     db.commit()
+    resource_versions.bump(SWITCHES)
     db.refresh(switch)
 
     return switch
@@ -177,5 +192,6 @@ async def delete_switch(
 
     db.delete(switch)
     db.commit()
+    resource_versions.bump(SWITCHES)
 
     return None
@@ -4,6 +4,7 @@ from app.models import User
 from app.services.librenms.client import LibreNMSService
 from app.services.librenms.sync import SyncService
 from app.services.monitoring.alerts_poller import sync_alerts_once
+from app.services.resource_versions import DEVICES, SWITCHES, resource_versions
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -21,7 +22,11 @@ async def sync_from_librenms(
     Fetches all devices from LibreNMS and updates switches and devices tables.
     """
     service = SyncService(db)
-    results = await service.sync_all_from_librenms(update_existing=update_existing)
+    try:
+        results = await service.sync_all_from_librenms(update_existing=update_existing)
+    finally:
+        # Nodes are committed one by one, so bump even after a partial run
+        resource_versions.bump(DEVICES, SWITCHES)
 
     return {
         "status": "success",
@@ -0,0 +1,24 @@
+from typing import Any
+
+from app.api.coalescing import get_coalescing_stats
+from app.api.dependencies import require_admin
+from app.services.metrics.retention import get_retention_stats
+from app.services.monitoring.websocket_manager import ws_manager
+from fastapi import APIRouter, Depends
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+
+@router.get("/retention")
+def get_retention_status(_: Any = Depends(require_admin)) -> Any:
+    return get_retention_stats()
+
+
+@router.get("/coalescing")
+def get_coalescing_status(_: Any = Depends(require_admin)) -> Any:
+    return get_coalescing_stats()
+
+
+@router.get("/websocket")
+def get_websocket_status(_: Any = Depends(require_admin)) -> Any:
+    return ws_manager.get_stats()
@@ -1,6 +1,9 @@
+import json
 import logging
 
+from app.services.monitoring.metrics_stream import metrics_stream
 from app.services.monitoring.websocket_manager import ws_manager
+from app.services.monitoring.ws_topics import Subscription
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
@@ -8,6 +11,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _send_keyframe(websocket: WebSocket) -> None:
+    subscription = ws_manager.subscription(websocket)
+    if subscription.wants_event("metrics_update"):
+        await ws_manager.send_personal_message(
+            metrics_stream.frame_for(metrics_stream.keyframe(), subscription),
+            websocket,
+        )
+
+
 @router.websocket("/ws")
 async def websocket_status_endpoint(websocket: WebSocket):
     """
@@ -16,6 +28,21 @@ async def websocket_status_endpoint(websocket: WebSocket):
     Clients connect to this endpoint to receive:
     - status_change: When a device/switch status changes (online/offline)
     - heartbeat:  Periodic summary of system status
+    - metrics_update: Live metrics, a keyframe on connect and periodically,
+      deltas of the changed fields in between (see MetricsStream). Send
+      "keyframe" to get a full frame again, e.g. after a seq gap.
+
+    Clients get everything until they send a subscribe message, e.g.
+    {"type": "subscribe", "events": ["status_change", "alert"],
+     "locations": ["GT Cikampek"], "device_types": ["cctv", "switch"]}
+    Lists are "locations", "device_types", "device_ids" and "switch_ids".
+    Empty or missing lists mean no filter on that dimension; locations
+    match location, group and parent group names. A node must match every
+    non-empty dimension and any entry within one, so the example gets the
+    CCTVs and switches at GT Cikampek only. Node events and metrics frames are then limited to matching
+    nodes. The reply is a "subscribed" message followed by a keyframe of
+    the new selection, or "subscribe_error" for unknown event names or bad
+    ids, which leaves the previous subscription in place.
 
     Message format:
     {
@@ -40,6 +67,7 @@ async def websocket_status_endpoint(websocket: WebSocket):
             },
             websocket,
         )
+        await _send_keyframe(websocket)
 
         # Keep connection alive and handle incoming messages
         while True:
@@ -50,6 +78,30 @@ async def websocket_status_endpoint(websocket: WebSocket):
                 # Handle ping messages to keep connection alive
                 if data == "ping":
                     await ws_manager.send_personal_message({"type": "pong"}, websocket)
+                elif data == "keyframe":
+                    await _send_keyframe(websocket)
+                elif data.startswith("{"):
+                    try:
+                        message = json.loads(data)
+                    except ValueError:
+                        continue
+                    if message.get("type") != "subscribe":
+                        continue
+
+                    try:
+                        subscription = Subscription.from_message(message)
+                    except ValueError as e:
+                        # The previous subscription stays in place
+                        await ws_manager.send_personal_message(
+                            {"type": "subscribe_error", "message": str(e)},
+                            websocket,
+                        )
+                        continue
+                    await ws_manager.subscribe(websocket, subscription)
+                    await ws_manager.send_personal_message(
+                        {"type": "subscribed", **subscription.describe()}, websocket
+                    )
+                    await _send_keyframe(websocket)
 
             except WebSocketDisconnect:
                 break
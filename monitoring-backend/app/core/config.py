@@ -21,6 +21,32 @@ class Settings(BaseSettings):
 
     PORT_RESYNC_TTL_SECONDS: int = 300
 
+    # Full metrics_update frame at least this often, deltas in between
+    METRICS_KEYFRAME_INTERVAL_SECONDS: int = 60
+
+    # Outbound messages queued per WebSocket client before the policy applies:
+    # drop_oldest, coalesce (newest status/heartbeat replaces a queued one,
+    # metrics deltas merge into the queued one, then drop_oldest) or disconnect
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CLIENT_POLICY: str = "coalesce"
+    WS_SEND_TIMEOUT_SECONDS: float = 10
+
+    HISTORY_PARTITION_MONTHS_AHEAD: int = 3
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    RETENTION_BATCH_SIZE: int = 5000
+    RETENTION_BATCH_SLEEP_SECONDS: float = 0.5
+
+    HISTORY_ARCHIVE_ENABLED: bool = False
+    HISTORY_ARCHIVE_DIR: str = "archive"
+    HISTORY_HOT_DAYS: int = 90
+
+    ROLLUP_MAX_CATCHUP_HOURS: int = 168
+    ANALYTICS_HOURLY_MAX_DAYS: int = 31
+    UPTIME_ROLLUP_MAX_CATCHUP_DAYS: int = 31
+
+    # Replay coalesced read responses for this long after they finish (0 = off)
+    COALESCE_RESULT_TTL_SECONDS: float = 0
+
     PROJECT_NAME: str = "Device Monitoring System"
     VERSION: str = "1.0"
     API_V1_VERSION: str = "/api/v1"
@@ -5,6 +5,7 @@ from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.coalescing import COALESCED_PATHS, RequestCoalescingMiddleware
 from app.api.v1 import (
     alerts,
     analytics,
@@ -18,8 +19,10 @@ from app.api.v1 import (
     map,
     network_nodes,
     register,
+    search,
     switches,
     sync,
+    system,
     users,
     websocket,
 )
@@ -33,6 +36,8 @@ from app.services.metrics.history_poller import (
     start_metrics_history_poller,
     stop_metrics_history_poller,
 )
+from app.services.metrics.partitions import ensure_partitions
+from app.services.metrics.retention import start_retention_task, stop_retention_task
 from app.services.monitoring.alerts_poller import (
     start_alerts_poller_task,
     stop_alerts_poller_task,
@@ -51,6 +56,14 @@ app = FastAPI(
     description="Monitoring System Gateway API",
 )
 
+# Added before CORS so it runs inside it and shared responses never carry
+# another caller's CORS headers
+app.add_middleware(
+    RequestCoalescingMiddleware,
+    paths=COALESCED_PATHS,
+    ttl_seconds=settings.COALESCE_RESULT_TTL_SECONDS,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -76,6 +89,14 @@ async def on_startup():
     finally:
         db.close()
 
+    try:
+        db = SessionLocal()
+        ensure_partitions(db)
+    except Exception as e:
+        logger.error(f"Failed to create history partitions on startup: {e}")
+    finally:
+        db.close()
+
     global _alerts_poller_task, _status_tracking_task
     if settings.LIBRENMS_ALERTS_ENABLED:
         _alerts_poller_task = start_alerts_poller_task(
@@ -93,6 +114,9 @@ async def on_startup():
     start_metrics_history_poller(libre_service, interval_seconds=300)
     logger.info("Started 5-minute metrics history poller")
 
+    start_retention_task()
+    logger.info("Started data retention job")
+
 
 @app.on_event("shutdown")
 async def on_shutdown():
@@ -103,6 +127,7 @@ async def on_shutdown():
     await stop_alerts_poller_task()
     await stop_status_poller_task()
     await stop_metrics_history_poller()
+    await stop_retention_task()
     logger.info("Stopped all background poller tasks")
 
 
@@ -120,6 +145,7 @@ app.include_router(network_nodes.router, prefix="/api/v1")
 app.include_router(fo_routes.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(alerts.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(sync.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
@@ -128,3 +154,4 @@ app.include_router(librenms_ports.router, prefix="/api/v1")
 app.include_router(register.router, prefix="/api/v1")
 app.include_router(analytics.router, prefix="/api/v1")
 app.include_router(settings_router.router, prefix="/api/v1")
+app.include_router(system.router, prefix="/api/v1")
@@ -1,11 +1,18 @@
-from app.models.alert import Alert, SwitchAlert
+from app.models.alert import NodeAlert
 from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+from app.models.bandwidth_rollup import (
+    BandwidthRollupDaily,
+    BandwidthRollupHourly,
+    RollupWatermark,
+)
 from app.models.device import Device
 from app.models.fo_route import FORoute
 from app.models.librenms_port import LibreNMSPort
 from app.models.location import Location
 from app.models.location_group import LocationGroup
+from app.models.location_incident import LocationDailyIncident
 from app.models.network_node import NetworkNode
+from app.models.node_uptime import NodeDailyUptime
 from app.models.problem_category import ProblemCategory
 from app.models.replacement import DeviceReplacement, SwitchReplacement
 from app.models.setting import SystemConfig, ThresholdRule
@@ -17,19 +24,23 @@ __all__ = [
     "User",
     "Location",
     "LocationGroup",
+    "LocationDailyIncident",
     "ProblemCategory",
     "NetworkNode",
     "FORoute",
     "Switch",
     "SwitchBandwidth",
-    "SwitchAlert",
     "SwitchReplacement",
     "Device",
     "DeviceBandwidth",
-    "Alert",
+    "BandwidthRollupHourly",
+    "BandwidthRollupDaily",
+    "RollupWatermark",
+    "NodeAlert",
     "DeviceReplacement",
     "LibreNMSPort",
     "StatusHistory",
+    "NodeDailyUptime",
     "UserNotificationSetting",
     "SystemConfig",
     "ThresholdRule",
@@ -1,56 +1,105 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    Computed,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
+ALERT_STATUSES = ("active", "cleared")
 
-class SwitchAlert(Base):
-    __tablename__ = "switch_alerts"
-
-    alert_id = Column(Integer, primary_key=True, autoincrement=True)
-    switch_id = Column(
-        Integer,
-        ForeignKey("switches.switch_id", ondelete="CASCADE"),
-        nullable=False,
-        index=True,
-    )
-    librenms_alert_id = Column(Integer, nullable=True, index=True)
-    category_id = Column(
-        Integer, ForeignKey("problem_categories.category_id", ondelete="SET NULL")
-    )
-    alert_type = Column(String(255), nullable=False)
-    severity = Column(String(255), index=True)
-    message = Column(String(255))
-    assigned_to_user_id = Column(
-        Integer, ForeignKey("users.user_id", ondelete="SET NULL")
-    )
-    acknowledged_at = Column(DateTime(timezone=True), nullable=True)
-    resolution_note = Column(Text, nullable=True)
-    created_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
-    )
-    cleared_at = Column(DateTime(timezone=True), index=True)
-    status = Column(String(255), index=True)
-
-    switch = relationship("Switch", back_populates="alerts")
-    category = relationship("ProblemCategory", back_populates="switch_alerts")
-    assigned_user = relationship("User")
-
-    def __repr__(self):
-        return f"<SwitchAlert(id={self.alert_id}, switch_id={self.switch_id}, type='{self.alert_type}', severity='{self.severity}')>"
 
+class NodeAlert(Base):
+    """
+    Alerts of devices and switches in one table. Exactly one of device_id
+    and switch_id is set, which keeps the foreign keys and their cascades;
+    node_type and node_id are derived from them so queries and indexes
+    can stay node-agnostic.
+    """
 
-class Alert(Base):
-    __tablename__ = "alerts"
+    __tablename__ = "node_alerts"
+    __table_args__ = (
+        CheckConstraint(
+            "num_nonnulls(device_id, switch_id) = 1", name="ck_node_alerts_one_node"
+        ),
+        Index("ix_node_alerts_status_created_at", "status", "created_at"),
+        Index(
+            "ix_node_alerts_node_alert_type",
+            "node_type",
+            "node_id",
+            "alert_type",
+            "created_at",
+        ),
+        Index(
+            "ix_node_alerts_incident_pending",
+            "created_at",
+            postgresql_where=text("NOT incident_counted AND cleared_at IS NULL"),
+        ),
+        # Active alerts are a small slice of the history, index only them
+        Index(
+            "ix_node_alerts_active_created_at",
+            "created_at",
+            postgresql_where=text("status = 'active'"),
+        ),
+        Index(
+            "ix_node_alerts_active_node",
+            "node_type",
+            "node_id",
+            "alert_type",
+            postgresql_where=text("status = 'active'"),
+        ),
+        Index(
+            "ix_node_alerts_message_trgm",
+            "message",
+            postgresql_using="gin",
+            postgresql_ops={"message": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_node_alerts_active_librenms",
+            "librenms_alert_id",
+            postgresql_where=text(
+                "status = 'active' AND librenms_alert_id IS NOT NULL"
+            ),
+        ),
+    )
 
     alert_id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(
         Integer,
         ForeignKey("devices.device_id", ondelete="CASCADE"),
-        nullable=False,
+        nullable=True,
+        index=True,
+    )
+    switch_id = Column(
+        Integer,
+        ForeignKey("switches.switch_id", ondelete="CASCADE"),
+        nullable=True,
         index=True,
     )
-    librenms_alert_id = Column(Integer, nullable=True, index=True)
+    node_type = Column(
+        String(16),
+        Computed(
+            "CASE WHEN device_id IS NOT NULL THEN 'device' ELSE 'switch' END",
+            persisted=True,
+        ),
+        nullable=False,
+    )
+    node_id = Column(
+        Integer, Computed("coalesce(device_id, switch_id)", persisted=True)
+    )
+    # Unique: the conflict target of the LibreNMS alert upsert
+    librenms_alert_id = Column(Integer, nullable=True, unique=True, index=True)
     category_id = Column(
         Integer, ForeignKey("problem_categories.category_id", ondelete="SET NULL")
     )
@@ -66,11 +115,18 @@ class Alert(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
     )
     cleared_at = Column(DateTime(timezone=True), index=True)
-    status = Column(String(255), index=True)
+    status = Column(
+        Enum(*ALERT_STATUSES, name="alert_status"),
+        nullable=False,
+        server_default="active",
+    )
+    # Already added to location_daily_incidents
+    incident_counted = Column(Boolean, nullable=False, server_default="0")
 
     device = relationship("Device", back_populates="alerts")
-    category = relationship("ProblemCategory", back_populates="device_alerts")
+    switch = relationship("Switch", back_populates="alerts")
+    category = relationship("ProblemCategory", back_populates="alerts")
     assigned_user = relationship("User")
 
     def __repr__(self):
-        return f"<Alert(id={self.alert_id}, device_id={self.device_id}, type='{self.alert_type}', severity='{self.severity}')>"
+        return f"<NodeAlert(id={self.alert_id}, {self.node_type}_id={self.node_id}, type='{self.alert_type}', severity='{self.severity}')>"
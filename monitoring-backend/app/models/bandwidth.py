@@ -6,15 +6,13 @@ from app.core.database import Base
 
 class SwitchBandwidth(Base):
     __tablename__ = "switch_bandwidth"
-    __table_args__ = (
-        Index("ix_switch_bandwidth_switch_time", "switch_id", "timestamp"),
-    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     switch_id = Column(
         Integer, ForeignKey("switches.switch_id", ondelete="CASCADE"), nullable=False
     )
-    timestamp = Column(DateTime(timezone=True), nullable=False)
+    # Part of the primary key because the table is range-partitioned on it
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     in_usage_mbps = Column(Float, nullable=False)
     out_usage_mbps = Column(Float, nullable=False)
     total_usage_mbps = Column(Float, nullable=False)
@@ -24,7 +22,10 @@ class SwitchBandwidth(Base):
 
     switch = relationship("Switch", back_populates="bandwidth_records")
 
-    __table_args__ = (Index("idx_switch_bw_time", "switch_id", "timestamp"),)
+    __table_args__ = (
+        Index("idx_switch_bw_time", "switch_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     def __repr__(self):
         return f"<SwitchBandwidth(switch_id={self.switch_id}, total={self.total_usage_mbps}Mbps, timestamp={self.timestamp})>"
@@ -32,15 +33,13 @@ class SwitchBandwidth(Base):
 
 class DeviceBandwidth(Base):
     __tablename__ = "device_bandwidth"
-    __table_args__ = (
-        Index("ix_device_bandwidth_device_time", "device_id", "timestamp"),
-    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_id = Column(
         Integer, ForeignKey("devices.device_id", ondelete="CASCADE"), nullable=False
     )
-    timestamp = Column(DateTime(timezone=True), nullable=False)
+    # Part of the primary key because the table is range-partitioned on it
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     in_usage_mbps = Column(Float, nullable=False)
     out_usage_mbps = Column(Float, nullable=False)
     total_usage_mbps = Column(Float, nullable=False)
@@ -48,7 +47,10 @@ class DeviceBandwidth(Base):
     packet_loss = Column(Float)
     status = Column(String(255))
 
-    __table_args__ = (Index("idx_device_bw_time", "device_id", "timestamp"),)
+    __table_args__ = (
+        Index("idx_device_bw_time", "device_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     device = relationship("Device", back_populates="bandwidth_records")
 
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
+
+from app.core.database import Base
+
+
+class _BandwidthRollupColumns:
+    node_type = Column(String(16), primary_key=True)
+    node_id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    avg_in_mbps = Column(Float, nullable=False)
+    max_in_mbps = Column(Float, nullable=False)
+    min_in_mbps = Column(Float, nullable=False)
+    avg_out_mbps = Column(Float, nullable=False)
+    max_out_mbps = Column(Float, nullable=False)
+    min_out_mbps = Column(Float, nullable=False)
+    avg_latency_ms = Column(Float)
+    # Samples behind avg_latency_ms, latency is nullable on raw rows
+    latency_samples = Column(Integer, nullable=False, default=0)
+    sample_count = Column(Integer, nullable=False)
+
+
+class BandwidthRollupHourly(_BandwidthRollupColumns, Base):
+    __tablename__ = "bandwidth_rollup_hourly"
+    __table_args__ = (Index("ix_bandwidth_rollup_hourly_bucket", "bucket"),)
+
+    def __repr__(self):
+        return f"<BandwidthRollupHourly({self.node_type}={self.node_id}, bucket={self.bucket}, samples={self.sample_count})>"
+
+
+class BandwidthRollupDaily(_BandwidthRollupColumns, Base):
+    __tablename__ = "bandwidth_rollup_daily"
+    __table_args__ = (Index("ix_bandwidth_rollup_daily_bucket", "bucket"),)
+
+    def __repr__(self):
+        return f"<BandwidthRollupDaily({self.node_type}={self.node_id}, bucket={self.bucket}, samples={self.sample_count})>"
+
+
+class RollupWatermark(Base):
+    """
+    Upper bound (exclusive) of the buckets a rollup table has fully
+    aggregated. Everything at or after it is still read from a finer source.
+    """
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    rolled_until = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<RollupWatermark(name='{self.name}', rolled_until={self.rolled_until})>"
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -6,6 +6,21 @@ from app.core.database import Base
 
 class Device(Base):
     __tablename__ = "devices"
+    # pg_trgm GIN indexes, so ILIKE '%term%' and similarity search skip the seq scan
+    __table_args__ = (
+        Index(
+            "ix_devices_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_devices_ip_address_trgm",
+            "ip_address",
+            postgresql_using="gin",
+            postgresql_ops={"ip_address": "gin_trgm_ops"},
+        ),
+    )
 
     device_id = Column(Integer, primary_key=True, autoincrement=True)
     librenms_device_id = Column(Integer, nullable=True, unique=True, index=True)
@@ -41,7 +56,7 @@ class Device(Base):
         "DeviceBandwidth", back_populates="device", cascade="all, delete-orphan"
     )
     alerts = relationship(
-        "Alert", back_populates="device", cascade="all, delete-orphan"
+        "NodeAlert", back_populates="device", cascade="all, delete-orphan"
     )
     librenms_ports = relationship(
         "LibreNMSPort", back_populates="device", cascade="all, delete-orphan"
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -6,6 +16,15 @@ from app.core.database import Base
 
 class Location(Base):
     __tablename__ = "locations"
+    # Trigram index for the search service
+    __table_args__ = (
+        Index(
+            "ix_locations_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     location_id = Column(Integer, primary_key=True, autoincrement=True)
     latitude = Column(Float, nullable=False)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String
+
+from app.core.database import Base
+
+
+class LocationDailyIncident(Base):
+    """
+    Critical alerts per location, node type and UTC day of creation that
+    lasted at least top_down_min_alert_duration_minutes. Kept up to date
+    by the status poller through the alerts' incident_counted flag.
+    """
+
+    __tablename__ = "location_daily_incidents"
+    __table_args__ = (Index("ix_location_daily_incidents_day", "day"),)
+
+    location_id = Column(
+        Integer,
+        ForeignKey("locations.location_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # "switch" or the trimmed, lowercased device_type ("unknown" if empty)
+    type_key = Column(String(255), primary_key=True)
+    day = Column(Date, primary_key=True)
+    incident_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<LocationDailyIncident(location_id={self.location_id}, "
+            f"type='{self.type_key}', day={self.day}, count={self.incident_count})>"
+        )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Date, Float, Index, Integer, String
+
+from app.core.database import Base
+
+
+class NodeDailyUptime(Base):
+    """
+    Seconds a node spent online per UTC day, replayed from status_history.
+    Only finalized (past) days are stored, today is always computed live.
+    """
+
+    __tablename__ = "node_daily_uptime"
+    __table_args__ = (Index("ix_node_daily_uptime_day", "day"),)
+
+    node_type = Column(String(16), primary_key=True)
+    node_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    online_seconds = Column(Float, nullable=False)
+    # Seconds with a known status, less than a full day before the first event
+    total_seconds = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<NodeDailyUptime({self.node_type}={self.node_id}, day={self.day}, "
+            f"online={self.online_seconds}/{self.total_seconds})>"
+        )
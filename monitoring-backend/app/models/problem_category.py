@@ -9,8 +9,7 @@ class ProblemCategory(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text)
 
-    device_alerts = relationship("Alert", back_populates="category")
-    switch_alerts = relationship("SwitchAlert", back_populates="category")
+    alerts = relationship("NodeAlert", back_populates="category")
 
     def __repr__(self):
         return f"<ProblemCategory(id={self.category_id}, name='{self.name}')>"
@@ -6,9 +6,9 @@ from app.core.database import Base
 class StatusHistory(Base):
     __tablename__ = "status_history"
     __table_args__ = (
-        Index("ix_status_history_node_changed", "node_type", "node_id", "changed_at"),
         Index("ix_status_history_status", "status"),
         Index("ix_status_history_node_time", "node_type", "node_id", "changed_at"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
     )
 
     history_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -16,7 +16,10 @@ class StatusHistory(Base):
     node_id = Column(Integer, nullable=False)
     status = Column(String(32), nullable=False)
     changed_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True),
+        server_default=func.now(),
+        primary_key=True,
+        nullable=False,
     )
 
     def __repr__(self):
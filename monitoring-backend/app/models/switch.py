@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -6,6 +6,21 @@ from app.core.database import Base
 
 class Switch(Base):
     __tablename__ = "switches"
+    # Same trigram indexes as devices, see app.services.search_service
+    __table_args__ = (
+        Index(
+            "ix_switches_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_switches_ip_address_trgm",
+            "ip_address",
+            postgresql_using="gin",
+            postgresql_ops={"ip_address": "gin_trgm_ops"},
+        ),
+    )
 
     switch_id = Column(Integer, primary_key=True, autoincrement=True)
     librenms_device_id = Column(Integer, nullable=True, unique=True, index=True)
@@ -40,7 +55,7 @@ class Switch(Base):
         "SwitchBandwidth", back_populates="switch", cascade="all, delete-orphan"
     )
     alerts = relationship(
-        "SwitchAlert", back_populates="switch", cascade="all, delete-orphan"
+        "NodeAlert", back_populates="switch", cascade="all, delete-orphan"
     )
     librenms_ports = relationship(
         "LibreNMSPort", back_populates="switch", cascade="all, delete-orphan"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -43,9 +43,21 @@ class AlertFilters(BaseModel):
 
 class AlertPageResponse(BaseModel):
     items: List[AlertResponse]
-    total: int
+    # None when count=none was requested
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     page: int
     page_size: int
+    # Opaque keyset cursor for the page after this one, None on the last page
+    next_cursor: Optional[str] = None
+
+
+class AlertSummaryResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_severity: Dict[str, int]
+    by_alert_type: Dict[str, int]
+    by_location: Dict[str, int]
 
 
 class AlertBulkDeleteResponse(BaseModel):
@@ -0,0 +1,17 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    kind: Literal["device", "switch", "alert", "location"]
+    id: int
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+    status: Optional[str] = None
+    # word_similarity of the term to the best matching column, 0..1
+    score: float
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
@@ -1,23 +1,44 @@
 import asyncio
 import math
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session, aliased
 
 from app.models import (
-    Alert,
     Device,
     Location,
+    LocationDailyIncident,
     LocationGroup,
-    StatusHistory,
+    NodeAlert,
     Switch,
-    SwitchAlert,
 )
-from app.services.metrics.aggregation import add_interval, aggregate_port_rates
+from app.services.metrics.aggregation import aggregate_port_rates
 from app.services.metrics.cache import MetricsCacheService
-from app.services.settings_cache import settings_cache
+from app.services.metrics.dashboard_cache import DashboardSummaryCache
+from app.services.metrics.rollups import get_watermark
+from app.services.metrics.availability import (
+    NodeKey,
+    bucket_starts,
+    compute_availability,
+    node_keys,
+)
+from app.services.metrics.uptime import UPTIME, daily_uptime_totals, replay_uptime
+
+
+def format_device_type(value: str) -> str:
+    if value == "cctv":
+        return "CCTV"
+    if value == "switch":
+        return "Switch"
+    if value == "router":
+        return "Router"
+    if value == "access_point":
+        return "Access Point"
+    if value == "unknown":
+        return "Unknown"
+    return value.replace("_", " ").title()
 
 
 async def get_current_average_latency(
@@ -60,17 +81,9 @@ async def get_current_average_latency(
     return sum(latencies) / len(latencies)
 
 
-def build_uptime_trend(
-    db: Session,
-    days: int,
-    location_ids: Optional[list[int]] = None,
-    device_type: Optional[str] = None,
-) -> dict:
-    now = datetime.now(timezone.utc)
-    window_start = (now - timedelta(days=days - 1)).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-
+def _filtered_nodes(
+    db: Session, location_ids: Optional[list[int]], device_type: Optional[str]
+) -> list[NodeKey]:
     dev_query = db.query(Device.device_id)
     sw_query = db.query(Switch.switch_id)
 
@@ -87,34 +100,25 @@ def build_uptime_trend(
             )
             sw_query = sw_query.filter(Switch.switch_id == -1)
 
-    devices = dev_query.all()
-    switches = sw_query.all()
+    return node_keys(
+        [row.device_id for row in dev_query.all()],
+        [row.switch_id for row in sw_query.all()],
+    )
 
-    node_keys = [("device", d.device_id) for d in devices] + [
-        ("switch", s.switch_id) for s in switches
-    ]
-    if not node_keys:
-        return {"days": 0, "data": []}
 
-    device_ids = {d.device_id for d in devices}
-    switch_ids = {s.switch_id for s in switches}
+def build_uptime_trend(
+    db: Session,
+    days: int,
+    location_ids: Optional[list[int]] = None,
+    device_type: Optional[str] = None,
+) -> dict:
+    now = datetime.now(timezone.utc)
+    window_start = (now - timedelta(days=days - 1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
 
-    filters = []
-    if device_ids:
-        filters.append(
-            and_(
-                StatusHistory.node_type == "device",
-                StatusHistory.node_id.in_(device_ids),
-            )
-        )
-    if switch_ids:
-        filters.append(
-            and_(
-                StatusHistory.node_type == "switch",
-                StatusHistory.node_id.in_(switch_ids),
-            )
-        )
-    if not filters:
+    nodes = _filtered_nodes(db, location_ids, device_type)
+    if not nodes:
         return {"days": 0, "data": []}
 
     day_map = {
@@ -122,86 +126,245 @@ def build_uptime_trend(
         for i in range(days)
     }
 
-    first_seen_row = (
-        db.query(StatusHistory.changed_at)
-        .filter(or_(*filters))
-        .order_by(StatusHistory.changed_at.asc())
-        .first()
-    )
-    first_seen_at = first_seen_row[0] if first_seen_row else None
-
-    history_rows = (
-        db.query(StatusHistory)
-        .filter(StatusHistory.changed_at >= window_start)
-        .filter(StatusHistory.changed_at <= now)
-        .filter(or_(*filters))
-        .order_by(StatusHistory.changed_at.asc())
-        .all()
-    )
+    # Finalized days come from node_daily_uptime, the rest (normally only
+    # today) is replayed from status_history
+    finalized_until = get_watermark(db, UPTIME)
+    live_from = max(finalized_until or window_start, window_start)
 
-    last_sub = (
-        db.query(
-            StatusHistory.node_type,
-            StatusHistory.node_id,
-            func.max(StatusHistory.changed_at).label("last_changed_at"),
-        )
-        .filter(StatusHistory.changed_at < window_start)
-        .filter(or_(*filters))
-        .group_by(StatusHistory.node_type, StatusHistory.node_id)
-        .subquery()
-    )
-    last_rows = (
-        db.query(StatusHistory.node_type, StatusHistory.node_id, StatusHistory.status)
-        .join(
-            last_sub,
-            and_(
-                StatusHistory.node_type == last_sub.c.node_type,
-                StatusHistory.node_id == last_sub.c.node_id,
-                StatusHistory.changed_at == last_sub.c.last_changed_at,
-            ),
-        )
-        .all()
-    )
-    last_status_map = {(r.node_type, r.node_id): r.status for r in last_rows}
-
-    history_map = {}
-    for row in history_rows:
-        history_map.setdefault((row.node_type, row.node_id), []).append(row)
-
-    for node_type, node_id in node_keys:
-        key = (node_type, node_id)
-        events = history_map.get(key, [])
-        last_status = last_status_map.get(key)
-        if last_status is None:
-            if not events:
-                continue
-            status = events[0].status
-            cursor = events[0].changed_at
-            events = events[1:]
-        else:
-            status = last_status
-            cursor = window_start
-        for ev in events:
-            add_interval(day_map, cursor, ev.changed_at, status == "online")
-            status = ev.status
-            cursor = ev.changed_at
-        add_interval(day_map, cursor, now, status == "online")
+    stored = daily_uptime_totals(db, window_start.date(), live_from.date(), nodes)
+    for day, (online, total) in stored.items():
+        day_map[day]["online"] += online
+        day_map[day]["total"] += total
+
+    live = replay_uptime(db, live_from, now, nodes)
+    live_days = zip(bucket_starts(live.edges), live.online.sum(0), live.known.sum(0))
+    for start, online, total in live_days:
+        day_map[start.date()]["online"] += float(online)
+        day_map[start.date()]["total"] += float(total)
 
     data = []
     for day in sorted(day_map.keys()):
         total = day_map[day]["total"]
         online = day_map[day]["online"]
-
-        if first_seen_at is None or day < first_seen_at.date():
-            uptime = None
-        else:
-            uptime = round((online / total * 100), 2) if total > 0 else None
-
+        # Days before a node's first status change have no known seconds
+        uptime = _uptime_percentage(online, total)
         data.append({"date": day.strftime("%Y-%m-%d"), "uptime_percentage": uptime})
 
     return {"days": len(data), "data": data}
 
 
+def _uptime_percentage(online: float, total: float) -> Optional[float]:
+    return round(online / total * 100, 2) if total > 0 else None
+
+
+def build_availability(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    bucket_seconds: int,
+    location_ids: Optional[list[int]] = None,
+    device_type: Optional[str] = None,
+) -> dict:
+    """
+    Uptime per bucket and per node for an arbitrary range, computed from
+    status_history with the vectorized availability engine. Buckets are
+    aligned to multiples of `bucket_seconds` since the epoch, so hourly and
+    daily buckets start on UTC hours and midnights.
+    """
+    nodes = _filtered_nodes(db, location_ids, device_type)
+    # Naive query parameters are taken as UTC
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+    end_date = min(end_date, datetime.now(timezone.utc))
+    aligned = start_date.timestamp() // bucket_seconds * bucket_seconds
+    lower = datetime.fromtimestamp(aligned, tz=timezone.utc)
+
+    result = compute_availability(db, nodes, lower, end_date, bucket_seconds)
+
+    data = [
+        {"timestamp": start, "uptime_percentage": _uptime_percentage(online, total)}
+        for start, online, total in zip(
+            bucket_starts(result.edges),
+            result.online.sum(0).tolist(),
+            result.known.sum(0).tolist(),
+        )
+    ]
+    node_rows = [
+        {
+            "node_type": node_type,
+            "node_id": node_id,
+            "online_seconds": online,
+            "known_seconds": total,
+            "uptime_percentage": _uptime_percentage(online, total),
+        }
+        for (node_type, node_id), online, total in zip(
+            result.nodes,
+            result.online.sum(1).tolist(),
+            result.known.sum(1).tolist(),
+        )
+        if total > 0
+    ]
+
+    return {
+        "bucket_seconds": bucket_seconds,
+        "buckets": len(data),
+        "data": data,
+        "nodes": node_rows,
+    }
+
+
+def _top_down_first_day(top_down_window: int) -> date:
+    today = datetime.now(timezone.utc).date()
+    return today - timedelta(days=top_down_window - 1)
+
+
+def _type_matcher(device_type: Optional[str]):
+    wanted_type = device_type.strip().lower() if device_type else None
+    return lambda type_key: wanted_type is None or type_key == wanted_type
+
+
+def _matching_buckets(
+    buckets: dict, location_ids: Optional[list[int]], device_type: Optional[str]
+):
+    """(type_key, bucket) pairs of the summary cache passing the dashboard filters."""
+    wanted_locations = set(location_ids) if location_ids else None
+    type_matches = _type_matcher(device_type)
+    for (location_id, type_key), bucket in buckets.items():
+        if wanted_locations is not None and location_id not in wanted_locations:
+            continue
+        if type_matches(type_key):
+            yield type_key, bucket
+
+
+def build_dashboard_stats_from_cache(
+    *,
+    location_ids: Optional[list[int]],
+    top_down_window: int,
+    device_type: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Assemble /dashboard/stats from the poller-maintained summary cache.
+    Returns None until the status poller has completed its first tick.
+    """
+    if not DashboardSummaryCache.is_ready():
+        return None
+
+    buckets, location_names, active_alerts, incidents, updated_at = (
+        DashboardSummaryCache.snapshot()
+    )
+    wanted_locations = set(location_ids) if location_ids else None
+    type_matches = _type_matcher(device_type)
+
+    totals = {
+        "total": 0,
+        "online": 0,
+        "cctv_total": 0,
+        "cctv_online": 0,
+        "in_mbps": 0.0,
+        "out_mbps": 0.0,
+        "data_found": False,
+        "latency_sum": 0.0,
+        "latency_count": 0,
+        "active_alerts": 0,
+    }
+    breakdown_map: dict[str, int] = {}
+
+    for type_key, bucket in _matching_buckets(buckets, location_ids, device_type):
+        for field in ("total", "online", "in_mbps", "out_mbps", "latency_sum"):
+            totals[field] += bucket[field]
+        totals["latency_count"] += bucket["latency_count"]
+        totals["data_found"] = totals["data_found"] or bucket["data_found"]
+
+        if "cctv" in type_key or "camera" in type_key:
+            totals["cctv_total"] += bucket["total"]
+            totals["cctv_online"] += bucket["online"]
+
+        if bucket["total"]:
+            breakdown_map[type_key] = breakdown_map.get(type_key, 0) + bucket["total"]
+
+    for (location_id, type_key), count in active_alerts.items():
+        if wanted_locations is not None and location_id not in wanted_locations:
+            continue
+        if type_matches(type_key):
+            totals["active_alerts"] += count
+
+    now = datetime.now(timezone.utc)
+    first_day = _top_down_first_day(top_down_window)
+
+    # Top-down ignores the location filter, like the query-based path
+    merged = {}
+    for location_id, type_key, day, count in incidents:
+        if day < first_day or not type_matches(type_key):
+            continue
+        if location_id not in location_names:
+            continue
+
+        p_name, c_name = location_names[location_id]
+        entry = merged.setdefault(
+            p_name,
+            {"location_name": p_name, "offline_count": 0, "children_map": {}},
+        )
+        entry["offline_count"] += count
+        if c_name and c_name != p_name:
+            children = entry["children_map"]
+            children[c_name] = children.get(c_name, 0) + count
+
+    top_down = []
+    for p_name, data in merged.items():
+        children = [
+            {"location_name": k, "offline_count": v}
+            for k, v in data["children_map"].items()
+        ]
+        children.sort(key=lambda x: x["offline_count"], reverse=True)
+        top_down.append(
+            {
+                "location_name": p_name,
+                "offline_count": data["offline_count"],
+                "children": children,
+            }
+        )
+    top_down.sort(key=lambda x: x["offline_count"], reverse=True)
+
+    device_type_stats = [
+        {"device_type": format_device_type(key), "count": value}
+        for key, value in sorted(
+            breakdown_map.items(), key=lambda item: (-item[1], item[0])
+        )
+    ]
+
+    total_all = totals["total"]
+    uptime = (totals["online"] / total_all * 100) if total_all > 0 else 0.0
+    cctv_total = totals["cctv_total"]
+    cctv_uptime = (totals["cctv_online"] / cctv_total * 100) if cctv_total else 0.0
+    avg_latency = (
+        totals["latency_sum"] / totals["latency_count"]
+        if totals["latency_count"]
+        else None
+    )
+
+    return {
+        "total_all_devices": total_all,
+        "all_online_devices": totals["online"],
+        "active_alerts": totals["active_alerts"],
+        "total_bandwidth": (
+            round(totals["in_mbps"] + totals["out_mbps"], 2)
+            if totals["data_found"]
+            else None
+        ),
+        "uptime_percentage": round(uptime, 2),
+        "top_down_locations": top_down[:10],
+        "top_down_window_days": top_down_window,
+        "cctv_total": cctv_total,
+        "cctv_online": totals["cctv_online"],
+        "cctv_uptime_percentage": round(cctv_uptime, 2),
+        "device_type_stats": device_type_stats,
+        "average_latency": round(avg_latency, 2) if avg_latency is not None else None,
+        "data_age_seconds": round((now - updated_at).total_seconds(), 1),
+    }
+
+
 async def build_dashboard_stats(
     *,
     db: Session,
@@ -247,98 +410,31 @@ async def build_dashboard_stats(
     total_bandwidth_mbps = total_in + total_out
     avg_latency = await get_current_average_latency(db, location_ids, device_type)
 
-    window_start = datetime.now(timezone.utc) - timedelta(days=top_down_window)
-    critical_filter = func.lower(func.coalesce(Alert.severity, "")) == "critical"
-    critical_sw_filter = (
-        func.lower(func.coalesce(SwitchAlert.severity, "")) == "critical"
-    )
-
-    sys_config = settings_cache.get_system_config()
-    min_duration_minutes = (
-        sys_config.top_down_min_alert_duration_minutes if sys_config else 30
-    )
-    min_duration_seconds = min_duration_minutes * 60
-
-    window_start = datetime.now(timezone.utc) - timedelta(days=top_down_window)
-    critical_filter = func.lower(func.coalesce(Alert.severity, "")) == "critical"
-    critical_sw_filter = (
-        func.lower(func.coalesce(SwitchAlert.severity, "")) == "critical"
-    )
-
+    # Top-down ignores the location filter. Counts are per UTC day, so the
+    # window is the last `top_down_window` days including today
+    first_day = _top_down_first_day(top_down_window)
     ParentGroup = aliased(LocationGroup)
-    dev_down_q = (
+    parent_name = func.coalesce(ParentGroup.name, LocationGroup.name, Location.name)
+    incidents = LocationDailyIncident
+    down_q = (
         db.query(
-            func.coalesce(ParentGroup.name, LocationGroup.name, Location.name).label(
-                "parent_name"
-            ),
+            parent_name.label("parent_name"),
             Location.name.label("child_name"),
-            func.count(Alert.alert_id).label("offline_count"),
+            func.sum(incidents.incident_count).label("offline_count"),
         )
-        .select_from(Alert)
-        .join(Device, Alert.device_id == Device.device_id)
-        .join(Location, Device.location_id == Location.location_id)
+        .select_from(incidents)
+        .join(Location, incidents.location_id == Location.location_id)
         .outerjoin(LocationGroup, Location.group_id == LocationGroup.group_id)
         .outerjoin(ParentGroup, LocationGroup.parent_id == ParentGroup.group_id)
-        .filter(Alert.created_at >= window_start)
-        .filter(critical_filter)
-        .filter(
-            func.extract(
-                "epoch", func.coalesce(Alert.cleared_at, func.now()) - Alert.created_at
-            )
-            >= min_duration_seconds
-        )
+        .filter(incidents.day >= first_day)
     )
-
-    sw_down_q = (
-        db.query(
-            func.coalesce(ParentGroup.name, LocationGroup.name, Location.name).label(
-                "parent_name"
-            ),
-            Location.name.label("child_name"),
-            func.count(SwitchAlert.alert_id).label("offline_count"),
-        )
-        .select_from(SwitchAlert)
-        .join(Switch, SwitchAlert.switch_id == Switch.switch_id)
-        .join(Location, Switch.location_id == Location.location_id)
-        .outerjoin(LocationGroup, Location.group_id == LocationGroup.group_id)
-        .outerjoin(ParentGroup, LocationGroup.parent_id == ParentGroup.group_id)
-        .filter(SwitchAlert.created_at >= window_start)
-        .filter(critical_sw_filter)
-        .filter(
-            func.extract(
-                "epoch",
-                func.coalesce(SwitchAlert.cleared_at, func.now())
-                - SwitchAlert.created_at,
-            )
-            >= min_duration_seconds
-        )
-    )
-
-    # filter untuk top down locations
-    # if location_ids:
-    #     dev_down_q = dev_down_q.filter(Device.location_id.in_(location_ids))
-    #     sw_down_q = sw_down_q.filter(Switch.location_id.in_(location_ids))
-
     if device_type:
-        if device_type.lower() == "switch":
-            dev_down_q = dev_down_q.filter(Device.device_id == -1)
-        else:
-            dev_down_q = dev_down_q.filter(
-                func.lower(Device.device_type) == device_type.lower()
-            )
-            sw_down_q = sw_down_q.filter(Switch.switch_id == -1)
+        down_q = down_q.filter(incidents.type_key == device_type.strip().lower())
 
-    dev_down = dev_down_q.group_by(
-        func.coalesce(ParentGroup.name, LocationGroup.name, Location.name),
-        Location.name,
-    ).all()
-    sw_down = sw_down_q.group_by(
-        func.coalesce(ParentGroup.name, LocationGroup.name, Location.name),
-        Location.name,
-    ).all()
+    down_rows = down_q.group_by(parent_name, Location.name).all()
 
     merged = {}
-    for row in dev_down + sw_down:
+    for row in down_rows:
         p_name = row.parent_name
         c_name = row.child_name
         count = int(row.offline_count or 0)
@@ -390,50 +486,34 @@ async def build_dashboard_stats(
     if total_switches > 0:
         breakdown_map["switch"] = breakdown_map.get("switch", 0) + total_switches
 
-    def _format_device_type(value: str) -> str:
-        if value == "cctv":
-            return "CCTV"
-        if value == "switch":
-            return "Switch"
-        if value == "router":
-            return "Router"
-        if value == "access_point":
-            return "Access Point"
-        if value == "unknown":
-            return "Unknown"
-        return value.replace("_", " ").title()
-
     device_type_stats = [
-        {"device_type": _format_device_type(key), "count": value}
+        {"device_type": format_device_type(key), "count": value}
         for key, value in sorted(
             breakdown_map.items(), key=lambda item: (-item[1], item[0])
         )
     ]
 
-    alert_q = db.query(Alert).join(Device, Alert.device_id == Device.device_id)
-    sw_alert_q = db.query(SwitchAlert).join(
-        Switch, SwitchAlert.switch_id == Switch.switch_id
+    alert_q = (
+        db.query(NodeAlert)
+        .outerjoin(Device, NodeAlert.device_id == Device.device_id)
+        .outerjoin(Switch, NodeAlert.switch_id == Switch.switch_id)
+        .filter(NodeAlert.status == "active")
     )
 
     if location_ids:
-        alert_q = alert_q.filter(Device.location_id.in_(location_ids))
-        sw_alert_q = sw_alert_q.filter(Switch.location_id.in_(location_ids))
+        alert_q = alert_q.filter(
+            func.coalesce(Device.location_id, Switch.location_id).in_(location_ids)
+        )
 
     if device_type:
         if device_type.lower() == "switch":
-            alert_q = alert_q.filter(Device.device_id == -1)
+            alert_q = alert_q.filter(NodeAlert.node_type == "switch")
         else:
             alert_q = alert_q.filter(
                 func.lower(Device.device_type) == device_type.lower()
             )
-            sw_alert_q = sw_alert_q.filter(Switch.switch_id == -1)
 
-    active_alerts = (
-        alert_q.filter(or_(Alert.status == "active", Alert.status == "1")).count()
-        + sw_alert_q.filter(
-            or_(SwitchAlert.status == "active", SwitchAlert.status == "1")
-        ).count()
-    )
+    active_alerts = alert_q.count()
     uptime = (all_online / total_all * 100) if total_all > 0 else 0.0
 
     return {
@@ -448,9 +528,12 @@ async def build_dashboard_stats(
         "cctv_online": cctv_online,
         "cctv_uptime_percentage": round(cctv_uptime, 2),
         "device_type_stats": device_type_stats,
-        "average_latency": round(avg_latency, 2)
-        if (avg_latency is not None and not math.isnan(avg_latency))
-        else None,
+        "average_latency": (
+            round(avg_latency, 2)
+            if (avg_latency is not None and not math.isnan(avg_latency))
+            else None
+        ),
+        "data_age_seconds": 0.0,
     }
 
 
@@ -466,7 +549,41 @@ async def build_dashboard_traffic(
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "inbound_mbps": round(total_in, 2) if data_found else None,
         "outbound_mbps": round(total_out, 2) if data_found else None,
-        "latency_ms": round(avg_latency, 2)
-        if (avg_latency is not None and not math.isnan(avg_latency))
-        else None,
+        "latency_ms": (
+            round(avg_latency, 2)
+            if (avg_latency is not None and not math.isnan(avg_latency))
+            else None
+        ),
+    }
+
+
+def build_dashboard_traffic_from_cache(
+    *, location_ids: Optional[list[int]], device_type: Optional[str] = None
+) -> Optional[dict]:
+    """
+    /dashboard/traffic from the summary cache: bandwidth from the cached
+    per-node LibreNMS totals and latency from the last ping round, both
+    refreshed by the status poller. None until its first tick.
+    """
+    if not DashboardSummaryCache.is_ready():
+        return None
+
+    buckets, _, _, _, updated_at = DashboardSummaryCache.snapshot()
+    total_in = total_out = latency_sum = 0.0
+    latency_count = 0
+    data_found = False
+    for _, bucket in _matching_buckets(buckets, location_ids, device_type):
+        total_in += bucket["in_mbps"]
+        total_out += bucket["out_mbps"]
+        data_found = data_found or bucket["data_found"]
+        latency_sum += bucket["latency_sum"]
+        latency_count += bucket["latency_count"]
+
+    return {
+        "timestamp": updated_at.isoformat(),
+        "inbound_mbps": round(total_in, 2) if data_found else None,
+        "outbound_mbps": round(total_out, 2) if data_found else None,
+        "latency_ms": (
+            round(latency_sum / latency_count, 2) if latency_count else None
+        ),
     }
@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import math
-from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 
 from sqlalchemy import func
@@ -112,27 +111,6 @@ def get_ports_for_location(
     return ports_query.all()
 
 
-def add_interval(day_map, start: datetime, end: datetime, is_online: bool):
-    if end <= start:
-        return
-
-    current = start
-    while current < end:
-        day_start = datetime.combine(
-            current.date(), datetime.min.time(), tzinfo=current.tzinfo
-        )
-        day_end = day_start + timedelta(days=1)
-        slice_end = min(day_end, end)
-        seconds = (slice_end - current).total_seconds()
-
-        if current.date() in day_map:
-            day_map[current.date()]["total"] += seconds
-            if is_online:
-                day_map[current.date()]["online"] += seconds
-
-        current = slice_end
-
-
 async def fetch_port_metrics(
     librenms: LibreNMSService, port_rows
 ) -> Tuple[float, float, float, bool]:
@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+from app.services.metrics.partitions import (
+    add_months,
+    delete_in_batches,
+    drop_partition,
+    is_partitioned,
+    list_partitions,
+    month_floor,
+    partition_name,
+)
+from app.services.metrics.rollups import HOURLY, get_watermark
+
+logger = logging.getLogger(__name__)
+
+# Narrowed on-disk dtypes; timestamps are whole epoch seconds (UTC)
+ARCHIVE_DTYPES = {
+    "node_id": np.int32,
+    "timestamp": np.int64,
+    "in_mbps": np.float32,
+    "out_mbps": np.float32,
+    "latency_ms": np.float32,
+}
+
+# table -> (model, node id column)
+ARCHIVE_SOURCES = {
+    DeviceBandwidth.__tablename__: (DeviceBandwidth, DeviceBandwidth.device_id),
+    SwitchBandwidth.__tablename__: (SwitchBandwidth, SwitchBandwidth.switch_id),
+}
+
+UNIT_SECONDS = {"hour": 3600, "day": 86400}
+
+MANIFEST = "manifest.json"
+FETCH_SIZE = 50_000
+
+
+class ArchiveBucketSums(NamedTuple):
+    bucket: datetime
+    node_id: int
+    sum_in: float
+    sum_out: float
+    samples: int
+    sum_latency: float
+    latency_samples: int
+
+
+def _table_dir(table: str) -> Path:
+    return Path(settings.HISTORY_ARCHIVE_DIR) / table
+
+
+def _month_dir(table: str, month_start: datetime) -> Path:
+    return _table_dir(table) / f"{month_start.year:04d}{month_start.month:02d}"
+
+
+def archived_months(table: str) -> List[datetime]:
+    """Months of `table` with a complete archive on disk, oldest first."""
+    root = _table_dir(table)
+    if not root.is_dir():
+        return []
+
+    months = []
+    for entry in root.iterdir():
+        if entry.name.isdigit() and (entry / MANIFEST).is_file():
+            year, month = int(entry.name[:4]), int(entry.name[4:])
+            months.append(datetime(year, month, 1, tzinfo=timezone.utc))
+    return sorted(months)
+
+
+def _export_month(db: Session, table: str, month_start: datetime) -> int:
+    """
+    Write one month of raw samples as one .npy file per column, sorted by
+    timestamp. Rows are fetched FETCH_SIZE at a time straight into
+    memory-mapped files, so memory stays bounded whatever the month holds.
+    Files go to a temporary directory that is renamed into place only once
+    the manifest is written, so a crash never leaves a half archive that
+    readers would trust.
+    """
+    model, id_column = ARCHIVE_SOURCES[table]
+    lower, upper = month_start, add_months(month_start, 1)
+    window = (model.timestamp >= lower, model.timestamp < upper)
+
+    final_dir = _month_dir(table, month_start)
+    tmp_dir = final_dir.with_name(final_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    total = db.query(func.count()).select_from(model).filter(*window).scalar()
+    columns = {
+        name: np.lib.format.open_memmap(
+            tmp_dir / f"{name}.npy", mode="w+", dtype=dt, shape=(total,)
+        )
+        for name, dt in ARCHIVE_DTYPES.items()
+    }
+
+    query = (
+        select(
+            id_column,
+            func.extract("epoch", model.timestamp),
+            model.in_usage_mbps,
+            model.out_usage_mbps,
+            model.latency_ms,
+        )
+        .where(*window)
+        .order_by(model.timestamp, id_column)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+
+    offset = 0
+    for chunk in db.execute(query).partitions():
+        # NULL latency becomes NaN
+        values = np.array(chunk, dtype=np.float64)
+        end = offset + len(values)
+        if end > total:
+            break
+        for i, name in enumerate(ARCHIVE_DTYPES):
+            columns[name][offset:end] = values[:, i]
+        offset = end
+
+    for values in columns.values():
+        values.flush()
+    del columns
+    if offset != total:
+        # Rows arrived or left mid-export; the next run tries the month again
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise RuntimeError(
+            f"{table}/{month_start:%Y%m} changed during export "
+            f"({offset} of {total} rows read)"
+        )
+
+    manifest = {
+        "table": table,
+        "month": month_start.isoformat(),
+        "rows": offset,
+        "columns": {name: np.dtype(dt).str for name, dt in ARCHIVE_DTYPES.items()},
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    (tmp_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_dir, final_dir)
+    return offset
+
+
+def _delete_month(db: Session, table: str, month_start: datetime) -> None:
+    """
+    Drop the month's partition, or on a plain table delete it in the same
+    primary-key windows as the retention purge. Older months are gone
+    already, so everything before the month's end is this month.
+    """
+    model, _ = ARCHIVE_SOURCES[table]
+    name = partition_name(table, month_start)
+
+    if is_partitioned(db, table):
+        if name in {p for p, _, _ in list_partitions(db, table)}:
+            drop_partition(db, table, name)
+        return
+
+    for _ in delete_in_batches(
+        db,
+        model,
+        model.id,
+        model.timestamp,
+        add_months(month_start, 1),
+        settings.RETENTION_BATCH_SIZE,
+    ):
+        time.sleep(settings.RETENTION_BATCH_SLEEP_SECONDS)
+
+
+def _oldest_sample(db: Session, table: str) -> Optional[datetime]:
+    model, _ = ARCHIVE_SOURCES[table]
+    return db.query(func.min(model.timestamp)).scalar()
+
+
+def archive_cold_history(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """
+    Move whole months older than HISTORY_HOT_DAYS out of Postgres into the
+    archive directory. A month is only archived once the hourly rollup has
+    passed it, so dashboards keep their aggregates after the raw rows leave.
+    """
+    rolled_until = get_watermark(db, HOURLY)
+    if rolled_until is None:
+        return []
+
+    now = now or datetime.now(timezone.utc)
+    hot_start = min(
+        month_floor(now - timedelta(days=settings.HISTORY_HOT_DAYS)),
+        month_floor(rolled_until),
+    )
+
+    archived = []
+    for table in ARCHIVE_SOURCES:
+        oldest = _oldest_sample(db, table)
+        if oldest is None:
+            continue
+
+        month = month_floor(oldest)
+        while month < hot_start:
+            if (_month_dir(table, month) / MANIFEST).is_file():
+                # Exported before but not yet removed, e.g. after a crash
+                _delete_month(db, table, month)
+            else:
+                rows = _export_month(db, table, month)
+                _delete_month(db, table, month)
+                archived.append(f"{table}/{month:%Y%m} ({rows} rows)")
+            month = add_months(month, 1)
+
+    if archived:
+        logger.info(f"Archived cold history: {', '.join(archived)}")
+    return archived
+
+
+def _load_month(table: str, month_start: datetime) -> dict:
+    month_dir = _month_dir(table, month_start)
+    return {
+        name: np.load(month_dir / f"{name}.npy", mmap_mode="r")
+        for name in ARCHIVE_DTYPES
+    }
+
+
+def read_bucket_sums(
+    table: str,
+    unit: str,
+    lower: datetime,
+    upper: datetime,
+    node_ids: Iterable[int],
+    inclusive: bool = True,
+) -> List[ArchiveBucketSums]:
+    """
+    Per-node bucket sums over archived samples between `lower` and `upper`,
+    in the same shape as the analytics queries. Files are memory-mapped and
+    only the timestamp slice selected by searchsorted is read.
+    """
+    wanted = np.fromiter(node_ids, dtype=np.int32)
+    if not wanted.size:
+        return []
+
+    months = [
+        m for m in archived_months(table) if m <= upper and add_months(m, 1) > lower
+    ]
+    if not months:
+        return []
+
+    lo, hi = int(lower.timestamp()), int(upper.timestamp())
+    step = UNIT_SECONDS[unit]
+    parts = {name: [] for name in ARCHIVE_DTYPES}
+
+    for month in months:
+        data = _load_month(table, month)
+        start = np.searchsorted(data["timestamp"], lo, side="left")
+        stop = np.searchsorted(
+            data["timestamp"], hi, side="right" if inclusive else "left"
+        )
+        keep = np.isin(data["node_id"][start:stop], wanted)
+        for name in ARCHIVE_DTYPES:
+            parts[name].append(np.asarray(data[name][start:stop])[keep])
+
+    cols = {name: np.concatenate(values) for name, values in parts.items()}
+    if not cols["timestamp"].size:
+        return []
+
+    buckets = cols["timestamp"] // step * step
+    keys = np.stack([buckets, cols["node_id"].astype(np.int64)], axis=1)
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    n = len(groups)
+
+    latency = cols["latency_ms"].astype(np.float64)
+    has_latency = ~np.isnan(latency)
+    sums_in = np.bincount(inverse, weights=cols["in_mbps"], minlength=n)
+    sums_out = np.bincount(inverse, weights=cols["out_mbps"], minlength=n)
+    samples = np.bincount(inverse, minlength=n)
+    sums_lat = np.bincount(
+        inverse, weights=np.where(has_latency, latency, 0.0), minlength=n
+    )
+    lat_samples = np.bincount(inverse, weights=has_latency, minlength=n)
+
+    return [
+        ArchiveBucketSums(
+            bucket=datetime.fromtimestamp(int(groups[i, 0]), tz=timezone.utc),
+            node_id=int(groups[i, 1]),
+            sum_in=float(sums_in[i]),
+            sum_out=float(sums_out[i]),
+            samples=int(samples[i]),
+            sum_latency=float(sums_lat[i]),
+            latency_samples=int(lat_samples[i]),
+        )
+        for i in range(n)
+    ]
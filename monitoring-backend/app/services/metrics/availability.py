@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, String, and_, column, func, or_, select, true, values
+from sqlalchemy.orm import Session
+
+from app.models import StatusHistory
+from app.utils.intervals import bucket_overlap_seconds
+
+NodeKey = Tuple[str, int]
+
+
+class Availability(NamedTuple):
+    nodes: List[NodeKey]
+    # Bucket boundaries in epoch seconds, one more than buckets
+    edges: np.ndarray
+    # (node, bucket) seconds online and seconds with a known status
+    online: np.ndarray
+    known: np.ndarray
+
+
+def node_keys(device_ids, switch_ids) -> List[NodeKey]:
+    return [("device", i) for i in device_ids] + [("switch", i) for i in switch_ids]
+
+
+def node_filter(model, nodes: List[NodeKey]):
+    """(node_type, node_id IN ...) per node type, for models keyed like status_history."""
+    filters = []
+    for node_type in ("device", "switch"):
+        ids = [node_id for kind, node_id in nodes if kind == node_type]
+        if ids:
+            filters.append(and_(model.node_type == node_type, model.node_id.in_(ids)))
+    return or_(*filters)
+
+
+def status_at(db: Session, at: datetime, nodes: List[NodeKey]) -> Dict[NodeKey, str]:
+    """
+    Last known status of every node before `at`. The lateral subquery is a
+    single index probe per node on ix_status_history_node_time instead of
+    an aggregate over the whole history.
+    """
+    node_list = values(
+        column("node_type", String), column("node_id", Integer), name="nodes"
+    ).data(nodes)
+    last = (
+        select(StatusHistory.status)
+        .where(
+            StatusHistory.node_type == node_list.c.node_type,
+            StatusHistory.node_id == node_list.c.node_id,
+            StatusHistory.changed_at < at,
+        )
+        .order_by(StatusHistory.changed_at.desc())
+        .limit(1)
+        .lateral()
+    )
+    rows = db.execute(
+        select(node_list.c.node_type, node_list.c.node_id, last.c.status).select_from(
+            node_list.join(last, true())
+        )
+    )
+    return {(node_type, node_id): status for node_type, node_id, status in rows}
+
+
+def bucket_edges(lower: datetime, upper: datetime, step_seconds: int) -> np.ndarray:
+    """Edges every `step_seconds` from `lower`, the last bucket cut at `upper`."""
+    lo, hi = lower.timestamp(), upper.timestamp()
+    edges = np.arange(lo, hi, step_seconds, dtype=np.float64)
+    return np.append(edges, hi)
+
+
+def compute_availability(
+    db: Session,
+    nodes: List[NodeKey],
+    lower: datetime,
+    upper: datetime,
+    step_seconds: int,
+) -> Availability:
+    """
+    Online and known seconds per node and bucket over [lower, upper).
+    Transitions are loaded as epoch arrays; each one lasts until the next
+    transition of the same node (or `upper`) and the resulting intervals
+    are clipped against the bucket edges in one vectorized pass.
+    """
+    edges = bucket_edges(lower, upper, step_seconds)
+    empty = np.zeros((len(nodes), len(edges) - 1))
+    if not nodes or upper <= lower:
+        return Availability(nodes, edges, empty, empty.copy())
+
+    index = {key: i for i, key in enumerate(nodes)}
+
+    # The status each node already had at `lower` opens its first interval
+    initial = status_at(db, lower, nodes)
+    rows = [index[key] for key in initial]
+    times = [edges[0]] * len(initial)
+    online = [status == "online" for status in initial.values()]
+
+    transitions = (
+        db.query(
+            StatusHistory.node_type,
+            StatusHistory.node_id,
+            StatusHistory.status,
+            func.extract("epoch", StatusHistory.changed_at),
+        )
+        .filter(StatusHistory.changed_at >= lower)
+        .filter(StatusHistory.changed_at < upper)
+        .filter(node_filter(StatusHistory, nodes))
+        .order_by(StatusHistory.changed_at.asc())
+        .all()
+    )
+    for node_type, node_id, status, changed_at in transitions:
+        rows.append(index[(node_type, node_id)])
+        times.append(float(changed_at))
+        online.append(status == "online")
+
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = np.asarray(times, dtype=np.float64)
+    online = np.asarray(online, dtype=bool)
+
+    # Stable sort keeps the initial status ahead of a transition at `lower`
+    order = np.lexsort((starts, rows))
+    rows, starts, online = rows[order], starts[order], online[order]
+
+    ends = np.full(len(starts), edges[-1])
+    same_node = rows[1:] == rows[:-1]
+    ends[:-1][same_node] = starts[1:][same_node]
+
+    n = len(nodes)
+    known = bucket_overlap_seconds(rows, starts, ends, edges, n)
+    up = bucket_overlap_seconds(rows[online], starts[online], ends[online], edges, n)
+    return Availability(nodes, edges, up, known)
+
+
+def bucket_starts(edges: np.ndarray) -> List[datetime]:
+    return [datetime.fromtimestamp(float(t), tz=timezone.utc) for t in edges[:-1]]
@@ -0,0 +1,84 @@
+import csv
+import io
+from typing import Iterable, List, Mapping, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+
+BANDWIDTH_COLUMNS = (
+    "timestamp",
+    "in_usage_mbps",
+    "out_usage_mbps",
+    "total_usage_mbps",
+    "latency_ms",
+    "packet_loss",
+    "status",
+)
+
+EXECUTEMANY_BATCH_SIZE = 1000
+
+
+def _columns_for(model) -> List[str]:
+    id_column = "switch_id" if model is SwitchBandwidth else "device_id"
+    return [id_column, *BANDWIDTH_COLUMNS]
+
+
+def _to_csv_value(value):
+    # COPY csv reads an unquoted empty field as NULL
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _copy_rows(
+    db: Session, table_name: str, columns: Sequence[str], rows: List[Mapping]
+) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_to_csv_value(row.get(c)) for c in columns])
+    buffer.seek(0)
+
+    raw_conn = db.connection().connection
+    with raw_conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _executemany_rows(
+    db: Session, model, columns: Sequence[str], rows: List[Mapping]
+) -> None:
+    stmt = insert(model.__table__)
+    for start in range(0, len(rows), EXECUTEMANY_BATCH_SIZE):
+        batch = rows[start : start + EXECUTEMANY_BATCH_SIZE]
+        db.execute(stmt, [{c: row.get(c) for c in columns} for row in batch])
+
+
+def bulk_insert_bandwidth(db: Session, model, rows: Iterable[Mapping]) -> int:
+    """
+    Insert bandwidth samples without building ORM objects.
+
+    On PostgreSQL the rows are streamed with COPY FROM STDIN inside the
+    session's current transaction; other dialects fall back to batched
+    executemany INSERTs. The caller is responsible for committing.
+    """
+    if model not in (DeviceBandwidth, SwitchBandwidth):
+        raise ValueError(f"Unsupported bandwidth model: {model!r}")
+
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    columns = _columns_for(model)
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, model.__tablename__, columns, rows)
+    else:
+        _executemany_rows(db, model, columns, rows)
+
+    return len(rows)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Device, Switch
+from app.services.metrics.incidents import incident_counts_since
+from app.services.monitoring.active_alerts import ActiveAlertSet
+
+logger = logging.getLogger(__name__)
+
+# Incident counts need queries, so they are refreshed less often than the
+# node counters which come from rows the poller already loaded
+ALERT_REFRESH_SECONDS = 30
+
+# Widest top_down_window accepted by /dashboard/stats
+TOP_DOWN_MAX_DAYS = 30
+
+NodeKey = Tuple[Optional[int], str]
+
+
+def node_type_key(node_type: str, device_type: Optional[str]) -> str:
+    if node_type == "switch":
+        return "switch"
+    return (device_type or "").strip().lower() or "unknown"
+
+
+def _empty_bucket() -> dict:
+    return {
+        "total": 0,
+        "online": 0,
+        "in_mbps": 0.0,
+        "out_mbps": 0.0,
+        "data_found": False,
+        "latency_sum": 0.0,
+        "latency_count": 0,
+    }
+
+
+class DashboardSummaryCache:
+    """
+    Dashboard aggregates per (location_id, device type key), rebuilt by the
+    status poller on every tick so /dashboard/stats only has to add up the
+    buckets matching its filters. Alert aggregates share the same keys.
+    """
+
+    _lock = threading.Lock()
+    _buckets: Dict[NodeKey, dict] = {}
+    # location_id -> (parent name, location name) as used by top-down
+    _location_names: Dict[int, Tuple[str, str]] = {}
+    # (location_id, type_key, day, incident_count) for the widest window
+    _incidents: List[tuple] = []
+    _active_alerts: Dict[NodeKey, int] = {}
+    _alerts_refreshed_at: Optional[float] = None
+    _updated_at: Optional[datetime] = None
+    # Set and replaced on every node rebuild, push streams wait on it
+    _changed: Optional[asyncio.Event] = None
+
+    @classmethod
+    def refresh_alerts(cls, db: Session, force: bool = False) -> None:
+        """Reload recent incident counts, throttled."""
+        if (
+            not force
+            and cls._alerts_refreshed_at is not None
+            and time.monotonic() - cls._alerts_refreshed_at < ALERT_REFRESH_SECONDS
+        ):
+            return
+
+        since = datetime.now(timezone.utc) - timedelta(days=TOP_DOWN_MAX_DAYS)
+        incidents = incident_counts_since(db, since.date())
+
+        with cls._lock:
+            cls._incidents = incidents
+        cls._alerts_refreshed_at = time.monotonic()
+
+    @classmethod
+    def rebuild_nodes(
+        cls,
+        devices: List[Device],
+        switches: List[Switch],
+        device_totals: Dict[int, tuple],
+        switch_totals: Dict[int, tuple],
+        device_latency: Dict[int, Optional[float]],
+    ) -> None:
+        """
+        Recount nodes from rows the poller already loaded, with their
+        location, group and parent group eager-loaded. Run it before the
+        poller commits: rows expired by a commit (including an alert commit
+        earlier in the tick) are reloaded lazily, one query each. Active
+        alerts are counted from the active-alert hot set.
+        """
+        buckets: Dict[NodeKey, dict] = {}
+        active: Dict[NodeKey, int] = {}
+        alert_counts = ActiveAlertSet.count_by_node()
+        location_names: Dict[int, Tuple[str, str]] = {}
+
+        nodes = [("device", d, d.device_id, device_totals) for d in devices] + [
+            ("switch", s, s.switch_id, switch_totals) for s in switches
+        ]
+        for node_type, node, node_id, totals in nodes:
+            type_key = node_type_key(node_type, getattr(node, "device_type", None))
+            bucket = buckets.setdefault((node.location_id, type_key), _empty_bucket())
+            bucket["total"] += 1
+            if node.status == "online":
+                bucket["online"] += 1
+
+            alert_count = alert_counts.get((node_type, node_id))
+            if alert_count:
+                key = (node.location_id, type_key)
+                active[key] = active.get(key, 0) + alert_count
+
+            if node_id in totals:
+                in_mbps, out_mbps = totals[node_id]
+                bucket["in_mbps"] += in_mbps
+                bucket["out_mbps"] += out_mbps
+                bucket["data_found"] = True
+
+            if node_type == "device":
+                latency = device_latency.get(node_id)
+                if latency is not None and not math.isnan(latency):
+                    bucket["latency_sum"] += latency
+                    bucket["latency_count"] += 1
+
+            loc = node.location
+            if loc is not None and loc.location_id not in location_names:
+                grp = loc.group
+                parent = grp.parent if grp is not None else None
+                parent_name = (
+                    parent.name if parent else grp.name if grp else None
+                ) or loc.name
+                location_names[loc.location_id] = (parent_name, loc.name)
+
+        with cls._lock:
+            cls._buckets = buckets
+            cls._location_names = location_names
+            cls._active_alerts = active
+            cls._updated_at = datetime.now(timezone.utc)
+        cls._notify()
+
+    @classmethod
+    def _notify(cls) -> None:
+        # Wake everyone waiting on the current event and hand out a fresh one
+        if cls._changed is not None:
+            cls._changed.set()
+            cls._changed = None
+
+    @classmethod
+    async def wait_for_update(cls, timeout: float) -> bool:
+        """Wait until the next rebuild; False if `timeout` passed first."""
+        if cls._changed is None:
+            cls._changed = asyncio.Event()
+        changed = cls._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._updated_at is not None
+
+    @classmethod
+    def snapshot(cls) -> tuple:
+        with cls._lock:
+            return (
+                cls._buckets,
+                cls._location_names,
+                cls._active_alerts,
+                cls._incidents,
+                cls._updated_at,
+            )
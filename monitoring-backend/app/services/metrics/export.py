@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import literal, select
+
+from app.core.database import create_session
+from app.models import Device, Switch
+from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+
+EXPORT_COLUMNS = (
+    "node_type",
+    "node_id",
+    "timestamp",
+    "in_usage_mbps",
+    "out_usage_mbps",
+    "total_usage_mbps",
+    "latency_ms",
+    "packet_loss",
+    "status",
+)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_SIZE = 5000
+
+# node_type -> (node model, node id, bandwidth model, bandwidth node id)
+EXPORT_SOURCES = {
+    "device": (Device, Device.device_id, DeviceBandwidth, DeviceBandwidth.device_id),
+    "switch": (Switch, Switch.switch_id, SwitchBandwidth, SwitchBandwidth.switch_id),
+}
+
+
+def _export_query(
+    node_type: str,
+    start_date: datetime,
+    end_date: datetime,
+    location_ids: Optional[List[int]],
+    node_id: Optional[int],
+):
+    node_model, node_pk, model, model_node_id = EXPORT_SOURCES[node_type]
+    query = (
+        select(
+            literal(node_type),
+            model_node_id,
+            model.timestamp,
+            model.in_usage_mbps,
+            model.out_usage_mbps,
+            model.total_usage_mbps,
+            model.latency_ms,
+            model.packet_loss,
+            model.status,
+        )
+        .where(model.timestamp >= start_date, model.timestamp <= end_date)
+        .order_by(model.timestamp, model_node_id)
+    )
+
+    if location_ids is not None:
+        query = query.join(node_model, node_pk == model_node_id).where(
+            node_model.location_id.in_(location_ids)
+        )
+    if node_id is not None:
+        query = query.where(model_node_id == node_id)
+
+    # yield_per streams through a named (server-side) cursor on psycopg2
+    return query.execution_options(yield_per=EXPORT_FETCH_SIZE)
+
+
+def _format_csv(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([v.isoformat() if isinstance(v, datetime) else v for v in row])
+    return buffer.getvalue()
+
+
+def _format_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=datetime.isoformat) + "\n"
+        for row in rows
+    )
+
+
+def iter_bandwidth_export(
+    node_types: List[str],
+    start_date: datetime,
+    end_date: datetime,
+    location_ids: Optional[List[int]] = None,
+    node_id: Optional[int] = None,
+    fmt: str = "csv",
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Yield the export one fetch batch at a time so memory stays flat
+    regardless of how many rows match. Uses its own session because the
+    response body is produced after the request handler has returned.
+    """
+    formatter = _format_ndjson if fmt == "ndjson" else _format_csv
+    # wbits=31 writes a gzip container instead of a raw zlib stream
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        yield encode(_format_csv([EXPORT_COLUMNS]))
+
+    db = create_session()
+    try:
+        for node_type in node_types:
+            query = _export_query(
+                node_type, start_date, end_date, location_ids, node_id
+            )
+            for rows in db.execute(query).partitions():
+                chunk = encode(formatter(rows))
+                if chunk:
+                    yield chunk
+    finally:
+        db.close()
+
+    if compressor:
+        yield compressor.flush()
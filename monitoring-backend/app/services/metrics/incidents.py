@@ -0,0 +1,144 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Device, LocationDailyIncident, NodeAlert, Switch
+from app.services.metrics.rollups import get_watermark, set_watermark
+from app.services.settings_cache import settings_cache
+
+logger = logging.getLogger(__name__)
+
+# rollup_watermarks row holding the `now` of the last committed pass
+INCIDENTS_WATERMARK = LocationDailyIncident.__tablename__
+
+# Normally an alert is counted while still open, as soon as it crosses the
+# duration. Cleared alerts are re-checked back to the last committed pass,
+# however long ago, minus this overlap for clears committed while that
+# pass ran
+CLEARED_OVERLAP = timedelta(minutes=5)
+
+
+def _device_type_key():
+    """SQL twin of dashboard_cache.node_type_key for devices."""
+    return func.coalesce(
+        func.nullif(func.lower(func.trim(Device.device_type)), ""), "unknown"
+    )
+
+
+# (node model, join condition, type key expression); the join also keeps
+# each pass to the alerts of that node type
+INCIDENT_SOURCES = (
+    (Device, NodeAlert.device_id == Device.device_id, _device_type_key),
+    (Switch, NodeAlert.switch_id == Switch.switch_id, lambda: literal("switch")),
+)
+
+
+def _min_duration() -> timedelta:
+    sys_config = settings_cache.get_system_config()
+    minutes = sys_config.top_down_min_alert_duration_minutes if sys_config else 30
+    return timedelta(minutes=minutes)
+
+
+def count_new_incidents(
+    db: Session, now: Optional[datetime] = None, full_scan: bool = False
+) -> int:
+    """
+    Flag critical alerts that reached the minimum duration and add them to
+    location_daily_incidents in the same statement: an UPDATE ... RETURNING
+    feeds a grouped INSERT ... ON CONFLICT increment. Candidates come from
+    the partial index on open, uncounted alerts plus the ones cleared since
+    the last pass, so a tick touches only alerts that can still change the
+    counts. Without a previous pass every uncounted alert is checked.
+    Returns the number of counter rows touched.
+    """
+    now = now or datetime.now(timezone.utc)
+    min_duration = _min_duration()
+    last_pass = None if full_scan else get_watermark(db, INCIDENTS_WATERMARK)
+    counted_total = 0
+
+    for node_model, join_on, type_key in INCIDENT_SOURCES:
+        candidates = [
+            NodeAlert.incident_counted.is_(False),
+            func.lower(func.coalesce(NodeAlert.severity, "")) == "critical",
+            func.coalesce(NodeAlert.cleared_at, now) - NodeAlert.created_at
+            >= min_duration,
+            join_on,
+        ]
+        if last_pass is not None:
+            candidates.append(
+                or_(
+                    NodeAlert.cleared_at.is_(None),
+                    NodeAlert.cleared_at >= last_pass - CLEARED_OVERLAP,
+                )
+            )
+
+        counted = (
+            update(NodeAlert)
+            .where(*candidates)
+            .values(incident_counted=True)
+            .returning(
+                node_model.location_id.label("location_id"),
+                type_key().label("type_key"),
+                func.date(func.timezone("UTC", NodeAlert.created_at)).label("day"),
+            )
+            .cte(f"counted_{node_model.__tablename__}")
+        )
+        grouped = (
+            select(
+                counted.c.location_id, counted.c.type_key, counted.c.day, func.count()
+            )
+            .where(counted.c.location_id.isnot(None))
+            .group_by(counted.c.location_id, counted.c.type_key, counted.c.day)
+        )
+        stmt = insert(LocationDailyIncident).from_select(
+            ["location_id", "type_key", "day", "incident_count"], grouped
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["location_id", "type_key", "day"],
+            set_={
+                "incident_count": LocationDailyIncident.incident_count
+                + stmt.excluded.incident_count
+            },
+        ).add_cte(counted)
+        counted_total += db.execute(stmt).rowcount
+
+    # Committed with the counts, so a failed pass is covered by the next one
+    set_watermark(db, INCIDENTS_WATERMARK, now)
+    return counted_total
+
+
+def rebuild_incident_counts(db: Session) -> None:
+    """
+    Recount every alert from scratch, e.g. after the minimum duration
+    setting changed. Runs in the caller's transaction.
+    """
+    db.query(LocationDailyIncident).delete(synchronize_session=False)
+    db.query(NodeAlert).filter(NodeAlert.incident_counted.is_(True)).update(
+        {NodeAlert.incident_counted: False}, synchronize_session=False
+    )
+    count_new_incidents(db, full_scan=True)
+    logger.info("Rebuilt location incident counts")
+
+
+def incident_counts_since(db: Session, since: date) -> List[Tuple[int, str, date, int]]:
+    """(location_id, type_key, day, incident_count) for days >= `since`."""
+    i = LocationDailyIncident
+    return (
+        db.query(i.location_id, i.type_key, i.day, i.incident_count)
+        .filter(i.day >= since)
+        .all()
+    )
+
+
+def prune_incident_counts(db: Session, cutoff: datetime) -> int:
+    deleted = (
+        db.query(LocationDailyIncident)
+        .filter(LocationDailyIncident.day < cutoff.date())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
@@ -0,0 +1,160 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month, mapped to their partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "device_bandwidth": "timestamp",
+    "switch_bandwidth": "timestamp",
+    "status_history": "changed_at",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_floor(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + (month_start.month - 1) + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month_start: datetime) -> str:
+    return f"{table}_p{month_start.year:04d}{month_start.month:02d}"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    row = db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table "
+            "AND c.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": table},
+    ).first()
+    return row is not None
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Return (name, lower, upper) for the monthly partitions of `table`.
+    Bounds are derived from the `<table>_pYYYYMM` naming convention.
+    """
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table "
+            "AND parent.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": table},
+    ).all()
+
+    partitions = []
+    for (name,) in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if not match or name[: match.start()] != table:
+            continue
+        lower = datetime(
+            int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc
+        )
+        partitions.append((name, lower, add_months(lower, 1)))
+
+    partitions.sort(key=lambda p: p[1])
+    return partitions
+
+
+def ensure_partitions(db: Session, months_ahead: int | None = None) -> List[str]:
+    """
+    Create the partitions for the current month and the next `months_ahead`
+    months on every partitioned history table. Safe to call repeatedly.
+    """
+    if months_ahead is None:
+        months_ahead = settings.HISTORY_PARTITION_MONTHS_AHEAD
+
+    current = month_floor(datetime.now(timezone.utc))
+    created = []
+
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            continue
+
+        existing = {name for name, _, _ in list_partitions(db, table)}
+        for offset in range(months_ahead + 1):
+            lower = add_months(current, offset)
+            name = partition_name(table, lower)
+            if name in existing:
+                continue
+            db.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lower.isoformat()}') "
+                    f"TO ('{add_months(lower, 1).isoformat()}')"
+                )
+            )
+            created.append(name)
+
+    db.commit()
+    if created:
+        logger.info("Created history partitions: %s", ", ".join(created))
+    return created
+
+
+def drop_partition(db: Session, table: str, name: str) -> None:
+    db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    db.commit()
+
+
+def drop_expired_partitions(db: Session, table: str, cutoff: datetime) -> List[str]:
+    """
+    Detach and drop every partition of `table` whose upper bound is at or
+    before `cutoff`. Rows newer than the last whole expired month are kept
+    until their partition expires as a whole.
+    """
+    dropped = []
+    for name, _, upper in list_partitions(db, table):
+        if upper > cutoff:
+            break
+        drop_partition(db, table, name)
+        dropped.append(name)
+
+    if dropped:
+        logger.info("Dropped expired %s partitions: %s", table, ", ".join(dropped))
+    return dropped
+
+
+def delete_in_batches(
+    db: Session, model, pk, ts, cutoff: datetime, batch_size: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Delete rows with `ts` before `cutoff` in primary-key windows of
+    `batch_size`, committing after each window. Yields (rows deleted, last
+    key of the window) so callers can pause and report between windows.
+    """
+    lower, upper = db.query(func.min(pk), func.max(pk)).filter(ts < cutoff).one()
+    while lower is not None and lower <= upper:
+        window_end = lower + batch_size
+        deleted = (
+            db.query(model)
+            .filter(pk >= lower, pk < window_end, ts < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        yield deleted, min(window_end - 1, upper)
+        lower = window_end
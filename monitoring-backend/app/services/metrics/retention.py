@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import NodeAlert, StatusHistory
+from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+from app.services.metrics.archive import archive_cold_history
+from app.services.metrics.incidents import prune_incident_counts
+from app.services.metrics.partitions import (
+    delete_in_batches,
+    drop_expired_partitions,
+    ensure_partitions,
+    is_partitioned,
+)
+from app.services.monitoring.active_alerts import ActiveAlertSet
+from app.services.settings_cache import settings_cache
+
+logger = logging.getLogger(__name__)
+
+# (model, primary key column, timestamp column, retention setting)
+RETENTION_TARGETS = (
+    (DeviceBandwidth, DeviceBandwidth.id, DeviceBandwidth.timestamp, "history"),
+    (SwitchBandwidth, SwitchBandwidth.id, SwitchBandwidth.timestamp, "history"),
+    (
+        StatusHistory,
+        StatusHistory.history_id,
+        StatusHistory.changed_at,
+        "history",
+    ),
+    (NodeAlert, NodeAlert.alert_id, NodeAlert.created_at, "alert"),
+)
+
+# table name -> progress of the current or last run
+_stats: Dict[str, Dict[str, Any]] = {}
+_last_run: Dict[str, Any] = {
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+    "archived": [],
+}
+
+
+def _new_table_stats(cutoff: datetime) -> Dict[str, Any]:
+    return {
+        "cutoff": cutoff,
+        "state": "running",
+        "partitions_dropped": 0,
+        "rows_deleted": 0,
+        "batches": 0,
+        "last_deleted_key": None,
+        "max_key": None,
+        "elapsed_seconds": 0.0,
+        "rows_per_second": 0.0,
+        "started_at": datetime.now(timezone.utc),
+        "finished_at": None,
+    }
+
+
+def get_retention_stats() -> Dict[str, Any]:
+    return {**_last_run, "tables": {t: dict(s) for t, s in _stats.items()}}
+
+
+def _retention_cutoffs() -> Dict[str, datetime]:
+    sys_config = settings_cache.get_system_config()
+    history_days = sys_config.history_retention_days if sys_config else 365
+    alert_days = sys_config.alert_retention_days if sys_config else 365
+
+    now = datetime.now(timezone.utc)
+    return {
+        "history": now - timedelta(days=history_days),
+        "alert": now - timedelta(days=alert_days),
+    }
+
+
+async def _purge_table(db: Session, model, pk, ts, cutoff: datetime) -> None:
+    """
+    Partitioned tables only drop whole expired months; their rows are never
+    deleted one by one, so live partitions do not bloat. Other tables are
+    purged of rows older than `cutoff` in primary-key windows of
+    RETENTION_BATCH_SIZE, committing and sleeping between windows so the
+    pollers writing to the same tables are never blocked for long.
+    """
+    table = model.__tablename__
+    stats = _new_table_stats(cutoff)
+    _stats[table] = stats
+
+    if is_partitioned(db, table):
+        stats["partitions_dropped"] = len(drop_expired_partitions(db, table, cutoff))
+        _finish_table(table, stats)
+        return
+
+    stats["max_key"] = db.query(func.max(pk)).filter(ts < cutoff).scalar()
+
+    started = time.perf_counter()
+    for deleted, last_key in delete_in_batches(
+        db, model, pk, ts, cutoff, settings.RETENTION_BATCH_SIZE
+    ):
+        stats["rows_deleted"] += deleted
+        stats["batches"] += 1
+        stats["last_deleted_key"] = last_key
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        if stats["elapsed_seconds"]:
+            stats["rows_per_second"] = round(
+                stats["rows_deleted"] / stats["elapsed_seconds"], 1
+            )
+
+        await asyncio.sleep(settings.RETENTION_BATCH_SLEEP_SECONDS)
+
+    _finish_table(table, stats)
+
+
+def _finish_table(table: str, stats: Dict[str, Any]) -> None:
+    stats["state"] = "done"
+    stats["finished_at"] = datetime.now(timezone.utc)
+    if stats["rows_deleted"] or stats["partitions_dropped"]:
+        logger.info(
+            f"Retention on {table}: {stats['rows_deleted']} rows in "
+            f"{stats['batches']} batches ({stats['rows_per_second']} rows/s), "
+            f"{stats['partitions_dropped']} partitions dropped."
+        )
+
+
+def _archive_cold_history() -> List[str]:
+    # Runs in a worker thread, so it gets a session of its own
+    db = SessionLocal()
+    try:
+        return archive_cold_history(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_retention_cleanup() -> None:
+    _last_run.update(
+        started_at=datetime.now(timezone.utc), finished_at=None, error=None, archived=[]
+    )
+    cutoffs = _retention_cutoffs()
+
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+        if settings.HISTORY_ARCHIVE_ENABLED:
+            # Archive before purging so nothing the archive wants is deleted.
+            # The export is long and blocking, so it runs off the event loop
+            _last_run["archived"] = await asyncio.to_thread(_archive_cold_history)
+        for model, pk, ts, setting in RETENTION_TARGETS:
+            await _purge_table(db, model, pk, ts, cutoffs[setting])
+        # Old active alerts may have been purged
+        ActiveAlertSet.reload(db)
+        prune_incident_counts(db, cutoffs["alert"])
+    except Exception as e:
+        db.rollback()
+        _last_run["error"] = str(e)
+        for stats in _stats.values():
+            if stats["state"] == "running":
+                stats["state"] = "failed"
+        raise
+    finally:
+        db.close()
+        _last_run["finished_at"] = datetime.now(timezone.utc)
+
+
+async def run_retention_job(interval_seconds: int):
+    while True:
+        try:
+            await run_retention_cleanup()
+        except Exception as e:
+            logger.error(f"Error in retention job: {e}")
+
+        await asyncio.sleep(interval_seconds)
+
+
+_retention_task: Optional[asyncio.Task] = None
+
+
+def start_retention_task(interval_seconds: Optional[int] = None):
+    global _retention_task
+    if _retention_task is None:
+        _retention_task = asyncio.create_task(
+            run_retention_job(interval_seconds or settings.RETENTION_INTERVAL_SECONDS)
+        )
+    return _retention_task
+
+
+async def stop_retention_task():
+    global _retention_task
+    if _retention_task:
+        _retention_task.cancel()
+        try:
+            await _retention_task
+        except asyncio.CancelledError:
+            pass
+        _retention_task = None
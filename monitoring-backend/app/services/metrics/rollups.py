@@ -0,0 +1,216 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.bandwidth import DeviceBandwidth, SwitchBandwidth
+from app.models.bandwidth_rollup import (
+    BandwidthRollupDaily,
+    BandwidthRollupHourly,
+    RollupWatermark,
+)
+
+logger = logging.getLogger(__name__)
+
+HOURLY = BandwidthRollupHourly.__tablename__
+DAILY = BandwidthRollupDaily.__tablename__
+
+ROLLUP_UNITS = {BandwidthRollupHourly: "hour", BandwidthRollupDaily: "day"}
+
+# (node_type, raw model, node id column)
+RAW_SOURCES = (
+    ("device", DeviceBandwidth, DeviceBandwidth.device_id),
+    ("switch", SwitchBandwidth, SwitchBandwidth.switch_id),
+)
+
+_ROLLUP_VALUE_COLUMNS = (
+    "avg_in_mbps",
+    "max_in_mbps",
+    "min_in_mbps",
+    "avg_out_mbps",
+    "max_out_mbps",
+    "min_out_mbps",
+    "avg_latency_ms",
+    "latency_samples",
+    "sample_count",
+)
+
+
+def floor_hour(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime) -> datetime:
+    return floor_hour(value).replace(hour=0)
+
+
+def utc_trunc(unit: str, column):
+    """date_trunc evaluated in UTC regardless of the session time zone."""
+    return func.timezone("UTC", func.date_trunc(unit, func.timezone("UTC", column)))
+
+
+def get_watermark(db: Session, name: str) -> Optional[datetime]:
+    row = db.get(RollupWatermark, name)
+    return row.rolled_until if row else None
+
+
+def set_watermark(db: Session, name: str, rolled_until: datetime) -> None:
+    row = db.get(RollupWatermark, name)
+    if row is None:
+        db.add(RollupWatermark(name=name, rolled_until=rolled_until))
+    else:
+        row.rolled_until = rolled_until
+
+
+def _upsert_from_select(db: Session, model, query) -> None:
+    columns = ["node_type", "node_id", "bucket", *_ROLLUP_VALUE_COLUMNS]
+    stmt = insert(model).from_select(columns, query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["node_type", "node_id", "bucket"],
+        set_={c: stmt.excluded[c] for c in _ROLLUP_VALUE_COLUMNS},
+    )
+    db.execute(stmt)
+
+
+def _roll_hourly(db: Session, lower: datetime, upper: datetime) -> None:
+    for node_type, model, id_column in RAW_SOURCES:
+        bucket = utc_trunc("hour", model.timestamp)
+        query = (
+            select(
+                literal(node_type),
+                id_column,
+                bucket,
+                func.avg(model.in_usage_mbps),
+                func.max(model.in_usage_mbps),
+                func.min(model.in_usage_mbps),
+                func.avg(model.out_usage_mbps),
+                func.max(model.out_usage_mbps),
+                func.min(model.out_usage_mbps),
+                func.avg(model.latency_ms),
+                func.count(model.latency_ms),
+                func.count(),
+            )
+            .where(model.timestamp >= lower, model.timestamp < upper)
+            .group_by(id_column, bucket)
+        )
+        _upsert_from_select(db, BandwidthRollupHourly, query)
+
+
+def _roll_daily(db: Session, lower: datetime, upper: datetime) -> None:
+    h = BandwidthRollupHourly
+    bucket = utc_trunc("day", h.bucket)
+    samples = func.sum(h.sample_count)
+    latency_samples = func.sum(h.latency_samples)
+    query = (
+        select(
+            h.node_type,
+            h.node_id,
+            bucket,
+            func.sum(h.avg_in_mbps * h.sample_count) / samples,
+            func.max(h.max_in_mbps),
+            func.min(h.min_in_mbps),
+            func.sum(h.avg_out_mbps * h.sample_count) / samples,
+            func.max(h.max_out_mbps),
+            func.min(h.min_out_mbps),
+            func.sum(h.avg_latency_ms * h.latency_samples)
+            / func.nullif(latency_samples, 0),
+            latency_samples,
+            samples,
+        )
+        .where(h.bucket >= lower, h.bucket < upper)
+        .group_by(h.node_type, h.node_id, bucket)
+    )
+    _upsert_from_select(db, BandwidthRollupDaily, query)
+
+
+def _earliest_raw_sample(db: Session) -> Optional[datetime]:
+    earliest = [
+        db.query(func.min(model.timestamp)).scalar() for _, model, _ in RAW_SOURCES
+    ]
+    earliest = [value for value in earliest if value is not None]
+    return min(earliest) if earliest else None
+
+
+def refresh_rollups(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Fold closed hours into the hourly rollup and closed days into the daily
+    rollup, starting from each table's watermark. Hourly catch-up is capped at
+    ROLLUP_MAX_CATCHUP_HOURS per call so a fresh install backfills over
+    several poller runs instead of one long statement.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    hourly_from = get_watermark(db, HOURLY)
+    if hourly_from is None:
+        earliest = _earliest_raw_sample(db)
+        if earliest is None:
+            return
+        hourly_from = floor_hour(earliest)
+
+    hourly_until = min(
+        floor_hour(now),
+        hourly_from + timedelta(hours=settings.ROLLUP_MAX_CATCHUP_HOURS),
+    )
+    if hourly_until > hourly_from:
+        _roll_hourly(db, hourly_from, hourly_until)
+        set_watermark(db, HOURLY, hourly_until)
+        db.commit()
+        logger.info(f"Rolled up bandwidth hours {hourly_from} -> {hourly_until}")
+
+    daily_from = get_watermark(db, DAILY)
+    if daily_from is None:
+        daily_from = floor_day(hourly_from)
+
+    # A day is closed once every one of its hours is in the hourly rollup
+    daily_until = floor_day(max(hourly_until, hourly_from))
+    if daily_until > daily_from:
+        _roll_daily(db, daily_from, daily_until)
+        set_watermark(db, DAILY, daily_until)
+        db.commit()
+        logger.info(f"Rolled up bandwidth days {daily_from} -> {daily_until}")
+
+
+def plan_sources(
+    db: Session, start: datetime, end: datetime
+) -> Tuple[str, List[Tuple[object, datetime, datetime]]]:
+    """
+    Pick the output resolution for [start, end] and split the range into
+    (source, lower, upper) pieces: raw rows (source None) for anything older
+    than the rollups, the coarsest rollup up to its watermark, then finer
+    rollups, then raw rows for the unrolled tail.
+    """
+    if end - start > timedelta(days=settings.ANALYTICS_HOURLY_MAX_DAYS):
+        unit = "day"
+        chain = ((BandwidthRollupDaily, DAILY), (BandwidthRollupHourly, HOURLY))
+        lower = floor_day(start)
+    else:
+        unit = "hour"
+        chain = ((BandwidthRollupHourly, HOURLY),)
+        lower = floor_hour(start)
+
+    pieces = []
+
+    # Anything before the first hourly bucket was never rolled up and is
+    # read from raw samples (Postgres plus the cold archive)
+    floor = db.query(func.min(BandwidthRollupHourly.bucket)).scalar()
+    if floor is not None and start < floor:
+        pieces.append((None, start, min(floor, end)))
+        lower = floor_day(floor) if unit == "day" else floor
+
+    for model, name in chain:
+        watermark = get_watermark(db, name)
+        if watermark is None or watermark <= lower:
+            continue
+        upper = min(watermark, end)
+        if upper > lower:
+            pieces.append((model, lower, upper))
+            lower = upper
+
+    if lower < end or not pieces:
+        pieces.append((None, max(lower, start), end))
+    return unit, pieces
@@ -0,0 +1,108 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Device, NodeDailyUptime, StatusHistory, Switch
+from app.services.metrics.availability import (
+    Availability,
+    NodeKey,
+    bucket_starts,
+    compute_availability,
+    node_filter,
+    node_keys,
+)
+from app.services.metrics.rollups import floor_day, get_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+UPTIME = NodeDailyUptime.__tablename__
+
+DAY_SECONDS = 86400
+
+
+def replay_uptime(
+    db: Session, lower: datetime, upper: datetime, nodes: List[NodeKey]
+) -> Availability:
+    """Online and known seconds per node and UTC day, `lower` must be midnight."""
+    return compute_availability(db, nodes, lower, upper, DAY_SECONDS)
+
+
+def _all_nodes(db: Session) -> List[NodeKey]:
+    device_ids = [row[0] for row in db.query(Device.device_id).all()]
+    switch_ids = [row[0] for row in db.query(Switch.switch_id).all()]
+    return node_keys(device_ids, switch_ids)
+
+
+def refresh_daily_uptime(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Finalize every closed UTC day after the watermark into node_daily_uptime.
+    Normally that is just yesterday, once per night; a fresh install
+    backfills UPTIME_ROLLUP_MAX_CATCHUP_DAYS per call.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    day_from = get_watermark(db, UPTIME)
+    if day_from is None:
+        earliest = db.query(func.min(StatusHistory.changed_at)).scalar()
+        if earliest is None:
+            return
+        day_from = floor_day(earliest)
+
+    day_until = min(
+        floor_day(now),
+        day_from + timedelta(days=settings.UPTIME_ROLLUP_MAX_CATCHUP_DAYS),
+    )
+    if day_until <= day_from:
+        return
+
+    daily = replay_uptime(db, day_from, day_until, _all_nodes(db))
+    days = [start.date() for start in bucket_starts(daily.edges)]
+    node_idx, day_idx = np.nonzero(daily.known)
+    rows = [
+        {
+            "node_type": daily.nodes[n][0],
+            "node_id": daily.nodes[n][1],
+            "day": days[d],
+            "online_seconds": float(daily.online[n, d]),
+            "total_seconds": float(daily.known[n, d]),
+        }
+        for n, d in zip(node_idx, day_idx)
+    ]
+
+    if rows:
+        stmt = insert(NodeDailyUptime)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["node_type", "node_id", "day"],
+            set_={
+                "online_seconds": stmt.excluded.online_seconds,
+                "total_seconds": stmt.excluded.total_seconds,
+            },
+        )
+        db.execute(stmt, rows)
+    set_watermark(db, UPTIME, day_until)
+    db.commit()
+    logger.info(f"Finalized node uptime days {day_from} -> {day_until}")
+
+
+def daily_uptime_totals(
+    db: Session, start: date, end: date, nodes: List[NodeKey]
+) -> Dict[date, Tuple[float, float]]:
+    """(online, total) seconds summed over `nodes` per finalized day in [start, end)."""
+    if not nodes:
+        return {}
+
+    u = NodeDailyUptime
+    rows = (
+        db.query(u.day, func.sum(u.online_seconds), func.sum(u.total_seconds))
+        .filter(u.day >= start, u.day < end)
+        .filter(node_filter(u, nodes))
+        .group_by(u.day)
+        .all()
+    )
+    return {day: (online, total) for day, online, total in rows}
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import NodeAlert
+
+# Full reload from the partial active index, catching changes no writer
+# reported (e.g. alerts removed by a node delete cascade)
+ACTIVE_ALERTS_RELOAD_SECONDS = 300
+
+AlertKey = Tuple[str, int, str]
+
+
+class ActiveAlert(NamedTuple):
+    alert_id: int
+    node_type: str
+    node_id: int
+    alert_type: str
+    severity: Optional[str]
+    message: Optional[str]
+    librenms_alert_id: Optional[int]
+
+
+def _from_alert(alert) -> ActiveAlert:
+    # node_type/node_id are generated by the database, so derive them here
+    # instead of reading them back from a freshly inserted row
+    is_device = alert.device_id is not None
+    return ActiveAlert(
+        alert_id=alert.alert_id,
+        node_type="device" if is_device else "switch",
+        node_id=alert.device_id if is_device else alert.switch_id,
+        alert_type=alert.alert_type,
+        severity=alert.severity,
+        message=alert.message,
+        librenms_alert_id=alert.librenms_alert_id,
+    )
+
+
+class ActiveAlertSet:
+    """
+    In-memory copy of the active alerts, which are a small subset of
+    node_alerts. Writers report alerts after committing them so the hot
+    paths (threshold checks, stale LibreNMS clearing, dashboard counts)
+    can decide without querying the alert history.
+    """
+
+    _lock = threading.Lock()
+    _by_id: Dict[int, ActiveAlert] = {}
+    # (node_type, node_id, alert_type) -> active alert ids
+    _by_key: Dict[AlertKey, Set[int]] = {}
+    _loaded_at: Optional[float] = None
+
+    @classmethod
+    def reload(cls, db: Session) -> None:
+        rows = (
+            db.query(
+                NodeAlert.alert_id,
+                NodeAlert.node_type,
+                NodeAlert.node_id,
+                NodeAlert.alert_type,
+                NodeAlert.severity,
+                NodeAlert.message,
+                NodeAlert.librenms_alert_id,
+            )
+            .filter(NodeAlert.status == "active")
+            .all()
+        )
+        by_id = {row.alert_id: ActiveAlert(*row) for row in rows}
+        by_key: Dict[AlertKey, Set[int]] = {}
+        for alert in by_id.values():
+            by_key.setdefault(alert[1:4], set()).add(alert.alert_id)
+
+        with cls._lock:
+            cls._by_id = by_id
+            cls._by_key = by_key
+            cls._loaded_at = time.monotonic()
+
+    @classmethod
+    def ensure_loaded(cls, db: Session) -> None:
+        if (
+            cls._loaded_at is None
+            or time.monotonic() - cls._loaded_at >= ACTIVE_ALERTS_RELOAD_SECONDS
+        ):
+            cls.reload(db)
+
+    @classmethod
+    def put(cls, alerts: Iterable) -> None:
+        """Record committed alert rows; rows no longer active are dropped."""
+        with cls._lock:
+            for alert in alerts:
+                if alert.status != "active":
+                    cls._discard(alert.alert_id)
+                    continue
+                entry = _from_alert(alert)
+                cls._discard(entry.alert_id)
+                cls._by_id[entry.alert_id] = entry
+                cls._by_key.setdefault(entry[1:4], set()).add(entry.alert_id)
+
+    @classmethod
+    def discard(cls, alert_ids: Iterable[int]) -> None:
+        with cls._lock:
+            for alert_id in alert_ids:
+                cls._discard(alert_id)
+
+    @classmethod
+    def _discard(cls, alert_id: int) -> None:
+        entry = cls._by_id.pop(alert_id, None)
+        if entry is None:
+            return
+        ids = cls._by_key.get(entry[1:4])
+        if ids is not None:
+            ids.discard(alert_id)
+            if not ids:
+                del cls._by_key[entry[1:4]]
+
+    @classmethod
+    def get(
+        cls, node_type: str, node_id: int, alert_type: str
+    ) -> Optional[ActiveAlert]:
+        """Newest active alert of that type on the node, if any."""
+        with cls._lock:
+            ids = cls._by_key.get((node_type, node_id, alert_type))
+            return cls._by_id[max(ids)] if ids else None
+
+    @classmethod
+    def librenms_alerts(cls) -> List[ActiveAlert]:
+        with cls._lock:
+            return [a for a in cls._by_id.values() if a.librenms_alert_id is not None]
+
+    @classmethod
+    def count_by_node(cls) -> Dict[Tuple[str, int], int]:
+        counts: Dict[Tuple[str, int], int] = {}
+        with cls._lock:
+            for alert in cls._by_id.values():
+                key = (alert.node_type, alert.node_id)
+                counts[key] = counts.get(key, 0) + 1
+        return counts
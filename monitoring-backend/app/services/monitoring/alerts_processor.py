@@ -1,17 +1,55 @@
 import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set
-
-from sqlalchemy import or_
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Integer,
+    all_,
+    and_,
+    bindparam,
+    case,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session
 
 from app.core.database import create_session
-from app.models import Alert, Device, Switch, SwitchAlert
+from app.models import Device, Location, NodeAlert, Switch
+from app.services.monitoring.active_alerts import ActiveAlert, ActiveAlertSet
 from app.services.normalizer import normalize_status
 
 logger = logging.getLogger(__name__)
 
+# Active LibreNMS alerts keyed by librenms_alert_id
+HotAlerts = Dict[int, ActiveAlert]
+# librenms_device_id -> (node id, node name, location name)
+NodeRefs = Dict[int, Tuple[int, str, Optional[str]]]
+
+# Rows per INSERT ... ON CONFLICT statement, well under the bind limit
+UPSERT_CHUNK_SIZE = 1000
+
+# Columns the upsert may change on an existing alert
+UPSERT_TRACKED = ("device_id", "switch_id", "status", "severity", "message")
+
+# Returned by the upsert and the stale clear, enough for the hot set and
+# the notifications
+RETURNED_COLUMNS = (
+    "alert_id",
+    "device_id",
+    "switch_id",
+    "librenms_alert_id",
+    "alert_type",
+    "severity",
+    "message",
+    "status",
+)
+
 try:
     from app.notifications import notify_all_channels  # type: ignore
 except Exception:
@@ -29,25 +67,28 @@ def _is_device_down_alert(message: str, rule: str) -> bool:
     return any(k in msg for k in keywords) or any(k in r for k in keywords)
 
 
-def _parse_alert_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
-    librenms_alert_id = raw.get("id") or raw.get("alert_id") or raw.get("alertId")
+def _to_int(value: Any) -> Optional[int]:
     try:
-        librenms_alert_id_int = (
-            int(librenms_alert_id) if librenms_alert_id is not None else None
-        )
+        return int(value) if value is not None else None
     except Exception:
-        librenms_alert_id_int = None
+        return None
+
+
+def _parse_alert_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
+    librenms_alert_id = raw.get("id") or raw.get("alert_id") or raw.get("alertId")
 
     status = normalize_status(
         raw.get("status") or raw.get("state") or raw.get("alert_status") or "active"
     )
 
     return {
-        "librenms_alert_id": librenms_alert_id_int,
-        "librenms_device_id": raw.get("device_id")
-        or raw.get("deviceId")
-        or raw.get("device")
-        or raw.get("hostname_device_id"),
+        "librenms_alert_id": _to_int(librenms_alert_id),
+        "librenms_device_id": _to_int(
+            raw.get("device_id")
+            or raw.get("deviceId")
+            or raw.get("device")
+            or raw.get("hostname_device_id")
+        ),
         "alert_type": raw.get("type")
         or raw.get("rule")
         or raw.get("alert")
@@ -110,167 +151,236 @@ async def _notify_alert_change(
         )
 
 
-async def _upsert_librenms_alert(
-    db: Session,
-    parsed: Dict[str, Any],
-    active_dev_ids: Set[int],
-    active_sw_ids: Set[int],
-) -> int:
-    if not _is_device_down_alert(parsed["message"], parsed["alert_type"]):
-        return 0
-
-    lnms_dev_id = parsed["librenms_device_id"]
+def _unchanged_active_alert(
+    hot: HotAlerts, parsed: Dict[str, Any]
+) -> Optional[ActiveAlert]:
+    """Hot-set entry that an active LibreNMS alert would leave as it is."""
     lnms_alert_id = parsed["librenms_alert_id"]
-    status = parsed["status"]
-
-    target_switch = (
-        db.query(Switch).filter(Switch.librenms_device_id == lnms_dev_id).first()
-        if lnms_dev_id
-        else None
-    )
-    target_device = (
-        db.query(Device).filter(Device.librenms_device_id == lnms_dev_id).first()
-        if lnms_dev_id
-        else None
+    if parsed["status"] != "active" or lnms_alert_id is None:
+        return None
+    entry = hot.get(lnms_alert_id)
+    if entry is None:
+        return None
+    if entry.severity != parsed["severity"] or entry.message != parsed["message"]:
+        return None
+    return entry
+
+
+def _node_refs(db: Session, model, id_col, lnms_dev_ids: Set[int]) -> NodeRefs:
+    """Nodes of one kind by librenms_device_id, with names, in one query."""
+    if not lnms_dev_ids:
+        return {}
+    rows = (
+        db.query(model.librenms_device_id, id_col, model.name, Location.name)
+        .outerjoin(Location, model.location_id == Location.location_id)
+        .filter(model.librenms_device_id.in_(lnms_dev_ids))
     )
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
 
-    if (target_switch and target_device) or (not target_switch and not target_device):
-        return 0
 
-    Model = SwitchAlert if target_switch else Alert
-    if status == "active" and lnms_alert_id is not None:
-        (active_sw_ids if target_switch else active_dev_ids).add(lnms_alert_id)
+def _upsert_rows(
+    parsed_alerts: List[Dict[str, Any]],
+    devices: NodeRefs,
+    switches: NodeRefs,
+    hot: HotAlerts,
+    active_ids: Set[int],
+) -> List[Dict[str, Any]]:
+    """Rows to upsert for a batch; records the active ids along the way."""
+    now = _utcnow()
+    by_lnms_id: Dict[int, Dict[str, Any]] = {}
+    without_id: List[Dict[str, Any]] = []
+
+    for parsed in parsed_alerts:
+        if not _is_device_down_alert(parsed["message"], parsed["alert_type"]):
+            continue
+
+        # Most polls repeat alerts that are already active; leave them out
+        unchanged = _unchanged_active_alert(hot, parsed)
+        if unchanged:
+            active_ids.add(unchanged.librenms_alert_id)
+            continue
+
+        lnms_dev_id = parsed["librenms_device_id"]
+        switch = switches.get(lnms_dev_id)
+        device = devices.get(lnms_dev_id)
+        if (switch and device) or (not switch and not device):
+            continue
+
+        lnms_alert_id = parsed["librenms_alert_id"]
+        if parsed["status"] == "active" and lnms_alert_id is not None:
+            active_ids.add(lnms_alert_id)
+
+        row = {
+            "librenms_alert_id": lnms_alert_id,
+            "device_id": device[0] if device else None,
+            "switch_id": switch[0] if switch else None,
+            "alert_type": parsed["alert_type"] or "unknown",
+            "severity": parsed["severity"],
+            "message": parsed["message"],
+            "status": parsed["status"],
+            "created_at": now,
+            "cleared_at": parsed["cleared_at"],
+        }
+        if lnms_alert_id is None:
+            without_id.append(row)
+        else:
+            # One row per conflict key: ON CONFLICT cannot touch a row twice
+            by_lnms_id[lnms_alert_id] = row
+
+    return list(by_lnms_id.values()) + without_id
+
+
+def _upsert_librenms_alerts(db: Session, rows: List[Dict[str, Any]]) -> list:
+    """
+    Insert new alerts and update changed ones with INSERT ... ON CONFLICT
+    (librenms_alert_id) DO UPDATE. The WHERE on the update skips rows that
+    would not change, so RETURNING yields exactly the inserted and changed
+    alerts; xmax = 0 tells the inserted ones apart.
+    """
+    changed = []
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(NodeAlert).values(rows[i : i + UPSERT_CHUNK_SIZE])
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NodeAlert.librenms_alert_id],
+            set_={
+                "device_id": excluded.device_id,
+                "switch_id": excluded.switch_id,
+                "status": excluded.status,
+                "severity": excluded.severity,
+                "message": excluded.message,
+                # Keep the first clear time; reactivation leaves it alone
+                "cleared_at": case(
+                    (
+                        excluded.status == "cleared",
+                        func.coalesce(NodeAlert.cleared_at, excluded.cleared_at),
+                    ),
+                    else_=NodeAlert.cleared_at,
+                ),
+            },
+            where=or_(
+                tuple_(
+                    *[NodeAlert.__table__.c[c] for c in UPSERT_TRACKED]
+                ).is_distinct_from(tuple_(*[excluded[c] for c in UPSERT_TRACKED])),
+                and_(excluded.status == "cleared", NodeAlert.cleared_at.is_(None)),
+            ),
+        ).returning(
+            *[NodeAlert.__table__.c[c] for c in RETURNED_COLUMNS],
+            (literal_column("xmax") == 0).label("inserted"),
+        )
+        changed.extend(db.execute(stmt).all())
+    return changed
 
-    existing = (
-        db.query(Model).filter(Model.librenms_alert_id == lnms_alert_id).first()
-        if lnms_alert_id
-        else None
-    )
 
-    dev_name = target_device.name if target_device else None
-    sw_name = target_switch.name if target_switch else None
-    loc_name = (
-        target_switch.location.name
-        if target_switch and target_switch.location
-        else (
-            target_device.location.name
-            if target_device and target_device.location
-            else None
+async def _notify_changes(
+    changed: list, cleared: list, devices: NodeRefs, switches: NodeRefs
+) -> None:
+    """One notification per upserted or cleared alert, sent concurrently."""
+    device_by_id = {ref[0]: ref for ref in devices.values()}
+    switch_by_id = {ref[0]: ref for ref in switches.values()}
+
+    notifications = []
+    for row in changed:
+        device = device_by_id.get(row.device_id)
+        switch = switch_by_id.get(row.switch_id)
+        node = switch or device
+        notifications.append(
+            _notify_alert_change(
+                "new" if row.inserted else "update",
+                row,
+                row.librenms_alert_id,
+                device[1] if device else None,
+                switch[1] if switch else None,
+                node[2] if node else None,
+            )
         )
-    )
-
-    if existing:
-        changed = False
-        if existing.status != status:
-            existing.status, changed = status, True
-        if existing.severity != parsed["severity"]:
-            existing.severity, changed = parsed["severity"], True
-        if existing.message != parsed["message"]:
-            existing.message, changed = parsed["message"], True
-        if status == "cleared" and not getattr(existing, "cleared_at", None):
-            existing.cleared_at, changed = parsed["cleared_at"] or _utcnow(), True
-
-        if changed:
-            db.add(existing)
-            db.flush()
-            await _notify_alert_change(
-                "update", existing, lnms_alert_id, dev_name, sw_name, loc_name
+    for row in cleared:
+        notifications.append(
+            _notify_alert_change(
+                "cleared",
+                row,
+                row.librenms_alert_id,
+                row.device_name,
+                row.switch_name,
+                row.location_name,
             )
-            return 1
-        return 0
-
-    kwargs = {
-        "librenms_alert_id": lnms_alert_id,
-        "category_id": None,
-        "alert_type": parsed["alert_type"] or "unknown",
-        "severity": parsed["severity"],
-        "message": parsed["message"],
-        "assigned_to_user_id": None,
-        "created_at": _utcnow(),
-        "cleared_at": parsed["cleared_at"],
-        "status": status,
-        "switch_id": target_switch.switch_id if target_switch else None,
-        "device_id": target_device.device_id if target_device else None,
-    }
-
-    new_alert = Model(
-        **{
-            k: v
-            for k, v in kwargs.items()
-            if v is not None
-            or k in ["cleared_at", "category_id", "assigned_to_user_id"]
-        }
-    )
-    db.add(new_alert)
-    db.flush()
-    await _notify_alert_change(
-        "new", new_alert, lnms_alert_id, dev_name, sw_name, loc_name
-    )
-    return 1
-
-
-async def _clear_stale_alerts(
-    db: Session, active_dev_ids: Set[int], active_sw_ids: Set[int]
-) -> int:
-    cleared = 0
-    now = _utcnow()
-
-    for a in (
-        db.query(Alert)
-        .filter(
-            or_(Alert.status == "active", Alert.status == "1"),
-            Alert.librenms_alert_id.isnot(None),
         )
-        .all()
-    ):
-        if a.librenms_alert_id not in active_dev_ids:
-            a.status, a.cleared_at = "cleared", a.cleared_at or now
-            db.add(a)
-            cleared += 1
-
-    for a in (
-        db.query(SwitchAlert)
-        .filter(
-            or_(SwitchAlert.status == "active", SwitchAlert.status == "1"),
-            SwitchAlert.librenms_alert_id.isnot(None),
+    await asyncio.gather(*notifications)
+
+
+def _clear_stale_alerts(db: Session, active_ids: Set[int]) -> list:
+    """
+    Clear every active LibreNMS alert missing from the feed with one
+    UPDATE ... RETURNING, served by the partial active-alert index. The
+    update runs in a CTE so the returned rows come back joined to the node
+    and location names their notifications need.
+    """
+    cleared = (
+        update(NodeAlert)
+        .where(
+            NodeAlert.status == "active",
+            NodeAlert.librenms_alert_id.isnot(None),
+            NodeAlert.librenms_alert_id
+            != all_(bindparam("active_ids", sorted(active_ids), type_=ARRAY(Integer))),
+        )
+        .values(
+            status="cleared", cleared_at=func.coalesce(NodeAlert.cleared_at, func.now())
         )
-        .all()
-    ):
-        if a.librenms_alert_id not in active_sw_ids:
-            a.status, a.cleared_at = "cleared", a.cleared_at or now
-            db.add(a)
-            cleared += 1
-
-    if cleared > 0:
-        await _maybe_notify(
-            {
-                "type": "alert",
-                "message": f"Cleared {cleared} missing alerts",
-                "severity": "info",
-                "status": "cleared",
-            }
+        .returning(*[NodeAlert.__table__.c[c] for c in RETURNED_COLUMNS])
+        .cte("cleared")
+    )
+    return db.execute(
+        select(
+            cleared,
+            Device.name.label("device_name"),
+            Switch.name.label("switch_name"),
+            Location.name.label("location_name"),
         )
-    return cleared
+        .outerjoin(Device, cleared.c.device_id == Device.device_id)
+        .outerjoin(Switch, cleared.c.switch_id == Switch.switch_id)
+        .outerjoin(
+            Location,
+            func.coalesce(Device.location_id, Switch.location_id)
+            == Location.location_id,
+        )
+    ).all()
 
 
 async def process_librenms_alerts(librenms_alerts: List[Dict[str, Any]]) -> int:
     processed = 0
     db = create_session()
     try:
-        active_dev_ids: Set[int] = set()
-        active_sw_ids: Set[int] = set()
+        active_ids: Set[int] = set()
 
+        parsed_alerts = []
         for raw in librenms_alerts or []:
             try:
-                parsed = _parse_alert_payload(raw)
-                processed += await _upsert_librenms_alert(
-                    db, parsed, active_dev_ids, active_sw_ids
-                )
+                parsed_alerts.append(_parse_alert_payload(raw))
             except Exception:
-                logger.exception("Failed to process single librenms alert: %s", raw)
+                logger.exception("Failed to parse librenms alert: %s", raw)
 
-        processed += await _clear_stale_alerts(db, active_dev_ids, active_sw_ids)
+        lnms_dev_ids = {
+            p["librenms_device_id"]
+            for p in parsed_alerts
+            if p["librenms_device_id"] is not None
+        }
+        devices = _node_refs(db, Device, Device.device_id, lnms_dev_ids)
+        switches = _node_refs(db, Switch, Switch.switch_id, lnms_dev_ids)
+
+        ActiveAlertSet.ensure_loaded(db)
+        hot = {a.librenms_alert_id: a for a in ActiveAlertSet.librenms_alerts()}
+
+        rows = _upsert_rows(parsed_alerts, devices, switches, hot, active_ids)
+        changed = _upsert_librenms_alerts(db, rows) if rows else []
+        processed += len(changed)
+
+        cleared = _clear_stale_alerts(db, active_ids)
+        processed += len(cleared)
         db.commit()
+
+        ActiveAlertSet.discard(row.alert_id for row in cleared)
+        ActiveAlertSet.put(changed)
+        await _notify_changes(changed, cleared, devices, switches)
     except Exception as e:
         db.rollback()
         raise e
@@ -0,0 +1,164 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.monitoring.ws_topics import Subscription, node_topics
+
+# (frame key, id field) of each node kind in a metrics_update frame
+NODE_KINDS = (("device_metrics", "device_id"), ("switch_metrics", "switch_id"))
+
+# Rewritten on every cache write, so they never make a node count as changed
+VOLATILE_FIELDS = frozenset({"updated_at"})
+
+
+def merge_deltas(
+    older: Dict[str, Any], newer: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    One delta with the effect of applying `older` and then `newer`, from
+    older's base_seq to newer's seq. None when they do not chain: either is
+    a keyframe, or newer was not computed on top of older.
+    """
+    if older.get("keyframe") is not False or newer.get("keyframe") is not False:
+        return None
+    if newer.get("base_seq") != older.get("seq"):
+        return None
+
+    merged = {**newer, "base_seq": older["base_seq"]}
+    for key, id_field in NODE_KINDS:
+        removed_key = f"removed_{id_field}s"
+        nodes = {m[id_field]: dict(m) for m in older.get(key, [])}
+        removed = set(older.get(removed_key, []))
+        for metrics in newer.get(key, []):
+            node_id = metrics[id_field]
+            # Back after a removal: newer carries it in full
+            removed.discard(node_id)
+            nodes.setdefault(node_id, {}).update(metrics)
+        for node_id in newer.get(removed_key, []):
+            nodes.pop(node_id, None)
+            removed.add(node_id)
+        merged[key] = list(nodes.values())
+        merged[removed_key] = sorted(removed)
+    return merged
+
+
+class MetricsStream:
+    """
+    Turns the live metrics of each poller tick into metrics_update frames.
+
+    Every frame has a sequence number one above the previous frame. A
+    keyframe carries every node in full. A delta carries base_seq (the
+    frame it applies on top of), only the changed fields of each changed
+    node next to its id, and the ids of nodes that went away. Clients that
+    see a base_seq other than the last seq they applied ask for a keyframe.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self._timestamp: Optional[str] = None
+        # frame key -> node id -> metrics as of self.seq
+        self._state: Dict[str, Dict[int, dict]] = {key: {} for key, _ in NODE_KINDS}
+        self._keyframe_at: Optional[float] = None
+        # (frame key, node id) -> subscription topics, per state
+        self._topics: Dict[Tuple[str, int], FrozenSet[str]] = {}
+
+    def next_frame(
+        self,
+        device_metrics: List[Dict[str, Any]],
+        switch_metrics: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Frame for this tick, or None when no node changed."""
+        current = {
+            "device_metrics": {m["device_id"]: m for m in device_metrics},
+            "switch_metrics": {m["switch_id"]: m for m in switch_metrics},
+        }
+        previous = self._state
+        self._state = current
+        self._topics = {}
+        self._timestamp = datetime.now().isoformat()
+
+        now = time.monotonic()
+        if (
+            self._keyframe_at is None
+            or now - self._keyframe_at >= settings.METRICS_KEYFRAME_INTERVAL_SECONDS
+        ):
+            self.seq += 1
+            self._keyframe_at = now
+            return self.keyframe()
+
+        frame: Dict[str, Any] = {
+            "type": "metrics_update",
+            "keyframe": False,
+            "seq": self.seq + 1,
+            "base_seq": self.seq,
+            "timestamp": self._timestamp,
+        }
+        changed = False
+        for key, id_field in NODE_KINDS:
+            old_nodes, new_nodes = previous[key], current[key]
+            deltas = []
+            for node_id, metrics in new_nodes.items():
+                old = old_nodes.get(node_id)
+                if old is None:
+                    deltas.append(metrics)
+                    continue
+                delta = {
+                    field: value
+                    for field, value in metrics.items()
+                    if field not in VOLATILE_FIELDS and old.get(field) != value
+                }
+                if delta:
+                    delta[id_field] = node_id
+                    deltas.append(delta)
+            removed = [node_id for node_id in old_nodes if node_id not in new_nodes]
+
+            frame[key] = deltas
+            frame[f"removed_{id_field}s"] = removed
+            changed = changed or bool(deltas or removed)
+
+        if not changed:
+            return None
+        self.seq += 1
+        return frame
+
+    def _node_topics(self, key: str, id_field: str, node_id: int) -> FrozenSet[str]:
+        topics = self._topics.get((key, node_id))
+        if topics is None:
+            node_type = id_field.removesuffix("_id")
+            topics = node_topics(node_type, node_id, self._state[key].get(node_id))
+            self._topics[(key, node_id)] = topics
+        return topics
+
+    def frame_for(
+        self, frame: Dict[str, Any], subscription: Subscription
+    ) -> Dict[str, Any]:
+        """
+        `frame` limited to the nodes `subscription` wants. seq and base_seq
+        stay, so a client that filters still sees an unbroken sequence.
+        """
+        if not subscription.node_filters:
+            return frame
+        filtered = dict(frame)
+        for key, id_field in NODE_KINDS:
+            filtered[key] = [
+                metrics
+                for metrics in frame[key]
+                if subscription.wants_node(
+                    self._node_topics(key, id_field, metrics[id_field])
+                )
+            ]
+        return filtered
+
+    def keyframe(self) -> Dict[str, Any]:
+        """Every node in full as of the current seq, also sent on request."""
+        return {
+            "type": "metrics_update",
+            "keyframe": True,
+            "seq": self.seq,
+            "timestamp": self._timestamp or datetime.now().isoformat(),
+            **{key: list(self._state[key].values()) for key, _ in NODE_KINDS},
+        }
+
+
+metrics_stream = MetricsStream()
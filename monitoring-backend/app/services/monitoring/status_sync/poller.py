@@ -3,9 +3,11 @@ import logging
 import time
 from datetime import datetime
 
+from sqlalchemy.orm import selectinload
+
 from app.core.config import settings
 from app.core.database import create_session
-from app.models import Device, Switch
+from app.models import Device, Location, LocationGroup, Switch
 from app.services.librenms.client import LibreNMSService
 from app.services.metrics.aggregation import (
     aggregate_port_metrics_by_node,
@@ -13,8 +15,16 @@ from app.services.metrics.aggregation import (
     to_float,
 )
 from app.services.metrics.cache import MetricsCacheService
+from app.services.metrics.dashboard_cache import DashboardSummaryCache
+from app.services.metrics.incidents import count_new_incidents
 from app.services.metrics.ping import ping_probe
+from app.services.monitoring.metrics_stream import metrics_stream
 from app.services.monitoring.websocket_manager import ws_manager
+from app.services.resource_versions import (
+    NODE_METRICS,
+    NODE_STATUS,
+    resource_versions,
+)
 from app.services.settings_cache import settings_cache
 
 from . import state
@@ -46,6 +56,12 @@ async def run_librenms_sync_loop(libre_service: LibreNMSService):
                     switch_capacity,
                     _,
                 ) = await aggregate_port_metrics_by_node(db, None)
+                if (
+                    device_totals != state.cached_device_totals
+                    or switch_totals != state.cached_switch_totals
+                    or switch_capacity != state.cached_switch_capacity
+                ):
+                    resource_versions.bump(NODE_METRICS)
                 state.cached_device_totals = device_totals
                 state.cached_switch_totals = switch_totals
                 state.cached_switch_capacity = switch_capacity
@@ -81,14 +97,11 @@ async def _broadcast_websocket_metrics(devices, switches):
     ]
 
     now_iso = datetime.now().isoformat()
-    await ws_manager.broadcast(
-        {
-            "type": "metrics_update",
-            "timestamp": now_iso,
-            "device_metrics": live_device_metrics,
-            "switch_metrics": live_switch_metrics,
-        }
-    )
+    frame = metrics_stream.next_frame(live_device_metrics, live_switch_metrics)
+    if frame is not None:
+        await ws_manager.broadcast_per_subscription(
+            "metrics_update", lambda sub: metrics_stream.frame_for(frame, sub)
+        )
     await ws_manager.broadcast(
         {
             "type": "heartbeat",
@@ -109,11 +122,22 @@ async def _broadcast_websocket_metrics(devices, switches):
     )
 
 
+def _location_chain(model):
+    # Location, group and parent group in three queries instead of one lazy
+    # load per node, for the metrics cache and DashboardSummaryCache
+    return (
+        selectinload(model.location)
+        .selectinload(Location.group)
+        .selectinload(LocationGroup.parent)
+    )
+
+
 async def poll_and_broadcast_status() -> int:
     changes = 0
     db = create_session()
     try:
-        devices = db.query(Device).all()
+        devices = db.query(Device).options(_location_chain(Device)).all()
+        device_latency = {}
         ips_to_ping = [d.ip_address for d in devices if d.ip_address]
         bulk_ping_results = (
             await ping_probe.ping_bulk(ips_to_ping)
@@ -135,6 +159,7 @@ async def poll_and_broadcast_status() -> int:
                     device.librenms_device_id
                 ]["latency_ms"]
 
+            device_latency[device.device_id] = to_finite_float(latency_ms)
             in_mbps, out_mbps = state.cached_device_totals.get(
                 device.device_id, (0.0, 0.0)
             )
@@ -152,7 +177,7 @@ async def poll_and_broadcast_status() -> int:
                     "status": curr_status,
                     "in_mbps": round(in_mbps, 2),
                     "out_mbps": round(out_mbps, 2),
-                    "latency_ms": to_finite_float(latency_ms),
+                    "latency_ms": device_latency[device.device_id],
                     "monitored": device.librenms_device_id is not None,
                     "device_type": device.device_type,
                     "location_name": loc.name if loc else None,
@@ -161,7 +186,7 @@ async def poll_and_broadcast_status() -> int:
                 },
             )
 
-        switches = db.query(Switch).all()
+        switches = db.query(Switch).options(_location_chain(Switch)).all()
         for switch in switches:
             curr_status, changed = await evaluate_node_state(db, switch, "switch")
             if changed:
@@ -193,7 +218,18 @@ async def poll_and_broadcast_status() -> int:
             )
 
         sync_threshold_alerts_logic(db, devices, switches)
+        new_incidents = count_new_incidents(db)
+        DashboardSummaryCache.rebuild_nodes(
+            devices,
+            switches,
+            state.cached_device_totals,
+            state.cached_switch_totals,
+            device_latency,
+        )
         db.commit()
+        if changes > 0:
+            resource_versions.bump(NODE_STATUS)
+        DashboardSummaryCache.refresh_alerts(db, force=changes > 0 or new_incidents > 0)
 
         if ws_manager.connection_count > 0:
             await _broadcast_websocket_metrics(devices, switches)
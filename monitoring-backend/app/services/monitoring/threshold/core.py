@@ -5,8 +5,9 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
-from app.models import Alert, Device, Switch, SwitchAlert
+from app.models import Device, NodeAlert, Switch
 from app.notifications import notify_all_channels
+from app.services.monitoring.active_alerts import ActiveAlertSet
 from app.services.settings_cache import settings_cache
 
 logger = logging.getLogger(__name__)
@@ -40,15 +41,15 @@ def _schedule_notify(payload: dict) -> None:
         pass
 
 
-def _get_latest_alert(db: Session, node_type: str, node_id: int, alert_type: str):
-    Model = SwitchAlert if node_type == "switch" else Alert
-    id_col = Model.switch_id if node_type == "switch" else Model.device_id
-    return (
-        db.query(Model)
-        .filter(id_col == node_id, Model.alert_type == alert_type)
-        .order_by(Model.created_at.desc())
-        .first()
-    )
+def _load_active_alert(db: Session, active) -> Optional[NodeAlert]:
+    """Row of a hot-set entry; entries the database no longer has active are dropped."""
+    if active is None:
+        return None
+    alert = db.get(NodeAlert, active.alert_id)
+    if alert is None or alert.status != "active":
+        ActiveAlertSet.discard([active.alert_id])
+        return None
+    return alert
 
 
 def _get_node_context(db: Session, node_type: str, node_id: int) -> dict:
@@ -92,7 +93,8 @@ def sync_node_alert(
 
     mapped = _map_severity(severity)
     k = (node_type, node_id, alert_type)
-    latest = _get_latest_alert(db, node_type, node_id, alert_type)
+    ActiveAlertSet.ensure_loaded(db)
+    active = ActiveAlertSet.get(node_type, node_id, alert_type)
     is_offline_type = alert_type == "Offline"
 
     if mapped is None:
@@ -101,10 +103,12 @@ def sync_node_alert(
         if streak < clear_req:
             return
 
-        if latest and latest.status in ("active", "1"):
+        latest = _load_active_alert(db, active)
+        if latest:
             latest.status = "cleared"
             latest.cleared_at = _now()
             db.commit()
+            ActiveAlertSet.discard([latest.alert_id])
 
             if is_offline_type:
                 payload = {
@@ -131,24 +135,17 @@ def sync_node_alert(
     if raise_streak < raise_req:
         return
 
-    if latest and latest.status in ("cleared", "0"):
-        latest = None
+    if active and active.severity == mapped and active.message == message:
+        return
 
+    latest = _load_active_alert(db, active)
     if latest:
-        if (
-            latest.severity == mapped
-            and latest.message == message
-            and latest.status in ("active", "1")
-        ):
-            return
         latest.severity = mapped
         latest.message = message
-        latest.status = "active"
-        latest.cleared_at = None
         db.commit()
+        ActiveAlertSet.put([latest])
         _schedule_notify({"type": "alerts_refresh"})
     else:
-        Model = SwitchAlert if node_type == "switch" else Alert
         kwargs = {
             f"{node_type}_id": node_id,
             "librenms_alert_id": None,
@@ -159,10 +156,11 @@ def sync_node_alert(
             "created_at": _now(),
             "status": "active",
         }
-        new_alert = Model(**kwargs)
+        new_alert = NodeAlert(**kwargs)
         db.add(new_alert)
         db.commit()
         db.refresh(new_alert)
+        ActiveAlertSet.put([new_alert])
 
         payload = {
             "type": "alert",
@@ -1,21 +1,236 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Set
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Set
 
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.services.monitoring.metrics_stream import merge_deltas
+from app.services.monitoring.ws_topics import Subscription, message_node_topics
+
 logger = logging.getLogger(__name__)
 
+# Index key of the sockets that take every event type
+ALL_EVENTS = "*"
+
+# Subscription fields filtering nodes, each indexed on its own
+NODE_DIMENSIONS = ("locations", "device_types", "nodes")
+
+# Close code for clients dropped for not keeping up ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+# Close code for clients whose send failed or timed out ("internal error")
+SEND_FAILED_CLOSE_CODE = 1011
+
+
+# Coalesce keys whose queued message is merged with the newer one instead of
+# replaced; the merge returns None when the two cannot be combined
+MERGERS: Dict[str, Callable[[dict, dict], Optional[dict]]] = {
+    "metrics_update": merge_deltas,
+}
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """
+    Messages a newer one of the same key can stand in for while queued.
+    metrics_update frames are merged (see MERGERS): consecutive deltas fold
+    into one, and a keyframe is never folded, so the latest queued metrics
+    frame is always the one a newer delta chains onto.
+    """
+    event = message.get("type")
+    if event in ("heartbeat", "alerts_refresh", "metrics_update"):
+        return event
+    if event == "status_change":
+        return f"status_change:{message.get('node_type')}:{message.get('id')}"
+    return None
+
+
+class _Outgoing:
+    __slots__ = ("key", "text", "message", "queued_at")
+
+    def __init__(self, key: Optional[str], text: str, message: Optional[dict]):
+        self.key = key
+        self.text = text
+        # Kept only for keys in MERGERS
+        self.message = message
+        self.queued_at = time.monotonic()
+
+
+class ClientConnection:
+    """
+    Bounded outbound queue and writer task of one WebSocket. Enqueueing
+    never waits on the socket, so a client on a slow link only delays its
+    own messages; once its queue is full the slow client policy applies.
+    """
+
+    def __init__(self, websocket: WebSocket, on_close: Callable[[WebSocket], Any]):
+        self.websocket = websocket
+        self._on_close = on_close
+        self._queue: Deque[_Outgoing] = deque()
+        self._queued_by_key: Dict[str, _Outgoing] = {}
+        self._in_flight: Optional[_Outgoing] = None
+        self._wake = asyncio.Event()
+        self.closed = False
+        # Closed by the disconnect policy
+        self.slow = False
+        self.connected_at = datetime.now().isoformat()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_queued = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._writer = asyncio.create_task(self._run())
+
+    def enqueue(
+        self, text: str, key: Optional[str] = None, message: Optional[dict] = None
+    ) -> None:
+        if self.closed:
+            return
+        policy = settings.WS_SLOW_CLIENT_POLICY
+        merge = MERGERS.get(key)
+
+        if policy == "coalesce" and key is not None:
+            queued = self._queued_by_key.get(key)
+            # Keep the older slot (and its lag), send the newer content
+            if queued is not None and merge is None:
+                queued.text = text
+                self.coalesced += 1
+                return
+            if queued is not None and message is not None:
+                merged = merge(queued.message, message)
+                if merged is not None:
+                    queued.message = merged
+                    queued.text = json.dumps(merged)
+                    self.coalesced += 1
+                    return
+
+        if len(self._queue) >= settings.WS_SEND_QUEUE_SIZE:
+            if policy == "disconnect":
+                self.slow = True
+                logger.warning(
+                    "Disconnecting WebSocket client that fell %d messages behind",
+                    settings.WS_SEND_QUEUE_SIZE,
+                )
+                self._drop_client(SLOW_CLIENT_CLOSE_CODE)
+                return
+            self._forget(self._queue.popleft())
+            self.dropped += 1
+
+        outgoing = _Outgoing(key, text, message if merge is not None else None)
+        self._queue.append(outgoing)
+        if key is not None:
+            self._queued_by_key[key] = outgoing
+        self.max_queued = max(self.max_queued, len(self._queue))
+        self._wake.set()
+
+    def _forget(self, outgoing: _Outgoing) -> None:
+        if (
+            outgoing.key is not None
+            and self._queued_by_key.get(outgoing.key) is outgoing
+        ):
+            del self._queued_by_key[outgoing.key]
+
+    async def _run(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+
+                outgoing = self._queue.popleft()
+                self._forget(outgoing)
+                self._in_flight = outgoing
+                await asyncio.wait_for(
+                    self.websocket.send_text(outgoing.text),
+                    timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+                )
+                self._in_flight = None
+                self.sent += 1
+                self.last_lag = time.monotonic() - outgoing.queued_at
+                self.max_lag = max(self.max_lag, self.last_lag)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A TimeoutError has an empty str()
+            logger.warning("Failed to send message to client: %r", e)
+            # Close the socket too, otherwise the client never sees onDone and
+            # keeps waiting on a connection the server no longer writes to
+            self._drop_client(SEND_FAILED_CLOSE_CODE)
+
+    def close(self) -> None:
+        """Stop the writer and drop whatever is still queued"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._queued_by_key.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def _drop_client(self, code: int) -> None:
+        """Close the socket from this side and have the manager forget it"""
+        self.close()
+        asyncio.create_task(self._close_socket(code))
+        asyncio.create_task(self._on_close(self.websocket))
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        oldest = self._in_flight or (self._queue[0] if self._queue else None)
+        client = self.websocket.client
+        return {
+            "client": f"{client.host}:{client.port}" if client else None,
+            "connected_at": self.connected_at,
+            "queued": len(self._queue),
+            "max_queued": self.max_queued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            # Age of the oldest message not yet sent, i.e. how far behind it is
+            "lag_seconds": round(now - oldest.queued_at, 3) if oldest else 0.0,
+            "last_send_lag_seconds": round(self.last_lag, 3),
+            "max_send_lag_seconds": round(self.max_lag, 3),
+        }
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections and provides methods to broadcast messages.
+
+    Every connection has a Subscription (everything until the client sends
+    a subscribe message). Sockets are indexed by event type and by node
+    topic, so a broadcast only looks up and writes to interested sockets.
+    Writes go through each connection's ClientConnection queue, so
+    broadcasting never waits on a client.
     """
 
     def __init__(self):
         # Set of active WebSocket connections
         self.active_connections: Set[WebSocket] = set()
+        self._clients: Dict[WebSocket, ClientConnection] = {}
+        # Clients closed by the disconnect policy since startup
+        self.slow_disconnects = 0
+        self._subscriptions: Dict[WebSocket, Subscription] = {}
+        # event type (or ALL_EVENTS) -> sockets
+        self._by_event: Dict[str, Set[WebSocket]] = {}
+        # dimension -> node topic -> sockets; sockets without a filter on a
+        # dimension are in _unfiltered[dimension]
+        self._by_topic: Dict[str, Dict[str, Set[WebSocket]]] = {
+            dim: {} for dim in NODE_DIMENSIONS
+        }
+        self._unfiltered: Dict[str, Set[WebSocket]] = {
+            dim: set() for dim in NODE_DIMENSIONS
+        }
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket) -> None:
@@ -23,6 +238,8 @@ class ConnectionManager:
         await websocket.accept()
         async with self._lock:
             self.active_connections.add(websocket)
+            self._clients[websocket] = ClientConnection(websocket, self.disconnect)
+            self._index(websocket, Subscription())
         logger.info(
             "WebSocket client connected.  Total connections: %d",
             len(self.active_connections),
@@ -31,53 +248,156 @@ class ConnectionManager:
     async def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection from active connections"""
         async with self._lock:
-            self.active_connections.discard(websocket)
+            if websocket not in self.active_connections:
+                return
+            self._remove(websocket)
         logger.info(
             "WebSocket client disconnected. Total connections: %d",
             len(self.active_connections),
         )
 
+    async def subscribe(self, websocket: WebSocket, subscription: Subscription) -> None:
+        """Replace the subscription of a connected client"""
+        async with self._lock:
+            if websocket not in self.active_connections:
+                return
+            self._unindex(websocket)
+            self._index(websocket, subscription)
+
+    def subscription(self, websocket: WebSocket) -> Subscription:
+        return self._subscriptions.get(websocket, Subscription())
+
+    def _index(self, websocket: WebSocket, subscription: Subscription) -> None:
+        self._subscriptions[websocket] = subscription
+        for event in subscription.events or (ALL_EVENTS,):
+            self._by_event.setdefault(event, set()).add(websocket)
+        for dim in NODE_DIMENSIONS:
+            topics = getattr(subscription, dim)
+            if not topics:
+                self._unfiltered[dim].add(websocket)
+            for topic in topics:
+                self._by_topic[dim].setdefault(topic, set()).add(websocket)
+
+    def _unindex(self, websocket: WebSocket) -> None:
+        subscription = self._subscriptions.pop(websocket, None)
+        if subscription is None:
+            return
+        indexes = [(self._by_event, subscription.events or (ALL_EVENTS,))]
+        for dim in NODE_DIMENSIONS:
+            indexes.append((self._by_topic[dim], getattr(subscription, dim)))
+            self._unfiltered[dim].discard(websocket)
+        for index, keys in indexes:
+            for key in keys:
+                sockets = index.get(key)
+                if sockets is not None:
+                    sockets.discard(websocket)
+                    if not sockets:
+                        del index[key]
+
+    def _remove(self, websocket: WebSocket) -> None:
+        self.active_connections.discard(websocket)
+        self._unindex(websocket)
+        client = self._clients.pop(websocket, None)
+        if client is not None:
+            client.close()
+            if client.slow:
+                self.slow_disconnects += 1
+
+    def _recipients(
+        self, event: Optional[str], topics: Optional[FrozenSet[str]]
+    ) -> Set[WebSocket]:
+        """
+        Sockets subscribed to `event` and, for node events, matching the
+        node on every node dimension they filter on
+        """
+        recipients = self._by_event.get(ALL_EVENTS, set())
+        if event is not None:
+            recipients = recipients | self._by_event.get(event, set())
+        if topics is None or not recipients:
+            return set(recipients)
+
+        for dim in NODE_DIMENSIONS:
+            matching = set(self._unfiltered[dim])
+            for topic in topics:
+                matching |= self._by_topic[dim].get(topic, set())
+            recipients = recipients & matching
+            if not recipients:
+                break
+        return recipients
+
+    def _enqueue(
+        self, connections: Iterable[WebSocket], message: Dict[str, Any]
+    ) -> None:
+        # Serialized once; writer tasks send and clean up clients that fail
+        message_json = json.dumps(message)
+        key = coalesce_key(message)
+        for connection in connections:
+            client = self._clients.get(connection)
+            if client is not None:
+                client.enqueue(message_json, key, message)
+
     async def broadcast(self, message: Dict[str, Any]) -> None:
         """
-        Broadcast a message to all connected clients.
-        Automatically removes disconnected clients
+        Queue a message for the clients subscribed to its type and node,
+        serialized once. Returns without waiting for any client to receive it
         """
         if not self.active_connections:
             return
 
-        message_json = json.dumps(message)
-        disconnected: List[WebSocket] = []
+        topics = message_node_topics(message)
+        async with self._lock:
+            recipients = self._recipients(message.get("type"), topics)
+        if not recipients:
+            return
+
+        self._enqueue(recipients, message)
+
+    async def broadcast_per_subscription(
+        self, event: str, build: Callable[[Subscription], Dict[str, Any]]
+    ) -> None:
+        """
+        Broadcast an event whose payload depends on the subscription (e.g.
+        metrics frames cut down to the subscribed nodes). `build` runs and
+        its result is serialized once per distinct subscription.
+        """
+        if not self.active_connections:
+            return
 
+        groups: Dict[Subscription, List[WebSocket]] = {}
         async with self._lock:
-            connections = list(self.active_connections)
+            for connection in self._recipients(event, None):
+                groups.setdefault(self._subscriptions[connection], []).append(
+                    connection
+                )
 
-        for connection in connections:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.warning("Failed to send message to client: %s", e)
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        if disconnected:
-            async with self._lock:
-                for conn in disconnected:
-                    self.active_connections.discard(conn)
+        for subscription, connections in groups.items():
+            self._enqueue(connections, build(subscription))
 
     async def send_personal_message(
         self, message: Dict[str, Any], websocket: WebSocket
     ) -> None:
-        """Send a message to a specific client"""
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.warning("Failed to send personal message: %s", e)
+        """Queue a message for a specific client, behind its broadcasts"""
+        # Keyed like broadcasts, so a requested keyframe is what later
+        # deltas chain onto
+        self._enqueue((websocket,), message)
 
     @property
     def connection_count(self) -> int:
         """Return the number of active connections."""
         return len(self.active_connections)
 
+    def get_stats(self) -> Dict[str, Any]:
+        clients = [client.stats() for client in self._clients.values()]
+        return {
+            "policy": settings.WS_SLOW_CLIENT_POLICY,
+            "queue_size": settings.WS_SEND_QUEUE_SIZE,
+            "connections": len(clients),
+            "slow_disconnects": self.slow_disconnects,
+            "queued": sum(c["queued"] for c in clients),
+            "max_lag_seconds": max((c["lag_seconds"] for c in clients), default=0.0),
+            "clients": sorted(clients, key=lambda c: c["lag_seconds"], reverse=True),
+        }
+
 
 # Global singleton instance
 ws_manager = ConnectionManager()
@@ -0,0 +1,118 @@
+from typing import Any, Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+from app.services.metrics.cache import MetricsCacheService
+from app.services.metrics.dashboard_cache import node_type_key
+
+# Event types a client can subscribe to, the "type" of the broadcast messages
+EVENT_TYPES = frozenset(
+    {"status_change", "heartbeat", "alert", "alerts_refresh", "metrics_update"}
+)
+
+# Metrics cache fields naming the location hierarchy of a node
+LOCATION_FIELDS = ("location_name", "location_group", "location_parent")
+
+
+def _lower_names(values: Iterable[Any]) -> FrozenSet[str]:
+    return frozenset(str(v).strip().lower() for v in values if v and str(v).strip())
+
+
+def node_topics(
+    node_type: str, node_id: int, message: Optional[Dict[str, Any]] = None
+) -> FrozenSet[str]:
+    """
+    Topics of one node: its id, its type key and every location, group and
+    parent group name it sits under. The hierarchy and device type come
+    from the live metrics cache, so payloads that only carry an id still
+    reach location subscribers.
+    """
+    cached = (
+        MetricsCacheService.get_switch(node_id)
+        if node_type == "switch"
+        else MetricsCacheService.get_device(node_id)
+    ) or {}
+    message = message or {}
+
+    device_type = message.get("device_type") or cached.get("device_type")
+    names = [cached.get(f) for f in LOCATION_FIELDS]
+    names += [message.get(f) for f in LOCATION_FIELDS]
+
+    topics = {
+        f"{node_type}:{node_id}",
+        f"type:{node_type_key(node_type, device_type)}",
+    }
+    topics.update(f"location:{name}" for name in _lower_names(names))
+    return frozenset(topics)
+
+
+def message_node_topics(message: Dict[str, Any]) -> Optional[FrozenSet[str]]:
+    """Topics of the node a broadcast is about; None if it is system-wide."""
+    if message.get("type") == "status_change" and message.get("id") is not None:
+        return node_topics(message.get("node_type") or "device", message["id"], message)
+    if message.get("switch_id") is not None:
+        return node_topics("switch", message["switch_id"], message)
+    if message.get("device_id") is not None:
+        return node_topics("device", message["device_id"], message)
+    return None
+
+
+class Subscription(NamedTuple):
+    # Empty means every event type
+    events: FrozenSet[str] = frozenset()
+    # Node filters, one per dimension, as node topics. Empty means no
+    # filter on that dimension; a node must match every non-empty one
+    locations: FrozenSet[str] = frozenset()
+    device_types: FrozenSet[str] = frozenset()
+    nodes: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "Subscription":
+        """
+        Build from a client message such as
+        {"type": "subscribe", "events": ["alert"], "locations": ["GT Cikampek"],
+         "device_ids": [3], "switch_ids": [], "device_types": ["cctv"]}.
+        Locations match location, group and parent group names. Raises
+        ValueError on unknown event names rather than widening to all events.
+        """
+        events = _lower_names(data.get("events") or [])
+        unknown = events - EVENT_TYPES
+        if unknown:
+            raise ValueError(f"Unknown event types: {', '.join(sorted(unknown))}")
+
+        nodes = set()
+        for node_type in ("device", "switch"):
+            for node_id in data.get(f"{node_type}_ids") or []:
+                try:
+                    nodes.add(f"{node_type}:{int(node_id)}")
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid {node_type} id: {node_id!r}")
+
+        return cls(
+            events=events,
+            locations=frozenset(
+                f"location:{n}" for n in _lower_names(data.get("locations") or [])
+            ),
+            device_types=frozenset(
+                f"type:{t}" for t in _lower_names(data.get("device_types") or [])
+            ),
+            nodes=frozenset(nodes),
+        )
+
+    @property
+    def node_filters(self) -> Tuple[FrozenSet[str], ...]:
+        """The non-empty node dimensions"""
+        return tuple(f for f in (self.locations, self.device_types, self.nodes) if f)
+
+    def wants_event(self, event: Optional[str]) -> bool:
+        return not self.events or event in self.events
+
+    def wants_node(self, topics: FrozenSet[str]) -> bool:
+        # AND across dimensions, OR inside one
+        return all(not f.isdisjoint(topics) for f in self.node_filters)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "events": sorted(self.events),
+            "locations": sorted(t.partition(":")[2] for t in self.locations),
+            "device_types": sorted(t.partition(":")[2] for t in self.device_types),
+            "nodes": sorted(self.nodes),
+        }
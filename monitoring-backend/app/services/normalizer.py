@@ -27,14 +27,17 @@ def normalize_location_type(raw: Optional[str]) -> str:
 
 
 def normalize_status(raw_status: Any) -> str:
+    """
+    Map an alert state to the alert_status enum. LibreNMS reports open
+    alerts as 1 (alert), 2 (acknowledged), 3 (worse) or 4 (better) and only
+    0 as recovered, so anything not known to be cleared is active.
+    """
     if raw_status is None:
         return "active"
     s = str(raw_status).strip().lower()
-    if s in ("1", "active", "open", "alert", "triggered"):
-        return "active"
     if s in ("0", "cleared", "resolved", "closed", "ok", "recovered"):
         return "cleared"
-    return s
+    return "active"
 
 
 def status_to_severity(status: str | None) -> str:
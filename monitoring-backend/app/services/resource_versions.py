@@ -0,0 +1,42 @@
+import threading
+import uuid
+from typing import Dict
+
+# Resources whose versions make up the ETags of the cacheable read endpoints
+DEVICES = "devices"
+SWITCHES = "switches"
+LOCATIONS = "locations"
+LOCATION_GROUPS = "location_groups"
+NETWORK_NODES = "network_nodes"
+FO_ROUTES = "fo_routes"
+# Node status changes written by the status poller
+NODE_STATUS = "node_status"
+# Per-node traffic totals cached by the LibreNMS sync loop
+NODE_METRICS = "node_metrics"
+
+
+class ResourceVersions:
+    """
+    In-process change counters. Writers bump the resources they touched
+    after committing; readers turn the versions they depend on into a
+    strong ETag. The boot token makes ETags from a previous process (whose
+    counters started at zero too) never match.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self.boot_token = uuid.uuid4().hex[:12]
+
+    def bump(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def etag(self, *names: str) -> str:
+        with self._lock:
+            versions = ".".join(str(self._versions.get(name, 0)) for name in names)
+        return f'"{self.boot_token}-{versions}"'
+
+
+resource_versions = ResourceVersions()
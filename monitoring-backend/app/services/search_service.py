@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import String, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Device, Location, NodeAlert, Switch
+
+SEARCH_KINDS = ("device", "switch", "alert", "location")
+
+
+def like_pattern(term: str) -> str:
+    """'%term%' with the LIKE wildcards inside `term` matched literally."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _branch(kind: str, id_col, title, subtitle, status, columns, term: str, limit):
+    """
+    One UNION ALL branch: rows whose searched columns contain the term,
+    best first. word_similarity ranks "gate 3" high inside a long name,
+    where plain similarity would punish the extra words.
+    """
+    pattern = like_pattern(term)
+    scores = [func.coalesce(func.word_similarity(term, col), 0) for col in columns]
+    score = func.greatest(*scores) if len(scores) > 1 else scores[0]
+    return (
+        select(
+            literal(kind).label("kind"),
+            id_col.label("id"),
+            title.label("title"),
+            subtitle.label("subtitle"),
+            status.label("status"),
+            score.label("score"),
+        )
+        .where(or_(*[col.ilike(pattern) for col in columns]))
+        .order_by(score.desc())
+        .limit(limit)
+    )
+
+
+def search(
+    db: Session,
+    term: str,
+    kinds: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    with_ip: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Ranked search over device and switch names and IPs, alert messages and
+    location names in one round trip. Every branch filters with
+    ILIKE '%term%', which the pg_trgm GIN indexes serve, and keeps only its
+    own best `limit` rows before the union is sorted by score.
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    kinds = set(kinds or SEARCH_KINDS)
+    branches = []
+
+    for kind, model, id_col in (
+        ("device", Device, Device.device_id),
+        ("switch", Switch, Switch.switch_id),
+    ):
+        if kind in kinds:
+            columns = [model.name, model.ip_address] if with_ip else [model.name]
+            branches.append(
+                _branch(
+                    kind,
+                    id_col,
+                    model.name,
+                    model.ip_address,
+                    model.status,
+                    columns,
+                    term,
+                    limit,
+                )
+            )
+
+    if "alert" in kinds:
+        branches.append(
+            _branch(
+                "alert",
+                NodeAlert.alert_id,
+                NodeAlert.message,
+                NodeAlert.alert_type,
+                cast(NodeAlert.status, String),
+                [NodeAlert.message],
+                term,
+                limit,
+            )
+        )
+
+    if "location" in kinds:
+        branches.append(
+            _branch(
+                "location",
+                Location.location_id,
+                Location.name,
+                Location.address,
+                cast(null(), String),
+                [Location.name],
+                term,
+                limit,
+            )
+        )
+
+    if not branches:
+        return []
+
+    results = union_all(*branches).subquery()
+    rows = db.execute(
+        select(results)
+        .order_by(results.c.score.desc(), results.c.kind, results.c.id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
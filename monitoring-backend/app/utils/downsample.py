@@ -0,0 +1,63 @@
+from typing import Sequence
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Bucket bounds and the average point of every bucket are computed for
+    the whole series at once; only the choice of the point with the largest
+    triangle depends on the point picked in the previous bucket, so that
+    step runs once per bucket over a vectorized slice.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept, the rest is split evenly
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1 : n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1 : n - 1], starts - 1) / counts
+    # The bucket after the last one is the final point itself
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = starts[i], ends[i]
+        areas = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def lttb_multi_indices(
+    x: Sequence[float], series: Sequence[Sequence[float]], max_points: int
+) -> np.ndarray:
+    """
+    Downsample several series sharing the same x axis to at most
+    `max_points` rows. Each series gets an equal share of the budget and
+    the kept indices are merged, so peaks of every series survive.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) <= max_points:
+        return np.arange(len(x))
+
+    share = max(max_points // max(len(series), 1), 3)
+    kept = [lttb_indices(x, np.asarray(y, dtype=np.float64), share) for y in series]
+    return np.unique(np.concatenate(kept))
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def bucket_overlap_seconds(
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    edges: np.ndarray,
+    n_rows: int,
+) -> np.ndarray:
+    """
+    Seconds of every interval [starts[i], ends[i]) falling into each bucket
+    [edges[j], edges[j+1]), summed per row into an (n_rows, buckets) array.
+
+    searchsorted finds the first and last bucket of every interval at once.
+    The partial head and tail are added with bincount and the fully covered
+    buckets in between with a +1/-1 difference array and a cumsum, so no
+    step loops over intervals or days.
+    """
+    n_buckets = len(edges) - 1
+    out = np.zeros(n_rows * max(n_buckets, 0), dtype=np.float64)
+    if n_buckets < 1 or not len(starts):
+        return out.reshape(n_rows, max(n_buckets, 0))
+
+    starts = np.clip(np.asarray(starts, dtype=np.float64), edges[0], edges[-1])
+    ends = np.clip(np.asarray(ends, dtype=np.float64), edges[0], edges[-1])
+    keep = ends > starts
+    rows, starts, ends = np.asarray(rows)[keep], starts[keep], ends[keep]
+
+    first = np.searchsorted(edges, starts, side="right") - 1
+    last = np.searchsorted(edges, ends, side="left") - 1
+    size = n_rows * n_buckets
+
+    same = first == last
+    out += np.bincount(
+        rows[same] * n_buckets + first[same],
+        weights=ends[same] - starts[same],
+        minlength=size,
+    )
+
+    split = ~same
+    rows, first, last = rows[split], first[split], last[split]
+    out += np.bincount(
+        rows * n_buckets + first,
+        weights=edges[first + 1] - starts[split],
+        minlength=size,
+    )
+    out += np.bincount(
+        rows * n_buckets + last,
+        weights=ends[split] - edges[last],
+        minlength=size,
+    )
+
+    # Buckets strictly between the first and last one are fully covered
+    width = n_buckets + 1
+    cover = np.bincount(
+        rows * width + first + 1, minlength=n_rows * width
+    ) - np.bincount(rows * width + last, minlength=n_rows * width)
+    full = np.cumsum(cover.reshape(n_rows, width), axis=1)[:, :-1]
+
+    return out.reshape(n_rows, n_buckets) + full * np.diff(edges)
@@ -0,0 +1,116 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event, insert
+
+from app.api.v1.alerts import _alert_row_to_dict, _alert_rows_query
+from app.core.database import SessionLocal, engine
+from app.models import Device, NodeAlert, User
+
+
+def make_rows(device_ids: list[int], user_ids: list, count: int) -> list[dict]:
+    base = datetime.now(timezone.utc)
+    return [
+        {
+            "device_id": random.choice(device_ids),
+            "alert_type": "device_down",
+            "severity": "critical" if i % 3 == 0 else "warning",
+            "message": f"benchmark alert {i}",
+            "status": "active",
+            "assigned_to_user_id": random.choice(user_ids),
+            "created_at": base - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def serialize_orm(alert) -> dict:
+    # The per-instance serializer the alert endpoints used before, where
+    # every relationship access may lazy-load
+    dev_name = loc_name = " - "
+    if alert.device:
+        dev_name = alert.device.name
+        if alert.device.location:
+            loc_name = alert.device.location.name
+    return {
+        "alert_id": alert.alert_id,
+        "device_name": dev_name,
+        "location_name": loc_name,
+        "resolved_by_full_name": (
+            alert.assigned_user.full_name if alert.assigned_user else None
+        ),
+        "status": alert.status,
+        "created_at": alert.created_at,
+    }
+
+
+def run_orm(db) -> int:
+    active = db.query(NodeAlert).filter(NodeAlert.status == "active").all()
+    return len([serialize_orm(a) for a in active])
+
+
+def run_projected(db) -> int:
+    query = _alert_rows_query(db).filter(NodeAlert.status == "active")
+    return len([_alert_row_to_dict(row) for row in query])
+
+
+def measure(label: str, fn, db) -> None:
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    # Start from an empty identity map so earlier runs do not help
+    db.expire_all()
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        start = time.perf_counter()
+        rows = fn(db)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    print(
+        f"{label:<22} {elapsed * 1000:9.1f} ms  {statements:7,} queries  {rows:,} rows"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare lazy-loading alert serialization with the projected query"
+    )
+    parser.add_argument("--alerts", type=int, default=50_000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        device_ids = [row.device_id for row in db.query(Device.device_id)]
+        user_ids = [row.user_id for row in db.query(User.user_id)] + [None]
+        if not device_ids:
+            print("At least one device is required to run the benchmark")
+            return
+
+        db.execute(insert(NodeAlert), make_rows(device_ids, user_ids, args.alerts))
+        db.flush()
+
+        print("=" * 60)
+        print(f"Active alert serialization ({args.alerts:,} benchmark alerts)")
+        print("=" * 60)
+        measure("ORM + lazy loads", run_orm, db)
+        measure("projected query", run_projected, db)
+    finally:
+        # Never keep benchmark rows
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
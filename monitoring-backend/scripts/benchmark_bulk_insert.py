@@ -0,0 +1,86 @@
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import SessionLocal
+from app.models import Device, DeviceBandwidth
+from app.services.metrics.bulk_writer import bulk_insert_bandwidth
+
+
+def make_rows(device_id: int, count: int) -> list[dict]:
+    base = datetime.now(timezone.utc)
+    return [
+        {
+            "device_id": device_id,
+            "timestamp": base - timedelta(seconds=i),
+            "in_usage_mbps": float(i % 100),
+            "out_usage_mbps": float(i % 50),
+            "total_usage_mbps": float(i % 100 + i % 50),
+            "latency_ms": None if i % 10 == 0 else 1.5,
+            "packet_loss": 0.0,
+            "status": "online",
+        }
+        for i in range(count)
+    ]
+
+
+def run_orm(db, rows: list[dict]) -> None:
+    db.add_all([DeviceBandwidth(**row) for row in rows])
+    db.flush()
+
+
+def run_bulk(db, rows: list[dict]) -> None:
+    bulk_insert_bandwidth(db, DeviceBandwidth, rows)
+
+
+def measure(label: str, fn, rows: list[dict], repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            fn(db, rows)
+            timings.append(time.perf_counter() - start)
+        finally:
+            # Never keep benchmark rows
+            db.rollback()
+            db.close()
+
+    best = min(timings)
+    print(f"{label:<22} best {best * 1000:9.1f} ms  {len(rows) / best:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare ORM add_all against the bulk bandwidth writer"
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        device = db.query(Device.device_id).first()
+        dialect = db.get_bind().dialect.name
+    finally:
+        db.close()
+
+    if device is None:
+        print("At least one device is required to run the benchmark")
+        return
+
+    rows = make_rows(device.device_id, args.rows)
+    print("=" * 60)
+    print(f"Bandwidth insert benchmark ({args.rows:,} rows, dialect={dialect})")
+    print("=" * 60)
+    measure("ORM add_all + flush", run_orm, rows, args.repeat)
+    measure("bulk_insert_bandwidth", run_bulk, rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import func, insert, or_, text
+
+from app.core.database import SessionLocal
+from app.models import Device, NodeAlert
+from app.services.search_service import search
+
+WORDS = ["gerbang", "tol", "gate", "utara", "selatan", "ramp", "cctv", "vms", "ap"]
+MESSAGES = ["Device down", "No response to ICMP", "High latency", "Port flapping"]
+
+
+def make_devices(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"bench-{random.choice(WORDS)}-{random.choice(WORDS)}-{i}",
+            "ip_address": f"10.{200 + i // 65536}.{i // 256 % 256}.{i % 256}",
+            "device_type": "cctv",
+            "status": "online",
+        }
+        for i in range(count)
+    ]
+
+
+def make_alerts(device_ids: list[int], count: int) -> list[dict]:
+    base = datetime.now(timezone.utc)
+    return [
+        {
+            "device_id": random.choice(device_ids),
+            "alert_type": "device_down",
+            "severity": "warning",
+            "message": f"{random.choice(MESSAGES)} on {random.choice(WORDS)} {i}",
+            "status": "cleared",
+            "created_at": base - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def run_like(db, term: str) -> int:
+    # The /devices/nodes filter before the trigram indexes
+    pattern = f"%{term.lower()}%"
+    return (
+        db.query(Device.device_id)
+        .filter(
+            or_(
+                func.lower(Device.name).like(pattern),
+                func.lower(Device.ip_address).like(pattern),
+            )
+        )
+        .count()
+    )
+
+
+def run_search(db, term: str) -> int:
+    return len(search(db, term, limit=20))
+
+
+def measure(label: str, fn, db, terms: list[str], repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for term in terms:
+            fn(db, term)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings) / len(terms)
+    print(f"{label:<28} best {best * 1000:9.2f} ms per search")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare lower() LIKE node search with the trigram search service"
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    terms = ["utara-ramp", "10.201.4", "latency on vms", "gate"]
+
+    db = SessionLocal()
+    try:
+        has_trgm = db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+        if not has_trgm:
+            print("pg_trgm is not installed, run the migrations first")
+            return
+
+        db.execute(insert(Device), make_devices(args.rows))
+        device_ids = [
+            row.device_id
+            for row in db.query(Device.device_id).filter(Device.name.like("bench-%"))
+        ]
+        db.execute(insert(NodeAlert), make_alerts(device_ids, args.rows))
+        db.execute(text("ANALYZE devices"))
+        db.execute(text("ANALYZE node_alerts"))
+
+        print("=" * 60)
+        print(f"Search over {args.rows:,} devices and {args.rows:,} alerts")
+        print("=" * 60)
+        measure("lower() LIKE on devices", run_like, db, terms, args.repeat)
+        measure("search service (all kinds)", run_search, db, terms, args.repeat)
+
+        # Same service with the trigram indexes out of the planner's reach
+        db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        measure("search service, no index", run_search, db, terms, args.repeat)
+    finally:
+        # Never keep benchmark rows
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
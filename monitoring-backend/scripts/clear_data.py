@@ -8,7 +8,6 @@ sys.path.insert(0, str(project_root))
 
 from app.core.database import SessionLocal
 from app.models import (
-    Alert,
     Device,
     DeviceBandwidth,
     DeviceReplacement,
@@ -18,7 +17,6 @@ from app.models import (
     ProblemCategory,
     StatusHistory,
     Switch,
-    SwitchAlert,
     SwitchBandwidth,
     SwitchReplacement,
     User,
@@ -37,8 +35,7 @@ def clear_data():
             tables = [
                 "device_bandwidth",
                 "switch_bandwidth",
-                "alerts",
-                "switch_alerts",
+                "node_alerts",
                 "device_replacement",
                 "switch_replacement",
                 "devices",
@@ -6,6 +6,10 @@ class MetricsProvider extends ChangeNotifier {
   final Map<int, Map<String, dynamic>> _deviceMetrics = {};
   final Map<int, Map<String, dynamic>> _switchMetrics = {};
   StreamSubscription? _metricsSub;
+  // seq of the last metrics_update frame applied
+  int? _seq;
+  // A keyframe was asked for and has not arrived yet
+  bool _keyframePending = false;
 
   MetricsProvider() {
     _initListener();
@@ -27,22 +31,53 @@ class MetricsProvider extends ChangeNotifier {
 
   void _initListener() {
     _metricsSub = WebSocketService().metricsUpdates.listen((data) {
-      bool hasChanges = false;
+      // Deltas only apply on top of the frame they were computed against
+      final isKeyframe = data['keyframe'] != false;
+      if (!isKeyframe && data['base_seq'] != _seq) {
+        _seq = null;
+        // Ask once; deltas until the keyframe arrives are dropped quietly
+        if (!_keyframePending) {
+          _keyframePending = true;
+          WebSocketService().requestKeyframe();
+        }
+        return;
+      }
+      _seq = data['seq'] as int?;
+      if (isKeyframe) {
+        _keyframePending = false;
+      }
+
+      if (isKeyframe) {
+        _deviceMetrics.clear();
+        _switchMetrics.clear();
+      }
+      bool hasChanges = isKeyframe;
 
       final devices = data['device_metrics'] as List<dynamic>? ?? [];
       for (var d in devices) {
         final id = d['device_id'] as int;
-        _deviceMetrics[id] = d as Map<String, dynamic>;
+        _deviceMetrics
+            .putIfAbsent(id, () => <String, dynamic>{})
+            .addAll(d as Map<String, dynamic>);
         hasChanges = true;
       }
 
       final switches = data['switch_metrics'] as List<dynamic>? ?? [];
       for (var s in switches) {
         final id = s['switch_id'] as int;
-        _switchMetrics[id] = s as Map<String, dynamic>;
+        _switchMetrics
+            .putIfAbsent(id, () => <String, dynamic>{})
+            .addAll(s as Map<String, dynamic>);
         hasChanges = true;
       }
 
+      for (var id in data['removed_device_ids'] as List<dynamic>? ?? []) {
+        hasChanges = _deviceMetrics.remove(id) != null || hasChanges;
+      }
+      for (var id in data['removed_switch_ids'] as List<dynamic>? ?? []) {
+        hasChanges = _switchMetrics.remove(id) != null || hasChanges;
+      }
+
       if (hasChanges) {
         notifyListeners();
       }
@@ -59,6 +59,8 @@ class WebSocketService {
   WebSocketConnectionState _connectionState =
       WebSocketConnectionState.disconnected;
   bool _shouldReconnect = true;
+  // Last subscribe message, sent again after every reconnect
+  Map<String, dynamic>? _subscription;
   int _reconnectAttempts = 0;
 
   static const int _maxReconnectAttempts = 10;
@@ -142,6 +144,9 @@ class WebSocketService {
       _updateConnectionState(WebSocketConnectionState.connected);
       _reconnectAttempts = 0;
       _startPingTimer();
+      if (_subscription != null) {
+        _channel!.sink.add(jsonEncode(_subscription));
+      }
 
       debugPrint('WebSocket: Connected successfully');
     } catch (e) {
@@ -179,8 +184,12 @@ class WebSocketService {
         case 'metrics_update':
           _metricsUpdateController.add(data);
           break;
+        case 'subscribed':
         case 'pong':
           break;
+        case 'subscribe_error':
+          debugPrint('WebSocket: Subscribe rejected: ${data['message']}');
+          break;
         default:
           debugPrint('WebSocket: Unknown message type: $type');
       }
@@ -225,6 +234,40 @@ class WebSocketService {
     });
   }
 
+  /// Asks the server for a full metrics_update frame, e.g. after a seq gap.
+  void requestKeyframe() {
+    if (isConnected && _channel != null) {
+      try {
+        _channel!.sink.add('keyframe');
+      } catch (_) {}
+    }
+  }
+
+  /// Limits events and metrics to the given filters; empty lists mean no
+  /// filter on that dimension. A node must match every non-empty list.
+  /// Locations match location and group names.
+  void subscribe({
+    List<String> events = const [],
+    List<String> locations = const [],
+    List<int> deviceIds = const [],
+    List<int> switchIds = const [],
+    List<String> deviceTypes = const [],
+  }) {
+    _subscription = {
+      'type': 'subscribe',
+      'events': events,
+      'locations': locations,
+      'device_ids': deviceIds,
+      'switch_ids': switchIds,
+      'device_types': deviceTypes,
+    };
+    if (isConnected && _channel != null) {
+      try {
+        _channel!.sink.add(jsonEncode(_subscription));
+      } catch (_) {}
+    }
+  }
+
   void _startPingTimer() {
     _pingTimer?.cancel();
     _pingTimer = Timer.periodic(_pingInterval, (_) {